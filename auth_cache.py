@@ -0,0 +1,193 @@
+import os
+import re
+import json
+import time
+import threading
+from selenium.common.exceptions import WebDriverException
+from driver_resolver import FileLock
+from config import BASE_URL, USERNAME, app_url
+from spans import span
+from logger_config import setup_logger
+
+# Set up logger / 设置日志记录器
+logger = setup_logger()
+
+# Snapshots are shared by all workers through this directory / 快照通过该目录在所有worker间共享
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.auth_cache')
+
+# Seconds a snapshot is trusted after its last successful validation / 快照最近一次验证成功后的可信秒数
+DEFAULT_TTL = 600.0
+
+CAPTURE_STORAGE_SCRIPT = """
+return [JSON.stringify(Object.assign({}, window.localStorage)), JSON.stringify(Object.assign({}, window.sessionStorage))];
+"""
+
+RESTORE_STORAGE_SCRIPT = """
+var local = JSON.parse(arguments[0]), session = JSON.parse(arguments[1]);
+Object.keys(local).forEach(function (key) { window.localStorage.setItem(key, local[key]); });
+Object.keys(session).forEach(function (key) { window.sessionStorage.setItem(key, session[key]); });
+"""
+
+def is_enabled(default=True):
+    """Check whether login snapshots are used; LOGIN_CACHE overrides the caller's default / 检查是否使用登录快照; LOGIN_CACHE优先于调用方默认值"""
+    value = os.environ.get('LOGIN_CACHE')
+    if value is None:
+        return default
+    return value != '0'
+
+class SessionSnapshot:
+    """Cookies and web storage of an authenticated session / 已认证会话的cookies和网页存储"""
+    def __init__(self, cookies, local_storage='{}', session_storage='{}', validated=None):
+        self.cookies = cookies
+        self.local_storage = local_storage
+        self.session_storage = session_storage
+        self.validated = validated or time.time()
+
+    def expires(self, ttl):
+        """Earliest of the cookie expiries and the validation TTL / cookie过期时间与验证TTL中的较早者"""
+        expiries = [cookie['expiry'] for cookie in self.cookies if 'expiry' in cookie]
+        return min(expiries + [self.validated + ttl])
+
+    def is_fresh(self, ttl):
+        """Check that the snapshot has not expired / 检查快照是否未过期"""
+        return time.time() < self.expires(ttl)
+
+    def to_dict(self):
+        """Serialize the snapshot / 序列化快照"""
+        return {
+            'cookies': self.cookies,
+            'local_storage': self.local_storage,
+            'session_storage': self.session_storage,
+            'validated': self.validated,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a snapshot from to_dict() output / 由to_dict()输出重建快照"""
+        return cls(data['cookies'], data['local_storage'], data['session_storage'], data['validated'])
+
+class LoginCache:
+    """Log in once, then inject the session snapshot into new browsers / 只登录一次, 之后将会话快照注入新浏览器
+
+    Restored browsers share one server-side session, whose requests PHP serializes on the session lock, so
+    load tests call login() with default=False and only use the cache when LOGIN_CACHE=1 is set explicitly.
+    恢复的浏览器共享同一个服务端会话, PHP会按会话锁串行处理其请求, 因此压力测试以default=False调用login(),
+    仅在显式设置 LOGIN_CACHE=1 时使用缓存。
+    """
+    def __init__(self, base_url=BASE_URL, username=USERNAME, ttl=None):
+        self.base_url = base_url
+        self.ttl = ttl or float(os.environ.get('LOGIN_CACHE_TTL', DEFAULT_TTL))
+        key = re.sub(r'[^A-Za-z0-9]+', '_', f"{base_url}_{username}").strip('_')
+        self.path = os.path.join(CACHE_DIR, f"{key}.json")
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        """Read the shared snapshot file / 读取共享快照文件"""
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                return SessionSnapshot.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _save(self, snapshot):
+        """Atomically write the shared snapshot file / 原子写出共享快照文件"""
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        temp_file = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(snapshot.to_dict(), f)
+        os.replace(temp_file, self.path)
+
+    def capture(self, driver):
+        """Snapshot cookies and storage of a logged-in browser / 为已登录浏览器的cookies和存储创建快照"""
+        local_storage, session_storage = driver.execute_script(CAPTURE_STORAGE_SCRIPT)
+        snapshot = SessionSnapshot(driver.get_cookies(), local_storage, session_storage)
+        with self._lock:
+            self._snapshot = snapshot
+        self._save(snapshot)
+        logger.info("Login session snapshot saved / 登录会话快照已保存")
+        return snapshot
+
+    def validate(self, driver):
+        """Load the dashboard once; a redirect to the login page means the session is gone / 加载一次仪表板；被重定向到登录页表示会话已失效"""
+        driver.get(app_url('dashboard/index'))
+        return 'auth/login' not in driver.current_url
+
+    def restore(self, driver, snapshot):
+        """Inject a snapshot into a browser and validate it / 将快照注入浏览器并验证"""
+        try:
+            # Cookies can only be set for the current origin / cookies只能为当前源设置
+            driver.get(f"{self.base_url}favicon.ico")
+            for cookie in snapshot.cookies:
+                driver.add_cookie(cookie)
+            driver.execute_script(RESTORE_STORAGE_SCRIPT, snapshot.local_storage, snapshot.session_storage)
+            valid = self.validate(driver)
+        except WebDriverException as e:
+            logger.warning("Restoring login session failed: %s / 恢复登录会话失败: %s", e, e)
+            valid = False
+        if valid:
+            snapshot.validated = time.time()
+        else:
+            driver.delete_all_cookies()
+        return valid
+
+    def invalidate(self):
+        """Drop the snapshot so the next login goes through the UI / 丢弃快照, 下次通过界面登录"""
+        with self._lock:
+            self._snapshot = None
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def _try_restore(self, driver, snapshot, metrics):
+        """Restore a fresh snapshot, timed as the login_restore step / 恢复未过期的快照, 计入login_restore步骤"""
+        if snapshot is None or not snapshot.is_fresh(self.ttl):
+            return False
+        with span("login_restore", metrics):
+            restored = self.restore(driver, snapshot)
+        if restored:
+            with self._lock:
+                self._snapshot = snapshot
+            logger.info("Login session restored from snapshot / 已从快照恢复登录会话")
+        return restored
+
+    def login(self, driver, login_func, metrics=None, default=True):
+        """Restore a cached session or fall back to login_func(driver) / 恢复缓存的会话, 否则回退到login_func(driver)
+
+        `default` decides whether the cache is used when LOGIN_CACHE is unset.
+        `default` 决定未设置 LOGIN_CACHE 时是否使用缓存。
+        Returns True when the browser ends up logged in on the dashboard.
+        浏览器最终登录并位于仪表板时返回True。
+        """
+        if not is_enabled(default):
+            return bool(login_func(driver))
+        with self._lock:
+            snapshot = self._snapshot
+        snapshot = snapshot or self._load()
+        if self._try_restore(driver, snapshot, metrics):
+            return True
+
+        # One worker logs in while the others wait for its snapshot / 一个worker登录, 其他worker等待其快照
+        with FileLock(f"{self.path}.lock"):
+            shared = self._load()
+            if shared is not None and (snapshot is None or shared.cookies != snapshot.cookies):
+                if self._try_restore(driver, shared, metrics):
+                    return True
+            logger.info("No valid login snapshot, logging in through the UI / 无有效登录快照, 通过界面登录")
+            self.invalidate()
+            if not login_func(driver):
+                return False
+            self.capture(driver)
+        return True
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+def get_login_cache(base_url=BASE_URL, username=USERNAME):
+    """Get the process-wide login cache of a target and user / 获取目标和用户对应的进程级登录缓存"""
+    with _caches_lock:
+        cache = _caches.get((base_url, username))
+        if cache is None:
+            cache = _caches[(base_url, username)] = LoginCache(base_url, username)
+        return cache
@@ -0,0 +1,189 @@
+import os
+import time
+import shutil
+import itertools
+import threading
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.edge.service import Service
+from selenium.webdriver.edge.options import Options
+from driver_resolver import resolve_edge_driver
+from command_profiler import get_command_profiler, is_enabled as is_profiling_enabled
+from resource_sampler import get_worker_id
+from logger_config import setup_logger
+
+# Set up logger / 设置日志记录器
+logger = setup_logger()
+
+# Default implicit wait in seconds / 默认隐式等待秒数
+IMPLICIT_WAIT = 30
+
+# Edge command line arguments / Edge命令行参数
+EDGE_ARGUMENTS = [
+    "--start-maximized",
+    "--disable-notifications",
+    "--disable-gpu",
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-extensions",
+    "--disable-popup-blocking",
+]
+
+# Lean profile: headless, fixed viewport, no background services / 精简配置: 无头、固定视口、无后台服务
+LEAN_ARGUMENTS = [
+    "--headless=new",
+    "--disable-gpu",
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-extensions",
+    "--disable-popup-blocking",
+    "--disable-notifications",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--no-first-run",
+    "--mute-audio",
+]
+DEFAULT_VIEWPORT = '1366x768'
+
+# Assets the flows never need; favicon.ico stays reachable for the login cache / 流程不需要的资源；favicon.ico保留给登录缓存使用
+DEFAULT_BLOCKED_URLS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.svg", "*.webp",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*fonts.googleapis.com*", "*fonts.gstatic.com*",
+]
+
+# Per-worker user-data directories of the lean profile / 精简配置各worker的用户数据目录
+USER_DATA_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.browser_profiles')
+
+# Startup time totals per phase: [count, total seconds] / 各启动阶段耗时统计: [次数, 总秒数]
+_startup_timings = {'driver_resolution': [0, 0.0], 'browser_launch': [0, 0.0]}
+_startup_lock = threading.Lock()
+
+def _record_startup(phase, elapsed):
+    """Record time spent in a startup phase / 记录启动阶段耗时"""
+    with _startup_lock:
+        _startup_timings[phase][0] += 1
+        _startup_timings[phase][1] += elapsed
+
+def get_startup_summary():
+    """Get startup time split between driver resolution and browser launch / 获取驱动解析与浏览器启动的耗时分布"""
+    with _startup_lock:
+        return {
+            phase: {'count': count, 'total': total, 'avg': total / count if count else 0}
+            for phase, (count, total) in _startup_timings.items()
+        }
+
+# User-data directory slots in use by this worker / 当前worker正在使用的用户数据目录槽位
+_used_slots = set()
+_slot_lock = threading.Lock()
+
+def get_profile():
+    """Selected browser profile, 'default' or 'lean' / 所选浏览器配置, 'default' 或 'lean'"""
+    return os.environ.get('BROWSER_PROFILE', 'default')
+
+def get_cache_mode():
+    """'warm' keeps the HTTP cache, 'cold' disables it / 'warm' 保留HTTP缓存, 'cold' 禁用缓存"""
+    return os.environ.get('BROWSER_CACHE', 'warm')
+
+def get_blocked_urls():
+    """URL patterns blocked in lean sessions / 精简会话中屏蔽的URL模式"""
+    value = os.environ.get('BROWSER_BLOCK_URLS')
+    if value is None:
+        return list(DEFAULT_BLOCKED_URLS)
+    return [pattern.strip() for pattern in value.split(',') if pattern.strip()]
+
+def acquire_user_data_dir(cold=False):
+    """Claim a free user-data directory of this worker / 占用当前worker的空闲用户数据目录
+
+    Slots are reused by later sessions, so a warm profile keeps its disk cache across session
+    recycling and runs; a cold profile starts from an empty directory.
+    槽位会被后续会话复用, 因此warm配置在会话回收和多次运行之间保留磁盘缓存；cold配置从空目录开始。
+    """
+    with _slot_lock:
+        slot = next(number for number in itertools.count(1) if number not in _used_slots)
+        _used_slots.add(slot)
+    path = os.path.join(USER_DATA_ROOT, get_worker_id(), f"slot{slot}")
+    if cold:
+        shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+    return slot, path
+
+def release_user_data_dir(slot):
+    """Free a user-data directory slot / 释放用户数据目录槽位"""
+    with _slot_lock:
+        _used_slots.discard(slot)
+
+def build_edge_options(profile=None, user_data_dir=None):
+    """Build Edge options / 构建Edge选项"""
+    profile = profile or get_profile()
+    edge_options = Options()
+    if profile == 'lean':
+        for argument in LEAN_ARGUMENTS:
+            edge_options.add_argument(argument)
+        width, height = os.environ.get('BROWSER_VIEWPORT', DEFAULT_VIEWPORT).lower().split('x')
+        edge_options.add_argument(f"--window-size={int(width)},{int(height)}")
+        if user_data_dir:
+            edge_options.add_argument(f"--user-data-dir={user_data_dir}")
+    elif profile == 'default':
+        for argument in EDGE_ARGUMENTS:
+            edge_options.add_argument(argument)
+    else:
+        raise ValueError(f"Unknown browser profile: {profile} / 未知的浏览器配置: {profile}")
+    logger.debug("Edge options configured (%s) / Edge选项配置完成 (%s)", profile, profile)
+    return edge_options
+
+def configure_network(driver, blocked_urls=(), cache_disabled=False):
+    """Apply URL blocking and cache settings through CDP / 通过CDP设置URL屏蔽和缓存"""
+    if not blocked_urls and not cache_disabled:
+        return
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        if blocked_urls:
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {'urls': list(blocked_urls)})
+        if cache_disabled:
+            driver.execute_cdp_cmd("Network.setCacheDisabled", {'cacheDisabled': True})
+    except (AttributeError, WebDriverException) as e:
+        logger.warning("CDP network settings unavailable: %s / CDP网络设置不可用: %s", e, e)
+
+def create_edge_driver():
+    """Launch a new Edge session / 启动新的Edge会话"""
+    profile = get_profile()
+    cold = get_cache_mode() == 'cold'
+    slot, user_data_dir = acquire_user_data_dir(cold) if profile == 'lean' else (None, None)
+    # The user-data slot goes back on any failure before the browser owns it / 浏览器接管前的任何失败都归还用户数据槽位
+    try:
+        edge_options = build_edge_options(profile, user_data_dir)
+        # Resolve EdgeDriver through the shared cache / 通过共享缓存解析EdgeDriver
+        resolve_start = time.perf_counter()
+        service = Service(resolve_edge_driver())
+        resolve_time = time.perf_counter() - resolve_start
+        _record_startup('driver_resolution', resolve_time)
+        
+        launch_start = time.perf_counter()
+        driver = webdriver.Edge(service=service, options=edge_options)
+    except Exception:
+        if slot is not None:
+            release_user_data_dir(slot)
+        raise
+    if slot is not None:
+        quit_driver = driver.quit
+
+        def quit_and_release():
+            try:
+                quit_driver()
+            finally:
+                release_user_data_dir(slot)
+
+        driver.quit = quit_and_release
+    if is_profiling_enabled():
+        get_command_profiler().instrument(driver)
+    configure_network(driver, get_blocked_urls() if profile == 'lean' else (), cold)
+    driver.implicitly_wait(IMPLICIT_WAIT)
+    launch_time = time.perf_counter() - launch_start
+    _record_startup('browser_launch', launch_time)
+    
+    logger.info("Driver resolution %.3fs, browser launch %.3fs / 驱动解析 %.3f秒, 浏览器启动 %.3f秒", resolve_time, launch_time, resolve_time, launch_time)
+    return driver
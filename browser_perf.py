@@ -0,0 +1,134 @@
+import os
+import weakref
+from collections import deque
+from selenium.common.exceptions import WebDriverException
+from spans import current_path
+from logger_config import setup_logger
+
+# Set up logger / 设置日志记录器
+logger = setup_logger()
+
+# Maximum records kept per driver for reporting / 每个driver保留用于报告的最大记录数
+MAX_RECORDS = 1000
+
+# CDP Performance.getMetrics counters to report / 需要报告的CDP Performance.getMetrics计数器
+CDP_DURATION_METRICS = ['ScriptDuration', 'LayoutDuration', 'RecalcStyleDuration', 'TaskDuration']
+
+# Reads navigation timing for a new document and resource timing since the last call / 读取新文档的导航计时及上次调用以来的资源计时
+TIMING_SCRIPT = """
+var result = {navigation: null, resources: []};
+if (!window.__hrmPerfSeen) {
+    window.__hrmPerfSeen = true;
+    performance.setResourceTimingBufferSize(1000);
+    var navigation = performance.getEntriesByType('navigation')[0];
+    if (navigation) {
+        result.navigation = {
+            ttfb: navigation.responseStart - navigation.requestStart,
+            dom_content_loaded: navigation.domContentLoadedEventEnd - navigation.startTime,
+            load: navigation.loadEventEnd > 0 ? navigation.loadEventEnd - navigation.startTime : null
+        };
+    }
+}
+var resources = performance.getEntriesByType('resource');
+for (var i = 0; i < resources.length; i++) {
+    result.resources.push({
+        type: resources[i].initiatorType,
+        duration: resources[i].duration,
+        size: resources[i].transferSize || 0
+    });
+}
+performance.clearResourceTimings();
+return result;
+"""
+
+def is_enabled():
+    """Check whether browser-side capture is switched on / 检查是否开启浏览器端采集"""
+    return os.environ.get('BROWSER_PERF', '0') == '1'
+
+class BrowserPerfCollector:
+    """Collect Navigation/Resource Timing and CDP metrics per step / 按步骤采集导航/资源计时和CDP指标"""
+    def __init__(self, driver, metrics=None):
+        self.driver = driver
+        self.metrics = metrics
+        self.records = deque(maxlen=MAX_RECORDS)
+        self._last_cdp = {}
+        self._cdp_available = True
+        try:
+            driver.execute_cdp_cmd("Performance.enable", {})
+        except (AttributeError, WebDriverException) as e:
+            self._cdp_available = False
+            logger.debug("CDP performance metrics unavailable: %s / CDP性能指标不可用: %s", e, e)
+
+    def _cdp_metrics(self):
+        """JS heap and duration deltas since the previous collection / 自上次采集以来的JS堆和耗时增量"""
+        if not self._cdp_available:
+            return {}
+        try:
+            raw = self.driver.execute_cdp_cmd("Performance.getMetrics", {})
+        except WebDriverException:
+            return {}
+        current = {metric['name']: metric['value'] for metric in raw.get('metrics', [])}
+        values = {}
+        if 'JSHeapUsedSize' in current:
+            values['js_heap_mb'] = current['JSHeapUsedSize'] / (1024 * 1024)
+        for name in CDP_DURATION_METRICS:
+            if name in current:
+                # Counters are cumulative per renderer; restart counts from zero / 计数器按渲染进程累计；重启后从零开始
+                previous = self._last_cdp.get(name, 0)
+                values[name] = current[name] - previous if current[name] >= previous else current[name]
+        self._last_cdp = current
+        return values
+
+    def collect(self, step=None):
+        """Capture browser-side timings for a step / 采集某步骤的浏览器端计时"""
+        step = step or current_path() or 'unnamed'
+        try:
+            timing = self.driver.execute_script(TIMING_SCRIPT)
+        except WebDriverException as e:
+            logger.debug("Browser timing capture failed: %s / 浏览器计时采集失败: %s", e, e)
+            return None
+
+        values = {}
+        navigation = timing.get('navigation')
+        if navigation:
+            for name, value in navigation.items():
+                if value is not None:
+                    values[f"nav_{name}"] = value / 1000
+        api = [r for r in timing['resources'] if r['type'] in ('xmlhttprequest', 'fetch')]
+        static = [r for r in timing['resources'] if r['type'] not in ('xmlhttprequest', 'fetch')]
+        if api:
+            values['api_requests'] = len(api)
+            values['api_max'] = max(r['duration'] for r in api) / 1000
+        if static:
+            values['static_requests'] = len(static)
+            values['static_bytes'] = sum(r['size'] for r in static)
+        values.update(self._cdp_metrics())
+
+        self.records.append({'step': step, **values})
+        if self.metrics is not None:
+            for name, value in values.items():
+                self.metrics.record_browser_timing(step, name, value)
+        logger.debug("Browser timings for '%s': %s / '%s' 的浏览器计时: %s", step, values, step, values)
+        return values
+
+class _DisabledCollector:
+    """No-op collector used when BROWSER_PERF is off / BROWSER_PERF关闭时使用的空采集器"""
+    records = ()
+
+    def collect(self, step=None):
+        return None
+
+_collectors = weakref.WeakKeyDictionary()
+_disabled = _DisabledCollector()
+
+def get_browser_perf(driver, metrics=None):
+    """Get the browser performance collector bound to a driver / 获取绑定到driver的浏览器性能采集器"""
+    if not is_enabled():
+        return _disabled
+    collector = _collectors.get(driver)
+    if collector is None:
+        collector = BrowserPerfCollector(driver, metrics)
+        _collectors[driver] = collector
+    elif metrics is not None:
+        collector.metrics = metrics
+    return collector
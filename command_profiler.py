@@ -0,0 +1,156 @@
+import os
+import time
+import threading
+from spans import current_path
+from logger_config import setup_logger
+
+# Set up logger / 设置日志记录器
+logger = setup_logger()
+
+# Default number of rows in reports / 报告默认行数
+DEFAULT_TOP = 10
+
+# Row layout of the stats table / 统计表的行布局
+COUNT, TOTAL, LONGEST, FAILURES, BYTES = range(5)
+
+def is_enabled():
+    """Check whether WebDriver commands are profiled / 检查是否分析WebDriver命令"""
+    return os.environ.get('WEBDRIVER_PROFILE', '1') != '0'
+
+def _is_error(response):
+    """Check a raw command response for a WebDriver error / 检查原始命令响应是否为WebDriver错误"""
+    if not isinstance(response, dict):
+        return False
+    value = response.get('value')
+    if isinstance(value, dict) and 'error' in value:
+        return True
+    status = response.get('status')
+    return status not in (None, 0, 200)
+
+class CommandProfiler:
+    """Time every WebDriver command by test, step and command name / 按测试、步骤和命令名统计每个WebDriver命令耗时
+
+    Wraps the driver's command executor, so each command costs one perf_counter pair and one dict
+    update. Payload size is the JSON request body sent to msedgedriver.
+    包装driver的命令执行器，每个命令只增加一次计时和一次字典更新；负载大小为发送给msedgedriver的JSON请求体。
+    """
+    def __init__(self):
+        self.stats = {}
+        self.current_test = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def instrument(self, driver):
+        """Install the profiling wrappers on a driver / 在driver上安装分析包装"""
+        executor = driver.command_executor
+        if getattr(executor, '_hrm_profiled', False):
+            return driver
+        execute, request = executor.execute, executor._request
+        local = self._local
+
+        def profiled_request(method, url, body=None):
+            local.bytes = getattr(local, 'bytes', 0) + (len(body) if body else 0)
+            return request(method, url, body=body)
+
+        def profiled_execute(command, params):
+            local.bytes = 0
+            failed = True
+            start_time = time.perf_counter()
+            try:
+                response = execute(command, params)
+                failed = _is_error(response)
+                return response
+            finally:
+                self.record(command, time.perf_counter() - start_time, local.bytes, failed)
+
+        executor._request = profiled_request
+        executor.execute = profiled_execute
+        executor._hrm_profiled = True
+        return driver
+
+    def record(self, command, duration, size=0, failed=False, test=None, step=None):
+        """Add one command to the stats / 将一个命令计入统计"""
+        key = (test or self.current_test or '-', step or current_path() or '-', command)
+        with self._lock:
+            row = self.stats.get(key)
+            if row is None:
+                row = self.stats[key] = [0, 0.0, 0.0, 0, 0]
+            row[COUNT] += 1
+            row[TOTAL] += duration
+            if duration > row[LONGEST]:
+                row[LONGEST] = duration
+            row[FAILURES] += 1 if failed else 0
+            row[BYTES] += size
+
+    def to_dict(self):
+        """Serialize the stats / 序列化统计"""
+        with self._lock:
+            return {'rows': [list(key) + list(row) for key, row in self.stats.items()]}
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a profiler from to_dict() output / 由to_dict()输出重建分析器"""
+        profiler = cls()
+        for entry in data.get('rows', []):
+            profiler.stats[tuple(entry[:3])] = list(entry[3:])
+        return profiler
+
+    def merge(self, other):
+        """Merge another profiler's stats into this one / 将另一个分析器的统计合并到当前分析器"""
+        with other._lock:
+            other_items = [(key, list(row)) for key, row in other.stats.items()]
+        with self._lock:
+            for key, other_row in other_items:
+                row = self.stats.setdefault(key, [0, 0.0, 0.0, 0, 0])
+                row[COUNT] += other_row[COUNT]
+                row[TOTAL] += other_row[TOTAL]
+                row[LONGEST] = max(row[LONGEST], other_row[LONGEST])
+                row[FAILURES] += other_row[FAILURES]
+                row[BYTES] += other_row[BYTES]
+        return self
+
+    def report(self, iterations=None, group='command', limit=DEFAULT_TOP):
+        """Top commands by total time, grouped by 'command', 'step' or 'test' / 按总耗时排列的命令, 可按 'command'、'step' 或 'test' 分组
+
+        With iterations, each row also gets its count per iteration.
+        提供迭代次数时，每行还包含每次迭代的命令数。
+        """
+        index = {'test': 0, 'step': 1}.get(group)
+        grouped = {}
+        with self._lock:
+            items = list(self.stats.items())
+        for key, row in items:
+            name = key[2] if index is None else f"{key[index]} / {key[2]}"
+            entry = grouped.setdefault(name, [0, 0.0, 0.0, 0, 0])
+            entry[COUNT] += row[COUNT]
+            entry[TOTAL] += row[TOTAL]
+            entry[LONGEST] = max(entry[LONGEST], row[LONGEST])
+            entry[FAILURES] += row[FAILURES]
+            entry[BYTES] += row[BYTES]
+        rows = []
+        for name, (count, total, longest, failures, size) in sorted(grouped.items(), key=lambda item: -item[1][TOTAL])[:limit]:
+            rows.append({
+                'name': name,
+                'count': count,
+                'total': total,
+                'avg': total / count,
+                'max': longest,
+                'failures': failures,
+                'bytes': size,
+                'per_iteration': count / iterations if iterations else None,
+            })
+        return rows
+
+    def log_report(self, iterations=None, limit=DEFAULT_TOP):
+        """Log the top commands / 输出耗时最多的命令"""
+        for row in self.report(iterations, limit=limit):
+            per_iteration = f"{row['per_iteration']:.1f}" if row['per_iteration'] is not None else '-'
+            logger.info("Command %s: n=%s (%s/iteration), total=%.3fs, avg=%.1fms, max=%.1fms, failures=%s, sent=%sB / 命令 %s: 次数=%s (每次迭代%s), 总计=%.3f秒, 平均=%.1f毫秒, 最大=%.1f毫秒, 失败=%s, 发送=%s字节",
+                        row['name'], row['count'], per_iteration, row['total'], row['avg'] * 1000, row['max'] * 1000, row['failures'], row['bytes'],
+                        row['name'], row['count'], per_iteration, row['total'], row['avg'] * 1000, row['max'] * 1000, row['failures'], row['bytes'])
+
+_profiler = CommandProfiler()
+
+def get_command_profiler():
+    """Get the profiler shared by all drivers of this process / 获取当前进程所有driver共享的分析器"""
+    return _profiler
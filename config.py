@@ -0,0 +1,15 @@
+import os
+
+# Target OrangeHRM instance / 目标OrangeHRM实例
+BASE_URL = os.environ.get('ORANGEHRM_BASE_URL', 'https://opensource-demo.orangehrmlive.com/').rstrip('/') + '/'
+
+# Login credentials / 登录凭据
+USERNAME = os.environ.get('ORANGEHRM_USERNAME', 'Admin')
+PASSWORD = os.environ.get('ORANGEHRM_PASSWORD', 'admin123')
+
+# Employee photo used by add employee flows / 添加员工流程使用的头像
+IMAGE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Image', '1.jpg')
+
+def app_url(path):
+    """Build absolute URL under the OrangeHRM web root / 构建OrangeHRM站点下的绝对URL"""
+    return f"{BASE_URL}web/index.php/{path.lstrip('/')}"
@@ -0,0 +1,114 @@
+import os
+import pytest
+from session_pool import EdgeSessionPool
+from browser import get_profile, get_cache_mode
+from resource_sampler import ResourceSampler, get_worker_id
+from metrics_aggregation import MetricsSpooler, new_run_id, report_run
+from sample_store import SampleWriter, RUNS_DIR, SAMPLE_SUFFIX, compare_runs
+from employee_data import EmployeeDataPool, EmployeeCleaner
+from protocol_load import cleanup_employees
+from command_profiler import get_command_profiler
+from prometheus_exporter import start_exporter
+from logger_config import setup_logger
+
+# Set up logger / 设置日志记录器
+logger = setup_logger()
+
+def pytest_configure(config):
+    """Share one run id between the controller and xdist workers and start the optional metrics endpoint / 在控制进程与xdist worker间共享运行ID并启动可选的指标端点"""
+    if not hasattr(config, 'workerinput') and not os.environ.get('STRESS_RUN_ID'):
+        # Workers inherit the environment when xdist spawns them / xdist启动worker时会继承环境变量
+        os.environ['STRESS_RUN_ID'] = new_run_id()
+    if not hasattr(config, 'workerinput'):
+        # One endpoint on the controller covers all workers through their spool files / 控制进程上的单个端点通过缓冲文件覆盖所有worker
+        config.prometheus_exporter = start_exporter(os.environ['STRESS_RUN_ID'])
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item, nextitem):
+    """Attribute WebDriver commands, including fixture setup, to the running test / 将WebDriver命令(含fixture准备)归属到当前测试"""
+    profiler = get_command_profiler()
+    profiler.current_test = item.name
+    yield
+    profiler.current_test = None
+
+@pytest.hookimpl(trylast=True)
+def pytest_sessionfinish(session, exitstatus):
+    """Merge worker metrics into the run-wide summary on the controller / 在控制进程上合并各worker指标"""
+    if hasattr(session.config, 'workerinput'):
+        return
+    exporter = getattr(session.config, 'prometheus_exporter', None)
+    if exporter is not None:
+        exporter.stop()
+    run_id = os.environ['STRESS_RUN_ID']
+    try:
+        report_run(run_id)
+    except Exception as e:
+        logger.error("Metrics aggregation failed: %s / 指标聚合失败: %s", e, e)
+
+    run_dir = os.path.join(RUNS_DIR, run_id)
+    if not os.path.isdir(run_dir):
+        return
+    logger.info("Raw samples saved to %s / 原始样本已保存至 %s", run_dir, run_dir)
+
+    # Optional regression gate against a stored baseline / 可选的基线回归检查
+    baseline = os.environ.get('STRESS_BASELINE')
+    if baseline:
+        try:
+            regressions = compare_runs([run_dir], baseline,
+                                       float(os.environ.get('STRESS_P95_THRESHOLD', 10)),
+                                       float(os.environ.get('STRESS_THROUGHPUT_THRESHOLD', 10)))
+        except (FileNotFoundError, ValueError) as e:
+            logger.error("Baseline comparison failed: %s / 基线比较失败: %s", e, e)
+            session.exitstatus = 1
+            return
+        for regression in regressions:
+            logger.error("Regression: %s / 性能回归: %s", regression, regression)
+        if regressions:
+            session.exitstatus = 1
+
+@pytest.fixture(scope="session")
+def resource_sampler():
+    """Background sampler for this worker's browser processes / 当前worker浏览器进程的后台采样器"""
+    sampler = ResourceSampler().start()
+    yield sampler
+    sampler.stop()
+
+@pytest.fixture(scope="session")
+def sample_writer(resource_sampler):
+    """Stream this worker's raw samples to the run's sample store / 将当前worker的原始样本流式写入运行样本存储"""
+    path = os.path.join(RUNS_DIR, os.environ['STRESS_RUN_ID'], f"{get_worker_id()}{SAMPLE_SUFFIX}")
+    writer = SampleWriter(path, meta={
+        'run_id': os.environ['STRESS_RUN_ID'],
+        'worker': get_worker_id(),
+        'profile': os.environ.get('STRESS_TEST_PROFILE'),
+        'browser_profile': get_profile(),
+        'browser_cache': get_cache_mode(),
+        'network_profile': os.environ.get('NETWORK_PROFILE', 'none'),
+    })
+    resource_sampler.writer = writer
+    yield writer
+    resource_sampler.writer = None
+    writer.close()
+
+@pytest.fixture(scope="session")
+def metrics_spooler(resource_sampler):
+    """Stream this worker's metrics to the controller through a spool file / 通过缓冲文件将当前worker指标传给控制进程"""
+    spooler = MetricsSpooler(os.environ['STRESS_RUN_ID'], sampler=resource_sampler, profiler=get_command_profiler()).start()
+    yield spooler
+    spooler.stop()
+
+@pytest.fixture(scope="session")
+def session_pool(resource_sampler):
+    """Warm browser session pool shared by this worker / 当前worker共享的预热浏览器会话池"""
+    pool = EdgeSessionPool(sampler=resource_sampler)
+    pool.prelaunch()
+    yield pool
+    pool.close()
+
+@pytest.fixture(scope="session")
+def employee_data():
+    """Collision-free employee records of this worker, deleted after the session / 当前worker的无冲突员工记录, 会话结束后删除"""
+    pool = EmployeeDataPool()
+    cleaner = EmployeeCleaner(pool, cleanup_employees).start()
+    yield pool
+    cleaner.stop()
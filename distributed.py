@@ -0,0 +1,512 @@
+import os
+import sys
+import json
+import glob
+import time
+import base64
+import socket
+import asyncio
+import argparse
+from load_scheduler import parse_profile
+from metrics_aggregation import new_run_id
+from sample_store import RunStats, RUNS_DIR, SAMPLE_SUFFIX
+from employee_data import DEFAULT_ID_PREFIX
+from logger_config import setup_logger
+
+# Set up logger / 设置日志记录器
+logger = setup_logger()
+
+# Default coordinator settings / 默认协调器设置
+DEFAULT_PORT = 7700
+DEFAULT_REGISTER_TIMEOUT = 120.0
+DEFAULT_HEARTBEAT_TIMEOUT = 15.0
+DEFAULT_START_DELAY = 20.0
+DEFAULT_PROGRESS_INTERVAL = 10.0
+
+# Agent settings / agent设置
+HEARTBEAT_INTERVAL = 2.0
+STREAM_INTERVAL = 1.0
+CHUNK_SIZE = 256 * 1024
+# Newline-delimited JSON messages carry base64 chunks / 以换行分隔的JSON消息携带base64数据块
+STREAM_LIMIT = 4 * 1024 * 1024
+
+# Separates the agent name from the worker file name in the merged run / 合并运行中分隔agent名和worker文件名
+AGENT_SEPARATOR = '--'
+
+# Distributed run summary written by the coordinator / 协调器写出的分布式运行摘要
+DISTRIBUTED_SUMMARY_FILE = 'distributed_summary.json'
+
+async def send_message(writer, message):
+    """Send one JSON message / 发送一条JSON消息"""
+    writer.write(json.dumps(message).encode('utf-8') + b'\n')
+    await writer.drain()
+
+async def receive_message(reader):
+    """Receive one JSON message, None when the peer is gone / 接收一条JSON消息, 对端断开时返回None"""
+    try:
+        line = await reader.readline()
+    except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+        return None
+    if not line:
+        return None
+    return json.loads(line)
+
+def split_evenly(total, weights):
+    """Split an integer total by weights with the largest-remainder method / 以最大余数法按权重拆分整数"""
+    weight_sum = sum(weights)
+    shares = [total * weight / weight_sum for weight in weights]
+    counts = [int(share) for share in shares]
+    by_remainder = sorted(range(len(weights)), key=lambda index: shares[index] - counts[index], reverse=True)
+    for index in by_remainder[:total - sum(counts)]:
+        counts[index] += 1
+    return counts
+
+class AgentLink:
+    """Coordinator-side state of one registered agent / 协调器端已注册agent的状态"""
+    def __init__(self, name, mode, capacity, host, reader, writer):
+        self.name = name
+        self.mode = mode
+        self.capacity = capacity
+        self.host = host
+        self.reader = reader
+        self.writer = writer
+        self.offset = 0.0
+        self.status = 'registered'
+        self.exit_code = None
+        self.assignment = None
+        self.bytes_received = 0
+        self.last_seen = time.monotonic()
+
+    def public_assignment(self):
+        """Assignment without its env, safe to log and save; credentials only travel over the agent socket / 去掉env的任务, 可安全记录和保存; 凭据只经agent连接发送"""
+        if self.assignment is None:
+            return None
+        public = {key: value for key, value in self.assignment.items() if key != 'env'}
+        public['id_prefix'] = self.assignment.get('env', {}).get('TEST_DATA_ID_PREFIX')
+        return public
+
+class Coordinator:
+    """Splits the load across agents, starts them together and merges their samples into one run / 将负载拆分给各agent, 同时启动并把样本合并为一次运行
+
+    Agents register over TCP; each agent's sample files are streamed back as they grow and stored
+    under Runs/<run_id>/<agent>--<file>, so the merged run keeps per-agent attribution.
+    agent通过TCP注册；各agent的样本文件随写入实时回传, 保存为 Runs/<run_id>/<agent>--<文件>, 合并后的运行保留agent归属。
+    """
+    def __init__(self, args):
+        self.args = args
+        self.run_id = args.run_id or f"{new_run_id()}_distributed"
+        self.run_dir = os.path.join(RUNS_DIR, self.run_id)
+        self.agents = {}
+        self._registered = asyncio.Event()
+        self._finished = asyncio.Event()
+
+    async def _handshake(self, reader, writer):
+        """Register an agent and measure its clock offset / 注册agent并测量其时钟偏差"""
+        message = await receive_message(reader)
+        if not message or message.get('type') != 'register':
+            writer.close()
+            return None
+        name = message['agent']
+        if name in self.agents or len(self.agents) >= self.args.agents:
+            await send_message(writer, {'type': 'reject', 'reason': f"duplicate agent or run is full: {name}"})
+            writer.close()
+            return None
+        sent = time.time()
+        await send_message(writer, {'type': 'ping', 'sent': sent})
+        reply = await receive_message(reader)
+        received = time.time()
+        if not reply or reply.get('type') != 'pong':
+            writer.close()
+            return None
+        agent = AgentLink(name, message.get('mode', 'browser'), float(message.get('capacity', 1)),
+                          writer.get_extra_info('peername'), reader, writer)
+        # NTP-style estimate: agent clock minus coordinator clock / NTP式估计: agent时钟减协调器时钟
+        agent.offset = reply['time'] - (sent + received) / 2
+        self.agents[name] = agent
+        logger.info("Agent %s registered from %s (%s, capacity %g, clock offset %.1fms) / agent %s 已从 %s 注册 (%s, 容量 %g, 时钟偏差 %.1f毫秒)",
+                    name, agent.host, agent.mode, agent.capacity, agent.offset * 1000, name, agent.host, agent.mode, agent.capacity, agent.offset * 1000)
+        if len(self.agents) >= self.args.agents:
+            self._registered.set()
+        return agent
+
+    async def _handle(self, reader, writer):
+        """Serve one agent connection / 处理一个agent连接"""
+        agent = await self._handshake(reader, writer)
+        if agent is None:
+            return
+        while True:
+            message = await receive_message(reader)
+            if message is None:
+                break
+            agent.last_seen = time.monotonic()
+            kind = message.get('type')
+            if kind == 'samples':
+                self._store_chunk(agent, message)
+            elif kind == 'done':
+                agent.exit_code = message.get('exit_code')
+                agent.status = 'done'
+                logger.info("Agent %s finished with exit code %s / agent %s 已结束, 退出码 %s", agent.name, agent.exit_code, agent.name, agent.exit_code)
+                break
+        if agent.status != 'done':
+            self._mark_lost(agent, "connection closed / 连接已关闭")
+        writer.close()
+        self._check_finished()
+
+    def _store_chunk(self, agent, message):
+        """Append a streamed sample chunk to the agent's copy of the file / 将回传的样本数据块追加到该agent的文件副本"""
+        name = os.path.basename(message['file'])
+        path = os.path.join(self.run_dir, f"{agent.name}{AGENT_SEPARATOR}{name}")
+        data = base64.b64decode(message['data'])
+        os.makedirs(self.run_dir, exist_ok=True)
+        with open(path, 'r+b' if os.path.exists(path) else 'wb') as f:
+            f.seek(message['offset'])
+            f.write(data)
+        agent.bytes_received += len(data)
+
+    def _mark_lost(self, agent, reason):
+        """Record a lost agent; its samples so far stay in the run / 记录失联的agent；已收到的样本保留在运行中"""
+        if agent.status in ('done', 'lost'):
+            return
+        agent.status = 'lost'
+        logger.error("Agent %s lost: %s / agent %s 失联: %s", agent.name, reason, agent.name, reason)
+        agent.writer.close()
+
+    def _check_finished(self):
+        """Finish once every agent is done or lost / 所有agent结束或失联后完成"""
+        if self.agents and all(agent.status in ('done', 'lost') for agent in self.agents.values()):
+            self._finished.set()
+
+    def build_assignments(self):
+        """Split the load between agents of each mode by capacity / 按容量在同一模式的agent之间拆分负载"""
+        args = self.args
+        agents = sorted(self.agents.values(), key=lambda agent: agent.name)
+        env = {key: value for key, value in (
+            ('ORANGEHRM_BASE_URL', args.base_url),
+            ('ORANGEHRM_USERNAME', args.username),
+            ('ORANGEHRM_PASSWORD', args.password),
+        ) if value}
+        # Distinct ID prefixes keep employee IDs unique across hosts / 不同的ID前缀保证各主机间员工ID唯一
+        width = len(str(len(agents) - 1))
+        for index, agent in enumerate(agents):
+            agent.assignment = {'env': dict(env, TEST_DATA_ID_PREFIX=f"{args.id_prefix}{index:0{width}d}")}
+
+        browser = [agent for agent in agents if agent.mode == 'browser']
+        if browser:
+            weights = [agent.capacity for agent in browser]
+            iterations = split_evenly(args.iterations, weights) if args.iterations else [None] * len(browser)
+            profile = parse_profile(args.profile) if args.profile else None
+            for agent, count in zip(browser, iterations):
+                share = agent.capacity / sum(weights)
+                agent.assignment.update({
+                    'iterations': count,
+                    'profile': profile.scaled(share).to_spec() if profile else None,
+                    'duration': args.duration,
+                })
+        protocol = [agent for agent in agents if agent.mode == 'protocol']
+        if protocol:
+            users = split_evenly(args.users, [agent.capacity for agent in protocol])
+            for agent, count in zip(protocol, users):
+                agent.assignment.update({'users': count, 'iterations': args.user_iterations, 'ramp_up': args.ramp_up})
+
+    async def _start_all(self):
+        """Send assignments with one shared start time in each agent's clock / 以各agent时钟下的同一开始时间下发任务"""
+        self.build_assignments()
+        start_at = time.time() + self.args.start_delay
+        for agent in self.agents.values():
+            message = dict(agent.assignment, type='assign', run_id=self.run_id, start_at=start_at + agent.offset)
+            try:
+                await send_message(agent.writer, message)
+                agent.status = 'running'
+                agent.last_seen = time.monotonic()
+            except ConnectionError as e:
+                self._mark_lost(agent, str(e))
+            public = agent.public_assignment()
+            logger.info("Agent %s assigned %s / agent %s 已分配 %s", agent.name, public, agent.name, public)
+        logger.info("Load starts in %.0fs / 负载将在 %.0f 秒后开始", self.args.start_delay, self.args.start_delay)
+
+    async def _watch(self):
+        """Detect lost agents and log live progress / 检测失联agent并输出实时进度"""
+        next_progress = time.monotonic() + self.args.progress_interval
+        while not self._finished.is_set():
+            await asyncio.sleep(1)
+            now = time.monotonic()
+            for agent in self.agents.values():
+                if agent.status == 'running' and now - agent.last_seen > self.args.heartbeat_timeout:
+                    self._mark_lost(agent, f"no heartbeat for {now - agent.last_seen:.0f}s / {now - agent.last_seen:.0f} 秒无心跳")
+            self._check_finished()
+            if self.args.progress_interval > 0 and now >= next_progress:
+                next_progress = now + self.args.progress_interval
+                self.log_progress()
+
+    def load_stats(self, live=False):
+        """Run-wide and per-agent stats from the streamed samples / 根据回传样本计算整体及各agent统计"""
+        total = RunStats(self.run_id)
+        per_agent = {}
+        if not os.path.isdir(self.run_dir):
+            return total, per_agent
+        for name in sorted(self.agents):
+            stats = RunStats.load(self.run_dir, prefix=f"{name}{AGENT_SEPARATOR}", live=live)
+            per_agent[name] = stats
+            total.merge(stats)
+        return total, per_agent
+
+    def log_progress(self):
+        """Log live totals / 输出实时汇总"""
+        total, per_agent = self.load_stats(live=True)
+        states = ', '.join(f"{name}:{agent.status}:{per_agent[name].passed + per_agent[name].failed if name in per_agent else 0}"
+                           for name, agent in sorted(self.agents.items()))
+        p95 = total.iterations.percentile(95)
+        logger.info("Progress: %s iterations, %s failed, p95 %.3fs, %.2f iterations/s [%s] / 进度: %s 次迭代, %s 次失败, p95 %.3f秒, %.2f 次迭代/秒 [%s]",
+                    total.passed + total.failed, total.failed, p95, total.throughput, states,
+                    total.passed + total.failed, total.failed, p95, total.throughput, states)
+
+    def report(self):
+        """Log and save the merged result with per-agent breakdown / 输出并保存包含各agent明细的合并结果"""
+        total, per_agent = self.load_stats()
+
+        def describe(stats):
+            return dict(stats.iterations.percentiles(), iterations=stats.passed + stats.failed, failed=stats.failed,
+                        throughput=stats.throughput, errors=stats.errors)
+
+        agents = {}
+        for name, agent in sorted(self.agents.items()):
+            stats = per_agent.get(name, RunStats(name))
+            agents[name] = dict(describe(stats), status=agent.status, exit_code=agent.exit_code, mode=agent.mode,
+                                host=str(agent.host), assignment=agent.public_assignment(), clock_offset=agent.offset)
+            logger.info("Agent %s (%s): %s iterations, %s failed, p95 %.3fs, %.2f iterations/s / agent %s (%s): %s 次迭代, %s 次失败, p95 %.3f秒, %.2f 次迭代/秒",
+                        name, agent.status, agents[name]['iterations'], stats.failed, agents[name]['p95'], stats.throughput,
+                        name, agent.status, agents[name]['iterations'], stats.failed, agents[name]['p95'], stats.throughput)
+        summary = describe(total)
+        logger.info("Distributed run %s: %s iterations, %s failed, p50/p95/p99 %.3f/%.3f/%.3fs, %.2f iterations/s / 分布式运行 %s: %s 次迭代, %s 次失败, p50/p95/p99 %.3f/%.3f/%.3f秒, %.2f 次迭代/秒",
+                    self.run_id, summary['iterations'], summary['failed'], summary['p50'], summary['p95'], summary['p99'], summary['throughput'],
+                    self.run_id, summary['iterations'], summary['failed'], summary['p50'], summary['p95'], summary['p99'], summary['throughput'])
+        with open(DISTRIBUTED_SUMMARY_FILE, 'w', encoding='utf-8') as f:
+            json.dump({'run_id': self.run_id, 'summary': summary, 'agents': agents}, f, indent=2)
+        logger.info("Distributed summary saved to %s, samples in %s / 分布式摘要已保存至 %s, 样本位于 %s",
+                    DISTRIBUTED_SUMMARY_FILE, self.run_dir, DISTRIBUTED_SUMMARY_FILE, self.run_dir)
+        return agents
+
+    async def run(self):
+        """Serve agents until the run is over and return the exit code / 服务agent直至运行结束并返回退出码"""
+        server = await asyncio.start_server(self._handle, self.args.host, self.args.port, limit=STREAM_LIMIT)
+        logger.info("Coordinator listening on %s:%s for %s agents, run %s / 协调器在 %s:%s 等待 %s 个agent, 运行 %s",
+                    self.args.host, self.args.port, self.args.agents, self.run_id, self.args.host, self.args.port, self.args.agents, self.run_id)
+        try:
+            try:
+                await asyncio.wait_for(self._registered.wait(), self.args.register_timeout)
+            except asyncio.TimeoutError:
+                logger.error("Only %s of %s agents registered / 仅 %s/%s 个agent完成注册", len(self.agents), self.args.agents, len(self.agents), self.args.agents)
+                return 1
+            await self._start_all()
+            await self._watch()
+        finally:
+            server.close()
+            for agent in self.agents.values():
+                agent.writer.close()
+        agents = self.report()
+        healthy = all(agent['status'] == 'done' and agent['exit_code'] == 0 for agent in agents.values())
+        return 0 if healthy else 1
+
+class SampleTailer:
+    """Follow the sample files of a directory and return what was appended since the last call / 跟踪目录中的样本文件并返回上次调用以来追加的数据"""
+    def __init__(self, directory):
+        self.directory = directory
+        self.offsets = {}
+
+    def read_new(self):
+        """Yield (file name, offset, data) chunks / 产出 (文件名, 偏移, 数据) 数据块"""
+        for path in sorted(glob.glob(os.path.join(self.directory, f'*{SAMPLE_SUFFIX}'))):
+            name = os.path.basename(path)
+            offset = self.offsets.get(name, 0)
+            try:
+                with open(path, 'rb') as f:
+                    f.seek(offset)
+                    while True:
+                        data = f.read(CHUNK_SIZE)
+                        if not data:
+                            break
+                        yield name, offset, data
+                        offset += len(data)
+            except OSError as e:
+                logger.debug("Cannot read %s: %s / 无法读取 %s: %s", path, e, path, e)
+            self.offsets[name] = offset
+
+class Agent:
+    """Runs the assigned browser or protocol workers and streams their samples to the coordinator / 运行分配的浏览器或协议worker, 并将样本回传给协调器"""
+    def __init__(self, args):
+        self.args = args
+        self.name = args.name or f"{socket.gethostname()}-{os.getpid()}"
+        self.process = None
+
+    def build_command(self, assignment, sample_dir):
+        """Child command of the assignment / 任务对应的子进程命令"""
+        root = os.path.dirname(os.path.abspath(__file__))
+        if self.args.mode == 'protocol':
+            return [sys.executable, os.path.join(root, 'protocol_load.py'),
+                    '--users', str(assignment['users']), '--iterations', str(assignment['iterations']),
+                    '--ramp-up', str(assignment['ramp_up']), '--samples', os.path.join(sample_dir, f"protocol{SAMPLE_SUFFIX}")]
+        tests = 'test_open_loop_stress' if assignment.get('profile') else 'test_full_process_stress'
+        command = [sys.executable, '-m', 'pytest', os.path.join(root, 'stress_test_orangehrm.py'), '-q', '-k', f"{tests} or test_performance_summary"]
+        if self.args.workers:
+            command += ['-n', str(self.args.workers)]
+        return command
+
+    def build_env(self, assignment, local_run_id):
+        """Child environment of the assignment / 任务对应的子进程环境"""
+        env = os.environ.copy()
+        env.update(assignment.get('env', {}))
+        env['PYTHONUNBUFFERED'] = '1'
+        env['STRESS_RUN_ID'] = local_run_id
+        env['STRESS_START_AT'] = repr(assignment['start_at'])
+        for key, setting in (('STRESS_TEST_ITERATIONS', 'iterations'), ('STRESS_TEST_PROFILE', 'profile'), ('STRESS_TEST_DURATION', 'duration')):
+            env.pop(key, None)
+            if self.args.mode == 'browser' and assignment.get(setting) is not None:
+                env[key] = str(assignment[setting])
+        return env
+
+    async def _stream(self, writer, tailer):
+        """Send new sample data, or a heartbeat when there is none / 发送新的样本数据, 无数据时发送心跳"""
+        last_sent = 0.0
+        while True:
+            # Checked before reading, so the data flushed on exit is still sent / 先检查再读取, 确保退出时刷新的数据仍会发送
+            exited = self.process.returncode is not None
+            sent = False
+            for name, offset, data in tailer.read_new():
+                await send_message(writer, {'type': 'samples', 'file': name, 'offset': offset, 'data': base64.b64encode(data).decode('ascii')})
+                sent = True
+            if sent or time.monotonic() - last_sent >= HEARTBEAT_INTERVAL:
+                if not sent:
+                    await send_message(writer, {'type': 'heartbeat', 'time': time.time()})
+                last_sent = time.monotonic()
+            if exited:
+                return
+            await asyncio.sleep(STREAM_INTERVAL)
+
+    async def _execute(self, writer, assignment):
+        """Run the child process while streaming its samples / 运行子进程并回传其样本"""
+        local_run_id = f"{assignment['run_id']}_{self.name}"
+        sample_dir = os.path.join(RUNS_DIR, local_run_id)
+        os.makedirs(sample_dir, exist_ok=True)
+        command = self.build_command(assignment, sample_dir)
+        logger.info("Agent %s starting: %s / agent %s 启动: %s", self.name, ' '.join(command), self.name, ' '.join(command))
+        self.process = await asyncio.create_subprocess_exec(*command, env=self.build_env(assignment, local_run_id))
+        # Returns after the child has exited and its last samples are sent / 子进程退出且最后的样本发送后返回
+        await self._stream(writer, SampleTailer(sample_dir))
+        exit_code = await self.process.wait()
+        await send_message(writer, {'type': 'done', 'exit_code': exit_code})
+        return exit_code
+
+    async def run(self):
+        """Register, wait for the assignment and run it / 注册, 等待任务并执行"""
+        host, _, port = self.args.coordinator.rpartition(':')
+        reader, writer = await asyncio.open_connection(host or 'localhost', int(port or DEFAULT_PORT), limit=STREAM_LIMIT)
+        await send_message(writer, {'type': 'register', 'agent': self.name, 'mode': self.args.mode, 'capacity': self.args.capacity})
+        try:
+            while True:
+                message = await receive_message(reader)
+                if message is None:
+                    logger.error("Coordinator connection closed / 与协调器的连接已关闭")
+                    return 1
+                if message['type'] == 'ping':
+                    await send_message(writer, {'type': 'pong', 'time': time.time()})
+                elif message['type'] == 'reject':
+                    logger.error("Registration rejected: %s / 注册被拒绝: %s", message['reason'], message['reason'])
+                    return 1
+                elif message['type'] == 'assign':
+                    return await self._execute(writer, message)
+        except ConnectionError as e:
+            logger.error("Lost the coordinator: %s / 与协调器失去联系: %s", e, e)
+            return 1
+        finally:
+            if self.process is not None and self.process.returncode is None:
+                self.process.terminate()
+                await self.process.wait()
+            writer.close()
+
+def add_load_arguments(parser):
+    """Coordinator arguments describing the load / 描述负载的协调器参数"""
+    parser.add_argument('--agents', type=int, required=True, help="Agents to wait for / 等待的agent数量")
+    parser.add_argument('--run-id', help="Run id of the merged run / 合并运行的运行ID")
+    parser.add_argument('--iterations', type=int, help="Total browser iterations, split by capacity / 浏览器迭代总数, 按容量拆分")
+    parser.add_argument('--profile', help="Open-loop profile for all browser agents together / 所有浏览器agent合计的开环负载曲线")
+    parser.add_argument('--duration', type=float, help="Browser run duration limit in seconds / 浏览器运行时长限制(秒)")
+    parser.add_argument('--users', type=int, default=10, help="Total protocol virtual users, split by capacity / 协议虚拟用户总数, 按容量拆分")
+    parser.add_argument('--user-iterations', type=int, default=10, help="Iterations per protocol user / 每个协议用户的迭代次数")
+    parser.add_argument('--ramp-up', type=float, default=0, help="Protocol user ramp-up seconds / 协议用户启动分散秒数")
+    parser.add_argument('--base-url', help="Target OrangeHRM URL for all agents / 所有agent的目标OrangeHRM地址")
+    parser.add_argument('--username', help="Login username / 登录用户名")
+    parser.add_argument('--password', help="Login password / 登录密码")
+    parser.add_argument('--id-prefix', default=os.environ.get('TEST_DATA_ID_PREFIX', DEFAULT_ID_PREFIX), help="Employee ID prefix, extended per agent / 员工ID前缀, 按agent扩展")
+    parser.add_argument('--start-delay', type=float, default=DEFAULT_START_DELAY, help="Seconds between assignment and the shared start / 从下发任务到共同开始的秒数")
+    parser.add_argument('--register-timeout', type=float, default=DEFAULT_REGISTER_TIMEOUT, help="Seconds to wait for all agents / 等待所有agent的秒数")
+    parser.add_argument('--heartbeat-timeout', type=float, default=DEFAULT_HEARTBEAT_TIMEOUT, help="Seconds of silence before an agent is lost / 判定agent失联的静默秒数")
+    parser.add_argument('--progress-interval', type=float, default=DEFAULT_PROGRESS_INTERVAL, help="Seconds between progress lines, 0 disables / 进度输出间隔秒数, 0为关闭")
+
+def add_agent_arguments(parser):
+    """Arguments describing an agent / 描述agent的参数"""
+    parser.add_argument('--mode', choices=['browser', 'protocol'], default='browser', help="Workers this agent runs / 当前agent运行的worker类型")
+    parser.add_argument('--capacity', type=float, default=1, help="Relative share of the load / 负载的相对份额")
+    parser.add_argument('--workers', help="xdist workers of a browser agent / 浏览器agent的xdist worker数")
+
+def run_local(args):
+    """Coordinator plus agent subprocesses on this machine, for testing / 在本机运行协调器和agent子进程, 用于测试"""
+    agents = []
+    for index in range(args.agents):
+        command = [sys.executable, os.path.abspath(__file__), 'agent', '--coordinator', f"127.0.0.1:{args.port}",
+                   '--name', f"local{index + 1}", '--mode', args.mode, '--capacity', str(args.capacity)]
+        if args.workers:
+            command += ['--workers', str(args.workers)]
+        agents.append(command)
+
+    async def main():
+        coordinator = Coordinator(args)
+        task = asyncio.create_task(coordinator.run())
+        await asyncio.sleep(0.5)
+        processes = [await asyncio.create_subprocess_exec(*command) for command in agents]
+        try:
+            return await task
+        finally:
+            for process in processes:
+                if process.returncode is None:
+                    process.terminate()
+                await process.wait()
+
+    return asyncio.run(main())
+
+def main(argv=None):
+    """Command line entry point / 命令行入口"""
+    parser = argparse.ArgumentParser(description="Distributed stress runs / 分布式压力测试")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    coordinator = commands.add_parser('coordinator', help="Split the load and merge results / 拆分负载并合并结果")
+    coordinator.add_argument('--host', default='0.0.0.0', help="Listen address / 监听地址")
+    coordinator.add_argument('--port', type=int, default=DEFAULT_PORT, help="Listen port / 监听端口")
+    add_load_arguments(coordinator)
+
+    agent = commands.add_parser('agent', help="Run workers for a coordinator / 为协调器运行worker")
+    agent.add_argument('--coordinator', required=True, help="Coordinator host:port / 协调器 主机:端口")
+    agent.add_argument('--name', help="Unique agent name, defaults to host-pid / 唯一的agent名称, 默认 主机-进程号")
+    add_agent_arguments(agent)
+
+    local = commands.add_parser('local', help="Coordinator and agents as local processes / 以本地进程运行协调器和agent")
+    local.add_argument('--port', type=int, default=DEFAULT_PORT, help="Coordinator port / 协调器端口")
+    add_load_arguments(local)
+    add_agent_arguments(local)
+
+    args = parser.parse_args(argv)
+    try:
+        if args.command == 'coordinator':
+            return asyncio.run(Coordinator(args).run())
+        if args.command == 'agent':
+            return asyncio.run(Agent(args).run())
+        args.host = '127.0.0.1'
+        return run_local(args)
+    except KeyboardInterrupt:
+        logger.info("Distributed run interrupted / 分布式运行被中断")
+        return 130
+    except (OSError, ValueError) as e:
+        logger.error("Distributed run failed: %s / 分布式运行失败: %s", e, e)
+        return 1
+
+if __name__ == "__main__":
+    raise SystemExit(main())
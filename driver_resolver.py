@@ -0,0 +1,123 @@
+import os
+import json
+import time
+import threading
+from webdriver_manager.microsoft import EdgeChromiumDriverManager
+from logger_config import setup_logger
+
+# Set up logger / 设置日志记录器
+logger = setup_logger()
+
+# On-disk cache location / 磁盘缓存位置
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.driver_cache')
+CACHE_FILE = os.path.join(CACHE_DIR, 'msedgedriver.json')
+LOCK_FILE = os.path.join(CACHE_DIR, 'msedgedriver.lock')
+
+# Cache entry lifetime when no run id is available / 无运行ID时缓存条目的有效期
+DEFAULT_CACHE_TTL = 24 * 60 * 60
+
+_resolved_path = None
+_resolve_lock = threading.Lock()
+
+class FileLock:
+    """Cross-process exclusive file lock / 跨进程排他文件锁"""
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def __enter__(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._file = open(self.path, 'a+')
+        if os.name == 'nt':
+            import msvcrt
+            while True:
+                try:
+                    self._file.seek(0)
+                    msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    time.sleep(0.1)
+        else:
+            import fcntl
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if os.name == 'nt':
+            import msvcrt
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        self._file.close()
+        self._file = None
+
+def get_run_id():
+    """Get identifier shared by all workers of this run / 获取本次运行所有worker共享的标识"""
+    return os.environ.get('STRESS_RUN_ID') or os.environ.get('PYTEST_XDIST_TESTRUNUID')
+
+def _read_cache():
+    """Read cached driver entry / 读取缓存的驱动条目"""
+    try:
+        with open(CACHE_FILE, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _write_cache(path):
+    """Atomically write cached driver entry / 原子写入缓存的驱动条目"""
+    entry = {'path': path, 'run_id': get_run_id(), 'resolved_at': time.time()}
+    temp_file = f"{CACHE_FILE}.{os.getpid()}.tmp"
+    with open(temp_file, 'w', encoding='utf-8') as f:
+        json.dump(entry, f)
+    os.replace(temp_file, CACHE_FILE)
+
+def _is_fresh(entry, offline):
+    """Check whether a cache entry can be reused / 检查缓存条目是否可复用"""
+    if not entry or not os.path.isfile(entry.get('path', '')):
+        return False
+    if offline:
+        return True
+    run_id = get_run_id()
+    if run_id:
+        return entry.get('run_id') == run_id
+    try:
+        ttl = float(os.environ.get('DRIVER_CACHE_TTL', DEFAULT_CACHE_TTL))
+    except ValueError:
+        ttl = DEFAULT_CACHE_TTL
+    return time.time() - entry.get('resolved_at', 0) < ttl
+
+def _resolve():
+    """Resolve msedgedriver path from pin, cache or download / 从固定路径、缓存或下载解析msedgedriver路径"""
+    pinned_path = os.environ.get('EDGE_DRIVER_PATH')
+    if pinned_path:
+        if not os.path.isfile(pinned_path):
+            raise FileNotFoundError(f"Pinned EdgeDriver not found: {pinned_path} / 未找到固定的EdgeDriver: {pinned_path}")
+        logger.info("Using pinned EdgeDriver: %s / 使用固定的EdgeDriver: %s", pinned_path, pinned_path)
+        return pinned_path
+
+    offline = os.environ.get('EDGE_DRIVER_OFFLINE', '0') == '1'
+    entry = _read_cache()
+    if _is_fresh(entry, offline):
+        return entry['path']
+
+    with FileLock(LOCK_FILE):
+        # Another worker may have resolved it while we waited / 等待期间其他worker可能已完成解析
+        entry = _read_cache()
+        if _is_fresh(entry, offline):
+            return entry['path']
+        if offline:
+            raise FileNotFoundError("No cached EdgeDriver available in offline mode / 离线模式下没有可用的EdgeDriver缓存")
+        logger.info("Resolving EdgeDriver with webdriver_manager / 使用webdriver_manager解析EdgeDriver")
+        path = EdgeChromiumDriverManager().install()
+        _write_cache(path)
+        return path
+
+def resolve_edge_driver():
+    """Resolve msedgedriver once per process and run / 每个进程每次运行仅解析一次msedgedriver"""
+    global _resolved_path
+    with _resolve_lock:
+        if _resolved_path is None:
+            _resolved_path = _resolve()
+        return _resolved_path
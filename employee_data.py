@@ -0,0 +1,186 @@
+import os
+import json
+import threading
+from collections import deque
+from driver_resolver import FileLock
+from logger_config import setup_logger
+
+# Set up logger / 设置日志记录器
+logger = setup_logger()
+
+# Allocation state shared by all workers and runs on this machine / 本机所有worker和运行共享的分配状态
+STATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.test_data')
+COUNTER_FILE = os.path.join(STATE_DIR, 'id_counter.json')
+
+# OrangeHRM employee IDs are at most 10 characters / OrangeHRM员工ID最长10个字符
+MAX_ID_LENGTH = 10
+DEFAULT_ID_PREFIX = '418'
+DEFAULT_POOL_SIZE = 100
+NAME_PREFIX = 'Castorice'
+
+def _env_flag(name, default):
+    """Read a 0/1 environment flag / 读取0/1环境变量开关"""
+    return os.environ.get(name, '1' if default else '0') != '0'
+
+def reserve_block(size, prefix=None):
+    """Reserve a range of ID numbers no other worker or run will get / 预留其他worker和运行不会分配到的ID编号区间"""
+    prefix = prefix if prefix is not None else os.environ.get('TEST_DATA_ID_PREFIX', DEFAULT_ID_PREFIX)
+    capacity = 10 ** (MAX_ID_LENGTH - len(prefix))
+    with FileLock(f"{COUNTER_FILE}.lock"):
+        try:
+            with open(COUNTER_FILE, encoding='utf-8') as f:
+                counters = json.load(f)
+        except (OSError, ValueError):
+            counters = {}
+        start = counters.get(prefix, 0)
+        if start + size > capacity:
+            # Wrap around; the oldest IDs were cleaned up long ago / 回绕；最早的ID早已被清理
+            logger.warning("Employee ID space of prefix %s exhausted, wrapping around / 前缀 %s 的员工ID空间已用尽, 从头开始", prefix, prefix)
+            start = 0
+        counters[prefix] = start + size
+        temp_file = f"{COUNTER_FILE}.tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(counters, f)
+        os.replace(temp_file, COUNTER_FILE)
+    return prefix, range(start, start + size)
+
+class EmployeeRecord:
+    """Names and ID of one employee to create / 待创建员工的姓名和ID"""
+    __slots__ = ('employee_id', 'first_name', 'middle_name', 'last_name', 'emp_number')
+
+    def __init__(self, employee_id, name):
+        self.employee_id = employee_id
+        self.first_name = name
+        self.middle_name = name
+        self.last_name = name
+        self.emp_number = None
+
+    @property
+    def name(self):
+        """Display name used in logs / 日志中使用的显示名称"""
+        return self.first_name
+
+    def __repr__(self):
+        return f"EmployeeRecord({self.employee_id!r}, {self.first_name!r})"
+
+class EmployeeDataPool:
+    """Pre-generated, collision-free employee records for one worker / 当前worker预生成的无冲突员工记录
+
+    IDs come from blocks reserved under a file lock, so workers and successive runs never overlap.
+    With reuse enabled, a record goes back into the pool once its employee has been deleted.
+    ID来自文件锁下预留的编号区间，worker之间及前后运行之间不会重叠；开启复用时，员工被删除后其记录回到池中。
+    """
+    def __init__(self, size=None, reuse=None, prefix=None):
+        self.size = size or int(os.environ.get('TEST_DATA_POOL_SIZE', DEFAULT_POOL_SIZE))
+        self.reuse = _env_flag('TEST_DATA_REUSE', False) if reuse is None else reuse
+        self.prefix = prefix
+        self.created = []
+        self._free = deque()
+        self._lock = threading.Lock()
+        self._refill()
+
+    def _refill(self):
+        """Reserve another block and generate its records / 预留新的编号区间并生成记录"""
+        prefix, numbers = reserve_block(self.size, self.prefix)
+        width = MAX_ID_LENGTH - len(prefix)
+        self._free.extend(EmployeeRecord(f"{prefix}{number:0{width}d}", f"{NAME_PREFIX}{prefix}{number}") for number in numbers)
+        logger.debug("Reserved employee IDs %s%s-%s%s / 已预留员工ID %s%s-%s%s", prefix, numbers.start, prefix, numbers.stop - 1, prefix, numbers.start, prefix, numbers.stop - 1)
+
+    def allocate(self):
+        """Take an unused record / 取出一条未使用的记录"""
+        with self._lock:
+            if not self._free:
+                self._refill()
+            return self._free.popleft()
+
+    def release(self, record):
+        """Return a record whose employee was never created / 归还未创建员工的记录"""
+        with self._lock:
+            self._free.appendleft(record)
+
+    def mark_created(self, record, emp_number=None):
+        """Remember a created employee for cleanup / 记录已创建的员工以便清理"""
+        record.emp_number = emp_number
+        with self._lock:
+            self.created.append(record)
+
+    def take_created(self, limit=None):
+        """Hand created records over to the cleaner / 将已创建记录交给清理器"""
+        with self._lock:
+            limit = len(self.created) if limit is None else limit
+            taken, self.created = self.created[:limit], self.created[limit:]
+        return taken
+
+    def pending_cleanup(self):
+        """Number of created employees not yet handed to the cleaner / 尚未交给清理器的已创建员工数"""
+        with self._lock:
+            return len(self.created)
+
+    def recycle(self, records):
+        """Make records of deleted employees available again if reuse is on / 开启复用时使已删除员工的记录可再次使用"""
+        if not self.reuse:
+            return
+        with self._lock:
+            for record in records:
+                record.emp_number = None
+                self._free.append(record)
+
+class EmployeeCleaner:
+    """Delete the employees a run created, in batches on a background thread / 在后台线程中分批删除本次运行创建的员工
+
+    `delete` receives a list of records and returns the ones that were deleted.
+    `delete` 接收记录列表并返回已删除的记录。
+    """
+    def __init__(self, pool, delete, batch_size=None, interval=None):
+        self.pool = pool
+        self.delete = delete
+        self.batch_size = batch_size or int(os.environ.get('TEST_DATA_DELETE_BATCH', 50))
+        self.interval = interval or float(os.environ.get('TEST_DATA_CLEANUP_INTERVAL', 30))
+        self.enabled = _env_flag('TEST_DATA_CLEANUP', True)
+        self.deleted = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def flush(self, limit=None):
+        """Delete created employees now / 立即删除已创建的员工"""
+        records = self.pool.take_created(limit)
+        if not records:
+            return 0
+        try:
+            deleted = self.delete(records)
+        except Exception as e:
+            logger.error("Employee cleanup failed: %s / 员工清理失败: %s", e, e)
+            return 0
+        self.deleted += len(deleted)
+        self.pool.recycle(deleted)
+        if len(deleted) < len(records):
+            logger.warning("Deleted %s of %s employees / 已删除 %s/%s 名员工", len(deleted), len(records), len(deleted), len(records))
+        return len(deleted)
+
+    def _run(self):
+        """Recycle full batches during the run when reuse is on / 开启复用时在运行期间回收整批记录"""
+        while not self._stop.wait(self.interval):
+            while self.pool.pending_cleanup() >= self.batch_size:
+                if not self.flush(self.batch_size):
+                    break
+
+    def start(self):
+        """Start background cleanup when records are reused / 复用记录时启动后台清理"""
+        if self.enabled and self.pool.reuse and self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="employee-cleaner", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the thread and delete everything that is left / 停止线程并删除剩余的全部员工"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval * 2)
+            self._thread = None
+        if not self.enabled:
+            if self.pool.pending_cleanup():
+                logger.info("Cleanup disabled, keeping %s created employees / 清理已关闭, 保留 %s 名已创建员工", self.pool.pending_cleanup(), self.pool.pending_cleanup())
+            return
+        self.flush()
+        if self.deleted:
+            logger.info("Deleted %s employees created by this worker / 已删除当前worker创建的 %s 名员工", self.deleted, self.deleted)
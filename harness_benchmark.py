@@ -0,0 +1,335 @@
+import os
+import sys
+import json
+import time
+import queue
+import random
+import logging
+import argparse
+import platform
+import statistics
+import tempfile
+from logging.handlers import QueueListener
+from selenium.common.exceptions import NoSuchElementException
+from histogram import LogLinearHistogram
+from performance_metrics import PerformanceMetrics
+from sample_store import SampleWriter, SAMPLE_SUFFIX
+from spans import span
+from command_profiler import CommandProfiler
+from iteration_engine import IterationEngine
+from pages import BasePage
+from logger_config import LOGGER_NAME, LazyQueueHandler, ContextFilter, JsonFormatter, setup_logger
+import standin_server
+
+# Set up logger / 设置日志记录器
+logger = setup_logger()
+
+# Default benchmark settings / 默认基准测试设置
+DEFAULT_CALLS = 10000
+DEFAULT_REPEATS = 5
+DEFAULT_WAIT_TRIALS = 10
+DEFAULT_ITERATIONS = 2000
+DEFAULT_THRESHOLD = 20
+DEFAULT_STANDIN_PORT = 18080
+
+# Results written for regression checks / 用于回归检查的结果文件
+BENCHMARK_FILE = 'harness_benchmark.json'
+
+# Step spans of one add employee iteration / 一次添加员工迭代的步骤span
+ITERATION_STEPS = ('pim_navigation', 'open_form', 'fill_form', 'photo_upload', 'save', 'toast')
+
+# Element added to the stand-in page after a delay / 延迟后加入替身页面的元素
+APPEAR_SCRIPT = """
+var old = document.getElementById('bench-target');
+if (old) { old.remove(); }
+setTimeout(function () {
+    var button = document.createElement('button');
+    button.id = 'bench-target';
+    button.textContent = 'target';
+    document.body.appendChild(button);
+}, arguments[0]);
+"""
+TARGET = ('css selector', '#bench-target')
+
+def result(value, unit, **extra):
+    """One benchmark result / 单个基准测试结果"""
+    return dict(extra, value=value, unit=unit)
+
+def per_call(func, calls, repeats):
+    """Median and best microseconds per call of func(index) / func(index)每次调用的中位数和最佳微秒数"""
+    timings = []
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        for index in range(calls):
+            func(index)
+        timings.append((time.perf_counter() - start_time) / calls * 1e6)
+    return result(statistics.median(timings), 'us', best=min(timings), calls=calls, repeats=repeats)
+
+class _FormatAndDiscard(logging.Handler):
+    """Formats like the file handler but writes nothing / 与文件处理程序一样格式化但不写出"""
+    def emit(self, record):
+        self.format(record)
+
+def benchmark_logger():
+    """Logger wired like setup_logger(), with a listener that discards output / 与setup_logger()相同结构、输出被丢弃的日志记录器"""
+    bench_logger = logging.getLogger(f"{LOGGER_NAME}.benchmark")
+    log_queue = queue.SimpleQueue()
+    handler = LazyQueueHandler(log_queue)
+    handler.addFilter(ContextFilter('benchmark'))
+    bench_logger.handlers = [handler]
+    bench_logger.setLevel(logging.INFO)
+    bench_logger.propagate = False
+    sink = _FormatAndDiscard()
+    sink.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+    listener = QueueListener(log_queue, sink)
+    listener.start()
+    return bench_logger, listener
+
+def bench_metrics(calls, repeats):
+    """Cost of each metrics recording call / 各指标记录调用的开销"""
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        writer = SampleWriter(os.path.join(directory, f"benchmark{SAMPLE_SUFFIX}"))
+        metrics = PerformanceMetrics()
+        metrics.sample_writer = writer
+        results['metrics.record_step'] = per_call(lambda i: metrics.record_step('add_employee/save', 0.25), calls, repeats)
+        results['metrics.record_result'] = per_call(lambda i: metrics.record_result(1.5, True), calls, repeats)
+        results['metrics.record_error'] = per_call(lambda i: metrics.record_error('timeout', 'Timeout waiting for element'), calls, repeats)
+        results['metrics.record_metrics'] = per_call(lambda i: metrics.record_metrics(), max(1, calls // 10), repeats)
+
+        def nested_span(i):
+            with span('add_employee', metrics):
+                with span('save'):
+                    pass
+        results['span.nested'] = per_call(nested_span, calls, repeats)
+        writer.close()
+    histogram = LogLinearHistogram()
+    results['histogram.record'] = per_call(lambda i: histogram.record(0.25), calls, repeats)
+    profiler = CommandProfiler()
+    results['command_profiler.record'] = per_call(lambda i: profiler.record('findElement', 0.004, 120), calls, repeats)
+    return results
+
+def bench_logging(calls, repeats):
+    """Caller-side cost of log calls and listener-side formatting cost / 日志调用在调用方的开销及监听线程的格式化开销"""
+    bench_logger, listener = benchmark_logger()
+    try:
+        results = {
+            'logging.info': per_call(lambda i: bench_logger.info("Completed iteration %s/%s / 完成第 %s/%s 次迭代", i, calls, i, calls), calls, repeats),
+            'logging.debug_filtered': per_call(lambda i: bench_logger.debug("Wait '%s' took %.3fs / 等待 '%s' 耗时 %.3f秒", 'x', 0.1, 'x', 0.1), calls, repeats),
+        }
+    finally:
+        listener.stop()
+    record = logging.LogRecord(LOGGER_NAME, logging.INFO, __file__, 0, "Completed iteration %s/%s / 完成第 %s/%s 次迭代", (1, 10, 1, 10), None)
+    record.worker, record.iteration, record.step = 'benchmark', 1, 'add_employee/save'
+    text_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    json_formatter = JsonFormatter()
+    results['logging.format_text'] = per_call(lambda i: text_formatter.format(record), calls, repeats)
+    results['logging.format_json'] = per_call(lambda i: json_formatter.format(record), calls, repeats)
+    return results
+
+class _FakeElement:
+    """Element that is always displayed and enabled / 始终可见且可用的元素"""
+    def is_displayed(self):
+        return True
+
+    def is_enabled(self):
+        return True
+
+    def click(self):
+        pass
+
+class _DelayedDriver:
+    """Driver whose element appears at a set time, without implicit waits / 元素在设定时间出现、无隐式等待的driver"""
+    def __init__(self):
+        self.appear_at = 0.0
+
+    def find_element(self, by, value):
+        if time.perf_counter() < self.appear_at:
+            raise NoSuchElementException(value)
+        return _FakeElement()
+
+    def execute_script(self, script, *args):
+        return None
+
+def _lateness(wait, arm, trials, seed=1):
+    """Seconds between the element appearing and wait() returning / 元素出现到wait()返回之间的秒数"""
+    rng = random.Random(seed)
+    delays = []
+    for _ in range(trials):
+        appear_at = arm(rng.uniform(0.05, 0.3))
+        wait()
+        delays.append(time.perf_counter() - appear_at)
+    return result(statistics.mean(delays) * 1000, 'ms', max=max(delays) * 1000, trials=trials)
+
+def bench_waits(trials):
+    """Polling latency of the page wait helpers on a simulated driver / 在模拟driver上测量页面等待助手的轮询延迟"""
+    driver = _DelayedDriver()
+    page = BasePage(driver)
+    locator = ('css selector', '#target')
+
+    def arm(delay):
+        driver.appear_at = time.perf_counter() + delay
+        return driver.appear_at
+
+    return {
+        'wait.find_poll': _lateness(lambda: page.find(locator), arm, trials),
+        'wait.click_poll': _lateness(lambda: page.click(locator), arm, trials),
+        'wait.readiness_poll': _lateness(lambda: page.readiness.wait_for(lambda d: time.perf_counter() >= driver.appear_at, 'benchmark'), arm, trials),
+    }
+
+def bench_noop_iteration(iterations, repeats):
+    """Harness cost of one iteration whose steps do nothing / 步骤为空操作的单次迭代的框架开销"""
+    bench_logger, listener = benchmark_logger()
+    metrics = PerformanceMetrics()
+    engine = IterationEngine(metrics)
+
+    def iteration(i):
+        engine.begin()
+        bench_logger.info("Starting iteration %s/%s / 开始第 %s/%s 次迭代", i + 1, iterations, i + 1, iterations)
+        metrics.start_test(i)
+        with span('add_employee', metrics):
+            for step in ITERATION_STEPS:
+                engine.step(step, lambda: None)
+                with span(step):
+                    pass
+        metrics.record_response_time(0.0)
+        latency = metrics.end_test(True)
+        engine.record_result(True)
+        bench_logger.info("Completed iteration %s/%s / 完成第 %s/%s 次迭代", i + 1, iterations, i + 1, iterations, extra={'latency': latency})
+
+    try:
+        return {'iteration.noop': per_call(iteration, iterations, repeats)}
+    finally:
+        listener.stop()
+
+def bench_browser(port, trials, iterations):
+    """Driver startup, wait latency and no-op iteration overhead in Edge against the stand-in / 针对替身服务在Edge中测量driver启动、等待延迟和空迭代开销"""
+    from browser import create_edge_driver
+    from session_pool import EdgeSessionPool
+    server = standin_server.launch(port=port)
+    results = {}
+    try:
+        login_url = standin_server.base_url(port=port) + 'web/index.php/auth/login'
+        startups = []
+        for _ in range(max(1, min(trials, 3))):
+            start_time = time.perf_counter()
+            driver = create_edge_driver()
+            startups.append(time.perf_counter() - start_time)
+            driver.quit()
+        results['browser.driver_startup'] = result(statistics.mean(startups), 's', max=max(startups), trials=len(startups))
+
+        pool = EdgeSessionPool(size=1, max_uses=trials * 2 + 1)
+        pool.prelaunch()
+        try:
+            checkouts = []
+            for _ in range(trials):
+                start_time = time.perf_counter()
+                session = pool.checkout()
+                checkouts.append(time.perf_counter() - start_time)
+                pool.checkin(session)
+            results['browser.pool_checkout'] = result(statistics.mean(checkouts) * 1000, 'ms', max=max(checkouts) * 1000, trials=trials)
+
+            session = pool.checkout()
+            driver = session.driver
+            driver.get(login_url)
+            page = BasePage(driver)
+
+            def arm(delay):
+                driver.execute_script(APPEAR_SCRIPT, int(delay * 1000))
+                return time.perf_counter() + delay
+
+            results['browser.find_latency'] = _lateness(lambda: page.find(TARGET), arm, trials)
+            results['browser.click_latency'] = _lateness(lambda: page.click(TARGET), arm, trials)
+
+            # The same command with and without the harness around it / 同一命令在有无框架包裹时的对比
+            raw = per_call(lambda i: driver.execute_script("return 1;"), iterations, 1)
+            metrics = PerformanceMetrics()
+            engine = IterationEngine(metrics)
+
+            def iteration(i):
+                engine.begin()
+                metrics.start_test(i)
+                with span('add_employee', metrics):
+                    engine.step('noop', lambda: driver.execute_script("return 1;"))
+                engine.record_result(True)
+                metrics.end_test(True)
+
+            wrapped = per_call(iteration, iterations, 1)
+            results['browser.command'] = raw
+            results['browser.iteration_overhead'] = result(wrapped['value'] - raw['value'], 'us', command=raw['value'], iteration=wrapped['value'])
+            pool.checkin(session)
+        finally:
+            pool.close()
+    finally:
+        server.terminate()
+        server.wait()
+    return results
+
+def compare(results, baseline, threshold):
+    """Results slower than the baseline by more than threshold percent / 比基线慢超过阈值百分比的结果"""
+    regressions = []
+    for name, entry in results.items():
+        previous = baseline.get(name)
+        if not previous or 'value' not in entry or 'value' not in previous or previous['value'] <= 0:
+            continue
+        change = (entry['value'] - previous['value']) / previous['value'] * 100
+        if change > threshold:
+            regressions.append(f"{name}: {previous['value']:.3f} -> {entry['value']:.3f}{entry['unit']} ({change:+.1f}%)")
+    return regressions
+
+def main(argv=None):
+    """Command line entry point / 命令行入口"""
+    parser = argparse.ArgumentParser(description="Benchmark the overhead of the test harness itself / 测量测试框架自身的开销")
+    parser.add_argument('--calls', type=int, default=DEFAULT_CALLS, help="Calls per micro-benchmark / 每个微基准的调用次数")
+    parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS, help="Repeats, the median is reported / 重复次数, 报告中位数")
+    parser.add_argument('--iterations', type=int, default=DEFAULT_ITERATIONS, help="No-op iterations / 空迭代次数")
+    parser.add_argument('--wait-trials', type=int, default=DEFAULT_WAIT_TRIALS, help="Trials per wait helper / 每个等待助手的试验次数")
+    parser.add_argument('--browser', action='store_true', help="Also measure Edge startup and waits against the stand-in / 同时针对替身服务测量Edge启动和等待")
+    parser.add_argument('--standin-port', type=int, default=DEFAULT_STANDIN_PORT, help="Stand-in port for --browser / --browser使用的替身服务端口")
+    parser.add_argument('--output', default=BENCHMARK_FILE, help="Results file / 结果文件")
+    parser.add_argument('--baseline', help="Earlier results file to compare against / 用于比较的历史结果文件")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help="Allowed slowdown in percent / 允许的变慢百分比")
+    args = parser.parse_args(argv)
+
+    results = {}
+    results.update(bench_metrics(args.calls, args.repeats))
+    results.update(bench_logging(args.calls, args.repeats))
+    results.update(bench_noop_iteration(args.iterations, args.repeats))
+    results.update(bench_waits(args.wait_trials))
+    if args.browser:
+        try:
+            results.update(bench_browser(args.standin_port, args.wait_trials, args.iterations))
+        except Exception as e:
+            logger.error("Browser benchmarks failed: %s / 浏览器基准测试失败: %s", e, e)
+            results['browser'] = {'skipped': str(e)}
+
+    for name, entry in results.items():
+        if 'value' in entry:
+            logger.info("%s: %.3f%s / %s: %.3f%s", name, entry['value'], entry['unit'], name, entry['value'], entry['unit'])
+
+    report = {
+        'timestamp': time.time(),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    logger.info("Benchmark results saved to %s / 基准测试结果已保存至 %s", args.output, args.output)
+
+    if args.baseline:
+        try:
+            with open(args.baseline, encoding='utf-8') as f:
+                baseline = json.load(f)['results']
+        except (OSError, ValueError, KeyError) as e:
+            logger.error("Cannot read baseline %s: %s / 无法读取基线 %s: %s", args.baseline, e, args.baseline, e)
+            return 2
+        regressions = compare(results, baseline, args.threshold)
+        for regression in regressions:
+            logger.error("Regression: %s / 性能回归: %s", regression, regression)
+        if regressions:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,130 @@
+import math
+from array import array
+
+# Default resolution: 2^7 sub-buckets per power of two, ~0.8% relative error / 默认精度: 每个2的幂128个子桶, 相对误差约0.8%
+DEFAULT_SUB_BUCKET_BITS = 7
+# Default largest trackable value in units (2^36 us is about 19 hours) / 默认可跟踪的最大值(2^36微秒约19小时)
+DEFAULT_MAX_EXPONENT = 36
+
+class LogLinearHistogram:
+    """Fixed-size, mergeable log-linear (HDR-style) histogram / 固定大小、可合并的对数线性(HDR风格)直方图
+
+    Values are scaled by ``unit`` into integers; each power-of-two range is split
+    into linear sub-buckets, so memory is constant and relative error is bounded.
+    数值按 ``unit`` 缩放为整数；每个2的幂区间划分为线性子桶，内存固定且相对误差有界。
+    """
+    def __init__(self, unit=1e-6, sub_bucket_bits=DEFAULT_SUB_BUCKET_BITS, max_exponent=DEFAULT_MAX_EXPONENT):
+        self.unit = unit
+        self.sub_bucket_bits = sub_bucket_bits
+        self.max_exponent = max_exponent
+        self.sub_bucket_count = 1 << sub_bucket_bits
+        self.half_count = self.sub_bucket_count // 2
+        size = self.sub_bucket_count + (max_exponent - sub_bucket_bits) * self.half_count
+        self.counts = array('q', bytes(8 * size))
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _index(self, scaled):
+        """Bucket index for a scaled integer value / 缩放后整数值对应的桶索引"""
+        if scaled < self.sub_bucket_count:
+            return scaled
+        exponent = scaled.bit_length() - self.sub_bucket_bits
+        if exponent > self.max_exponent - self.sub_bucket_bits:
+            return len(self.counts) - 1
+        return self.sub_bucket_count + (exponent - 1) * self.half_count + (scaled >> exponent) - self.half_count
+
+    def _bucket_value(self, index):
+        """Representative (mid-point) value of a bucket in original units / 桶的代表值(中点), 使用原始单位"""
+        if index < self.sub_bucket_count:
+            return index * self.unit
+        exponent = (index - self.sub_bucket_count) // self.half_count + 1
+        mantissa = (index - self.sub_bucket_count) % self.half_count + self.half_count
+        lower = mantissa << exponent
+        return (lower + ((1 << exponent) - 1) / 2) * self.unit
+
+    def record(self, value, count=1):
+        """Record a value / 记录一个数值"""
+        scaled = max(0, int(value / self.unit))
+        self.counts[self._index(scaled)] += count
+        self.count += count
+        self.total += value * count
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other):
+        """Add another histogram with the same layout into this one / 合并另一个布局相同的直方图"""
+        if len(other.counts) != len(self.counts) or other.unit != self.unit:
+            raise ValueError("Cannot merge histograms with different layouts / 无法合并布局不同的直方图")
+        for index, bucket_count in enumerate(other.counts):
+            if bucket_count:
+                self.counts[index] += bucket_count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def mean(self):
+        """Arithmetic mean / 算术平均值"""
+        return self.total / self.count if self.count else 0
+
+    def percentile(self, percent):
+        """Value at the given percentile (0-100) / 给定百分位(0-100)的数值"""
+        if not self.count:
+            return 0
+        if percent >= 100:
+            return self.max
+        target = max(1, math.ceil(self.count * percent / 100))
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                return min(max(self._bucket_value(index), self.min), self.max)
+        return self.max
+
+    def cumulative_counts(self, bounds):
+        """Counts of values at or below each sorted bound, by bucket mid-point / 按桶中点统计不超过各有序上界的数值个数"""
+        counts = [0] * len(bounds)
+        for index, bucket_count in enumerate(self.counts):
+            if not bucket_count:
+                continue
+            value = self._bucket_value(index)
+            for position, bound in enumerate(bounds):
+                if value <= bound:
+                    counts[position] += bucket_count
+        return counts
+
+    def percentiles(self, percents=(50, 90, 95, 99)):
+        """Summary percentiles plus max / 汇总百分位及最大值"""
+        summary = {f"p{percent:g}": self.percentile(percent) for percent in percents}
+        summary['max'] = self.max if self.count else 0
+        return summary
+
+    def to_dict(self):
+        """Serialize to a sparse dictionary / 序列化为稀疏字典"""
+        return {
+            'unit': self.unit,
+            'sub_bucket_bits': self.sub_bucket_bits,
+            'max_exponent': self.max_exponent,
+            'count': self.count,
+            'total': self.total,
+            'min': self.min if self.count else None,
+            'max': self.max if self.count else None,
+            'buckets': {str(index): bucket_count for index, bucket_count in enumerate(self.counts) if bucket_count},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Deserialize from to_dict() output / 从to_dict()输出反序列化"""
+        histogram = cls(data['unit'], data['sub_bucket_bits'], data['max_exponent'])
+        for index, bucket_count in data['buckets'].items():
+            histogram.counts[int(index)] = bucket_count
+        histogram.count = data['count']
+        histogram.total = data['total']
+        if data['count']:
+            histogram.min = data['min']
+            histogram.max = data['max']
+        return histogram
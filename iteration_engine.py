@@ -0,0 +1,178 @@
+import os
+import re
+import time
+import threading
+from collections import deque
+from selenium.common.exceptions import (
+    TimeoutException, NoSuchElementException, StaleElementReferenceException, ElementClickInterceptedException,
+    InvalidSessionIdException, NoSuchWindowException, WebDriverException,
+)
+from pages import FormError
+from logger_config import setup_logger
+
+# Set up logger / 设置日志记录器
+logger = setup_logger()
+
+# Failure classes / 失败类别
+TIMEOUT = 'timeout'
+LOCATOR_MISSING = 'locator_missing'
+CLICK_INTERCEPTED = 'click_intercepted'
+SERVER_ERROR = 'server_error'
+VALIDATION_ERROR = 'validation_error'
+SESSION_LOST = 'session_lost'
+OTHER = 'other'
+
+# Default engine settings / 默认引擎设置
+DEFAULT_RETRY_BUDGET = 2
+DEFAULT_RETRY_ERRORS = (TIMEOUT, CLICK_INTERCEPTED, SERVER_ERROR, VALIDATION_ERROR)
+DEFAULT_BREAKER_ERROR_RATE = 0.5
+DEFAULT_BREAKER_WINDOW = 60
+DEFAULT_BREAKER_MIN_ITERATIONS = 10
+
+# Error pages of the server or a proxy in front of it / 服务器或其前置代理的错误页面
+SERVER_ERROR_PAGE = re.compile(r'HTTP ERROR 5\d\d|\b5\d\d\b.*(Error|Bad Gateway|Unavailable|Timeout)|Internal Server Error|Service Unavailable|Bad Gateway', re.IGNORECASE)
+# Client errors in a rejected form, e.g. 'HTTP 422' from the API / 被拒绝表单中的客户端错误, 如API返回的'HTTP 422'
+CLIENT_ERROR_STATUS = re.compile(r'\b4\d\d\b')
+# WebDriver messages of a browser or driver that has gone away / 浏览器或驱动已退出时的WebDriver消息
+SESSION_LOST_MESSAGE = re.compile(r'invalid session id|session deleted|disconnected|not reachable|target window already closed', re.IGNORECASE)
+
+def _env_number(name, default, cast=float):
+    """Read a numeric setting from environment variable / 从环境变量读取数值设置"""
+    try:
+        return cast(os.environ.get(name, default))
+    except (ValueError, TypeError):
+        return default
+
+def get_retry_errors():
+    """Failure classes retried within the budget, from ITERATION_RETRY_ERRORS / 从ITERATION_RETRY_ERRORS获取预算内重试的失败类别"""
+    spec = os.environ.get('ITERATION_RETRY_ERRORS')
+    if spec is None:
+        return set(DEFAULT_RETRY_ERRORS)
+    return {name.strip() for name in spec.split(',') if name.strip()}
+
+def _server_error_page(driver):
+    """Whether the browser shows a 5xx error page / 浏览器是否显示5xx错误页面"""
+    try:
+        text = driver.execute_script("return document.title + ' ' + (document.body ? document.body.innerText.slice(0, 500) : '');")
+    except WebDriverException:
+        return False
+    return bool(text and SERVER_ERROR_PAGE.search(text))
+
+def classify_error(error, driver=None):
+    """Failure class of an exception; with a driver, timeouts on a 5xx page count as server errors / 异常的失败类别；提供driver时, 5xx页面上的超时计为服务器错误"""
+    if isinstance(error, FormError):
+        if error.field or CLIENT_ERROR_STATUS.search(str(error)):
+            return VALIDATION_ERROR
+        return SERVER_ERROR
+    if isinstance(error, ElementClickInterceptedException):
+        return CLICK_INTERCEPTED
+    if isinstance(error, (NoSuchElementException, StaleElementReferenceException)):
+        return LOCATOR_MISSING
+    if isinstance(error, TimeoutException):
+        if driver is not None and _server_error_page(driver):
+            return SERVER_ERROR
+        return TIMEOUT
+    if isinstance(error, (InvalidSessionIdException, NoSuchWindowException)):
+        return SESSION_LOST
+    if isinstance(error, WebDriverException) and SESSION_LOST_MESSAGE.search(str(error)):
+        return SESSION_LOST
+    return OTHER
+
+class StepFailed(Exception):
+    """A step failed after its retries / 步骤在重试后仍然失败"""
+    def __init__(self, step, error_class, error):
+        super().__init__(f"{step}: {error_class}: {error}")
+        self.step = step
+        self.error_class = error_class
+        self.error = error
+
+class CircuitOpen(Exception):
+    """The error rate tripped the circuit breaker / 错误率触发了熔断器"""
+
+class CircuitBreaker:
+    """Trips when the iteration error rate over a sliding time window reaches a threshold / 滑动时间窗口内迭代错误率达到阈值时触发
+
+    Needs at least `min_iterations` results in the window, so a single early failure does not stop a run.
+    窗口内至少有 `min_iterations` 个结果时才判断，单个早期失败不会终止运行。
+    """
+    def __init__(self, error_rate=None, window_seconds=None, min_iterations=None):
+        self.error_rate = error_rate if error_rate is not None else _env_number('CIRCUIT_BREAKER_ERROR_RATE', DEFAULT_BREAKER_ERROR_RATE)
+        self.window_seconds = window_seconds or _env_number('CIRCUIT_BREAKER_WINDOW', DEFAULT_BREAKER_WINDOW)
+        self.min_iterations = min_iterations or _env_number('CIRCUIT_BREAKER_MIN_ITERATIONS', DEFAULT_BREAKER_MIN_ITERATIONS, int)
+        self.results = deque()
+        self.failures = 0
+        self.tripped = None
+        self._lock = threading.Lock()
+
+    def record(self, success, timestamp=None):
+        """Add an iteration result, tripping when the window's error rate is too high / 加入迭代结果, 窗口错误率过高时触发"""
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            self.results.append((timestamp, success))
+            self.failures += 0 if success else 1
+            while self.results and self.results[0][0] < timestamp - self.window_seconds:
+                self.failures -= 0 if self.results.popleft()[1] else 1
+            total = len(self.results)
+            if self.tripped is None and self.error_rate > 0 and total >= self.min_iterations and self.failures / total >= self.error_rate:
+                self.tripped = f"{self.failures}/{total} iterations failed in the last {self.window_seconds:.0f}s"
+                logger.error("Circuit breaker tripped: %s / 熔断器触发: 最近 %.0f 秒内 %s/%s 次迭代失败",
+                             self.tripped, self.window_seconds, self.failures, total)
+        return self.tripped is None
+
+    def check(self):
+        """Raise CircuitOpen once tripped / 触发后抛出CircuitOpen"""
+        if self.tripped is not None:
+            raise CircuitOpen(self.tripped)
+
+class IterationEngine:
+    """Runs iteration steps with classified failures and a per-iteration retry budget / 以失败分类和每次迭代的重试预算执行迭代步骤
+
+    Every failed attempt is counted under its class; failures of ITERATION_RETRY_ERRORS classes are
+    retried while ITERATION_RETRY_BUDGET retries of the iteration remain. Iteration results feed the
+    circuit breaker, which is the only thing that stops a run early.
+    每次失败的尝试按类别计数；ITERATION_RETRY_ERRORS中类别的失败在本次迭代剩余ITERATION_RETRY_BUDGET
+    次重试内重试。迭代结果输入熔断器，只有熔断器会提前终止运行。
+    """
+    def __init__(self, metrics, retry_budget=None, retry_errors=None, breaker=None):
+        self.metrics = metrics
+        self.retry_budget = retry_budget if retry_budget is not None else _env_number('ITERATION_RETRY_BUDGET', DEFAULT_RETRY_BUDGET, int)
+        self.retry_errors = retry_errors if retry_errors is not None else get_retry_errors()
+        self.breaker = breaker or CircuitBreaker()
+        self._local = threading.local()
+
+    def begin(self):
+        """Reset the retry budget for a new iteration on this thread / 为当前线程的新迭代重置重试预算"""
+        self.breaker.check()
+        self._local.retries = self.retry_budget
+
+    def record_result(self, success):
+        """Feed an iteration result to the circuit breaker / 将迭代结果输入熔断器"""
+        self.breaker.record(success)
+
+    def step(self, name, action, driver=None, recover=None):
+        """Run action(), retrying classified failures within the budget / 执行action(), 在预算内重试已分类的失败
+
+        `recover(error_class)` runs before each retry, e.g. to reopen a form. Raises StepFailed when the
+        failure is not retryable or the budget is spent.
+        每次重试前执行 `recover(error_class)`, 例如重新打开表单。失败不可重试或预算用尽时抛出StepFailed。
+        """
+        while True:
+            try:
+                return action()
+            except Exception as e:
+                error_class = classify_error(e, driver)
+                self.metrics.record_error(error_class, f"{name}: {str(e)}")
+                retries = getattr(self._local, 'retries', self.retry_budget)
+                if error_class not in self.retry_errors or retries <= 0:
+                    raise StepFailed(name, error_class, e) from e
+                self._local.retries = retries - 1
+                self.metrics.record_retry(error_class)
+                logger.warning("Retrying step '%s' after %s (%s retries left) / 步骤 '%s' 发生 %s 后重试 (剩余 %s 次)",
+                               name, error_class, retries - 1, name, error_class, retries - 1)
+            if recover is not None:
+                try:
+                    recover(error_class)
+                except Exception as e:
+                    recover_class = classify_error(e, driver)
+                    self.metrics.record_error(recover_class, f"{name} recovery: {str(e)}")
+                    raise StepFailed(name, recover_class, e) from e
@@ -0,0 +1,215 @@
+import os
+import math
+import time
+import threading
+import concurrent.futures
+from logger_config import setup_logger
+
+# Set up logger / 设置日志记录器
+logger = setup_logger()
+
+# Time before the intended start at which we stop sleeping and spin / 距离计划开始多久时停止休眠改为自旋
+SPIN_THRESHOLD = 0.002
+
+class Segment:
+    """Linear rate segment in iterations/s / 以迭代/秒为单位的线性速率段"""
+    def __init__(self, duration, start_rate, end_rate=None):
+        if duration <= 0:
+            raise ValueError(f"Segment duration must be positive: {duration} / 段持续时间必须为正: {duration}")
+        self.duration = float(duration)
+        self.start_rate = float(start_rate)
+        self.end_rate = float(start_rate if end_rate is None else end_rate)
+
+    def rate_at(self, t):
+        """Rate at offset t within the segment / 段内偏移t处的速率"""
+        return self.start_rate + (self.end_rate - self.start_rate) * t / self.duration
+
+    def arrivals_within(self, t):
+        """Expected arrivals between segment start and offset t / 段开始到偏移t之间的期望到达数"""
+        slope = (self.end_rate - self.start_rate) / self.duration
+        return self.start_rate * t + slope * t * t / 2
+
+    def time_for(self, arrivals):
+        """Offset at which the given arrivals have accumulated / 累计到达给定数量时的偏移"""
+        slope = (self.end_rate - self.start_rate) / self.duration
+        if slope == 0:
+            return arrivals / self.start_rate if self.start_rate > 0 else math.inf
+        discriminant = self.start_rate ** 2 + 2 * slope * arrivals
+        if discriminant < 0:
+            return math.inf
+        return (-self.start_rate + math.sqrt(discriminant)) / slope
+
+class LoadProfile:
+    """Piecewise-linear arrival rate profile / 分段线性的到达速率曲线"""
+    def __init__(self, segments):
+        self.segments = list(segments)
+        if not self.segments:
+            raise ValueError("Load profile has no phases / 负载曲线没有阶段")
+
+    @property
+    def duration(self):
+        """Total profile duration in seconds / 曲线总时长(秒)"""
+        return sum(segment.duration for segment in self.segments)
+
+    def expected_iterations(self):
+        """Expected number of iterations over the whole profile / 整个曲线的期望迭代次数"""
+        return sum(segment.arrivals_within(segment.duration) for segment in self.segments)
+
+    def scaled(self, factor):
+        """Copy of the profile with all rates multiplied / 所有速率乘以系数后的曲线副本"""
+        return LoadProfile(Segment(s.duration, s.start_rate * factor, s.end_rate * factor) for s in self.segments)
+
+    def to_spec(self):
+        """Profile spec that parse_profile reads back / parse_profile可读回的曲线描述"""
+        return ','.join(f"ramp:{s.start_rate:g}:{s.end_rate:g}:{s.duration:g}" for s in self.segments)
+
+    def arrival_times(self):
+        """Yield intended start offsets in seconds / 生成计划开始的偏移秒数"""
+        offset = 0.0
+        carried = 0.0  # Arrivals accumulated toward the next start / 向下一次开始累计的到达量
+        for segment in self.segments:
+            position = 0.0
+            while True:
+                needed = 1.0 - carried
+                t = segment.time_for(segment.arrivals_within(position) + needed)
+                if t > segment.duration + 1e-9:
+                    carried += segment.arrivals_within(segment.duration) - segment.arrivals_within(position)
+                    break
+                position = t
+                carried = 0.0
+                yield offset + position
+            offset += segment.duration
+
+def parse_profile(spec):
+    """Parse a profile such as 'ramp:1:50:300,hold:50:600' / 解析如'ramp:1:50:300,hold:50:600'的负载曲线
+
+    Phases / 阶段:
+        ramp:<from_rate>:<to_rate>:<seconds>
+        hold:<rate>:<seconds>
+        step:<from_rate>:<to_rate>:<steps>:<seconds>
+        spike:<base_rate>:<spike_rate>:<seconds>:<spike_start>:<spike_seconds>
+    """
+    segments = []
+    for phase in spec.split(','):
+        kind, *values = phase.strip().split(':')
+        try:
+            numbers = [float(value) for value in values]
+            if kind == 'ramp':
+                start_rate, end_rate, duration = numbers
+                segments.append(Segment(duration, start_rate, end_rate))
+            elif kind == 'hold':
+                rate, duration = numbers
+                segments.append(Segment(duration, rate))
+            elif kind == 'step':
+                start_rate, end_rate, steps, duration = numbers
+                steps = max(1, int(steps))
+                for i in range(steps):
+                    rate = start_rate + (end_rate - start_rate) * i / max(1, steps - 1)
+                    segments.append(Segment(duration / steps, rate))
+            elif kind == 'spike':
+                base_rate, spike_rate, duration, spike_start, spike_length = numbers
+                if spike_start > 0:
+                    segments.append(Segment(spike_start, base_rate))
+                segments.append(Segment(spike_length, spike_rate))
+                if duration > spike_start + spike_length:
+                    segments.append(Segment(duration - spike_start - spike_length, base_rate))
+            else:
+                raise ValueError(f"Unknown phase type: {kind} / 未知的阶段类型: {kind}")
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid load profile phase '{phase}': {str(e)} / 无效的负载阶段 '{phase}': {str(e)}")
+    return LoadProfile(segments)
+
+def sleep_until(deadline):
+    """Sleep until a perf_counter deadline with sub-millisecond precision / 以亚毫秒精度休眠至perf_counter截止时间"""
+    while True:
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            return
+        if remaining > SPIN_THRESHOLD:
+            time.sleep(remaining - SPIN_THRESHOLD)
+
+def wait_for_start(start_at=None):
+    """Block until a shared wall-clock start time, by default STRESS_START_AT / 阻塞至共享的开始时间(默认取STRESS_START_AT)
+
+    Used by distributed agents so every node starts its load at the same moment; returns the seconds waited.
+    分布式agent使用此函数使各节点同时开始施加负载；返回等待的秒数。
+    """
+    if start_at is None:
+        value = os.environ.get('STRESS_START_AT')
+        if not value:
+            return 0.0
+        start_at = float(value)
+    delay = start_at - time.time()
+    if delay <= 0:
+        if delay < -1:
+            logger.warning("Started %.1fs after the shared start time / 晚于共享开始时间 %.1f 秒启动", -delay, -delay)
+        return 0.0
+    logger.info("Waiting %.1fs for the shared start time / 等待 %.1f 秒至共享开始时间", delay, delay)
+    sleep_until(time.perf_counter() + delay)
+    return delay
+
+class OpenLoopScheduler:
+    """Dispatch iterations on a fixed timeline regardless of completions / 按固定时间线派发迭代，不受完成情况影响"""
+    def __init__(self, profile, max_workers, metrics=None, max_iterations=None, max_duration=None):
+        self.profile = profile
+        self.max_workers = max_workers
+        self.metrics = metrics
+        self.max_iterations = max_iterations
+        self.max_duration = max_duration
+        self.in_flight = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def stop(self):
+        """Stop dispatching further iterations / 停止派发后续迭代"""
+        self._stop.set()
+
+    def _run_one(self, task, iteration, intended_start):
+        """Run one iteration and measure from its intended start / 运行一次迭代并从计划开始时间计时"""
+        actual_start = time.perf_counter()
+        if self.metrics is not None:
+            self.metrics.set_iteration(iteration)
+            self.metrics.track_in_flight(1)
+        with self._lock:
+            self.in_flight += 1
+        success = False
+        try:
+            success = bool(task(iteration))
+        except Exception as e:
+            logger.error("Iteration %s raised: %s / 第 %s 次迭代抛出异常: %s", iteration + 1, e, iteration + 1, e)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+            if self.metrics is not None:
+                self.metrics.track_in_flight(-1)
+        end_time = time.perf_counter()
+        latency = end_time - intended_start
+        if self.metrics is not None:
+            self.metrics.record_wait_time('schedule_lag', actual_start - intended_start)
+            self.metrics.record_result(latency, success)
+        return success
+
+    def run(self, task):
+        """Run task(iteration) at each intended start time / 在每个计划开始时间运行task(iteration)"""
+        expected = self.profile.expected_iterations()
+        logger.info("Open-loop run: %.0fs, ~%.0f iterations, %s workers / 开环运行: %.0f秒, 约 %.0f 次迭代, %s 个worker", self.profile.duration, expected, self.max_workers, self.profile.duration, expected, self.max_workers)
+        counts = {'passed': 0, 'total': 0}
+
+        def count_result(future):
+            with self._lock:
+                counts['total'] += 1
+                counts['passed'] += 1 if future.result() else 0
+
+        run_start = time.perf_counter()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for iteration, offset in enumerate(self.profile.arrival_times()):
+                if self._stop.is_set():
+                    break
+                if self.max_iterations is not None and iteration >= self.max_iterations:
+                    break
+                if self.max_duration is not None and offset >= self.max_duration:
+                    break
+                intended_start = run_start + offset
+                sleep_until(intended_start)
+                executor.submit(self._run_one, task, iteration, intended_start).add_done_callback(count_result)
+        return counts['passed'], counts['total']
@@ -1,37 +1,130 @@
-import logging
 import os
+import json
+import queue
+import atexit
+import logging
+import threading
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+from spans import current_path
+
+LOGGER_NAME = 'OrangeHRM_Test'
+LOG_DIR = 'Logs'
+
+# Structured fields written to JSON-lines logs / JSON行日志中写出的结构化字段
+STRUCTURED_FIELDS = ('worker', 'iteration', 'step', 'latency')
+
+_lock = threading.Lock()
+_listener = None
+_context = threading.local()
+
+def set_log_context(**fields):
+    """Attach fields such as the iteration to records logged by this thread / 为当前线程的日志记录附加迭代等字段"""
+    for name, value in fields.items():
+        setattr(_context, name, value)
+
+class ContextFilter(logging.Filter):
+    """Stamp worker, iteration and step on records in the calling thread / 在调用线程中为记录附加worker、迭代和步骤"""
+    def __init__(self, worker):
+        super().__init__()
+        self.worker = worker
+
+    def filter(self, record):
+        record.worker = self.worker
+        if not hasattr(record, 'iteration'):
+            record.iteration = getattr(_context, 'iteration', None)
+        if not hasattr(record, 'step'):
+            record.step = current_path()
+        return True
+
+class LazyQueueHandler(QueueHandler):
+    """Enqueue records unformatted so formatting happens on the listener thread / 入队未格式化的记录，由监听线程完成格式化
+
+    The queue never leaves the process, so the record does not have to be made picklable.
+    Log arguments must therefore not be mutated after the call.
+    队列不会跨进程，因此无需将记录转换为可序列化形式；日志参数在调用后不应再被修改。
+    """
+    def prepare(self, record):
+        return record
+
+class JsonFormatter(logging.Formatter):
+    """Format records as JSON lines with structured fields / 将记录格式化为带结构化字段的JSON行"""
+    def format(self, record):
+        entry = {
+            'timestamp': record.created,
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'message': record.getMessage(),
+        }
+        for field in STRUCTURED_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+def shutdown_logging():
+    """Drain the queue and close the handlers / 清空队列并关闭处理程序"""
+    global _listener
+    with _lock:
+        listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
 
 def setup_logger():
-    """Set up logger with file and console handlers / 设置带有文件和控制台处理程序的日志记录器"""
-    # Create logs directory if it doesn't exist / 如果日志目录不存在则创建
-    if not os.path.exists('Logs'):
-        os.makedirs('Logs')
-    
-    # Create logger / 创建日志记录器
-    logger = logging.getLogger('OrangeHRM_Test')
-    logger.setLevel(logging.DEBUG)
-    
-    # Create formatters / 创建格式化器
-    file_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    console_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-    
-    # Create file handler / 创建文件处理程序
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    file_handler = logging.FileHandler(f'Logs/test_{timestamp}.log', encoding='utf-8')
-    file_handler.setLevel(logging.DEBUG)
-    file_handler.setFormatter(file_formatter)
-    
-    # Create console handler / 创建控制台处理程序
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.INFO)
-    console_handler.setFormatter(console_formatter)
-    
-    # Add handlers to logger / 将处理程序添加到日志记录器
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
-    
-    # Prevent propagation to root logger / 防止传播到根日志记录器
-    logger.propagate = False
-    
-    return logger 
\ No newline at end of file
+    """Set up logger with file and console handlers / 设置带有文件和控制台处理程序的日志记录器
+
+    Safe to call from every module: handlers are created once per process and written by a
+    background listener thread, so log calls only enqueue a record.
+    可在每个模块中调用：处理程序每个进程只创建一次，由后台监听线程写出，日志调用只需入队。
+    """
+    global _listener
+    logger = logging.getLogger(LOGGER_NAME)
+    with _lock:
+        if _listener is not None:
+            return logger
+
+        # Create logs directory if it doesn't exist / 如果日志目录不存在则创建
+        os.makedirs(LOG_DIR, exist_ok=True)
+        worker = os.environ.get('PYTEST_XDIST_WORKER', 'main')
+        json_format = os.environ.get('LOG_FORMAT', 'text').lower() == 'json'
+
+        # Create formatters / 创建格式化器
+        file_formatter = JsonFormatter() if json_format else logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        console_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+
+        # Create file handler, one file per xdist worker / 创建文件处理程序, 每个xdist worker一个文件
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        extension = 'jsonl' if json_format else 'log'
+        file_handler = logging.FileHandler(os.path.join(LOG_DIR, f'test_{timestamp}_{worker}.{extension}'), encoding='utf-8')
+        # A typo must not break every importing module / 拼写错误不应导致所有导入模块失败
+        level_name = os.environ.get('LOG_LEVEL', 'DEBUG').upper()
+        valid_level = level_name in logging.getLevelNamesMapping()
+        file_handler.setLevel(level_name if valid_level else logging.DEBUG)
+        file_handler.setFormatter(file_formatter)
+
+        # Create console handler / 创建控制台处理程序
+        console_handler = logging.StreamHandler()
+        console_handler.setLevel(logging.INFO)
+        console_handler.setFormatter(console_formatter)
+
+        # Log calls only enqueue; the listener thread formats and writes / 日志调用只入队，由监听线程格式化并写出
+        log_queue = queue.SimpleQueue()
+        queue_handler = LazyQueueHandler(log_queue)
+        queue_handler.addFilter(ContextFilter(worker))
+        logger.handlers = [queue_handler]
+        # Records below every handler level are dropped before they are built / 低于所有处理程序级别的记录在创建前即被丢弃
+        logger.setLevel(min(file_handler.level, console_handler.level))
+
+        # Prevent propagation to root logger / 防止传播到根日志记录器
+        logger.propagate = False
+
+        _listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+        if not valid_level:
+            logger.warning("Unknown LOG_LEVEL %r, using DEBUG / 未知的LOG_LEVEL %r, 使用DEBUG", level_name, level_name)
+    return logger
@@ -0,0 +1,180 @@
+import os
+import json
+import glob
+import time
+import shutil
+import threading
+from datetime import datetime
+from performance_metrics import PerformanceMetrics
+from resource_sampler import get_worker_id
+from command_profiler import CommandProfiler
+from logger_config import setup_logger
+
+# Set up logger / 设置日志记录器
+logger = setup_logger()
+
+# Per-worker spool files live here, one directory per run / 各worker的缓冲文件目录, 每次运行一个子目录
+SPOOL_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.metrics_spool')
+
+# Default seconds between worker snapshots / 默认worker快照间隔秒数
+DEFAULT_SPOOL_INTERVAL = 5.0
+
+# Run-wide summary written by the controller / 控制进程写出的整体运行摘要
+SUMMARY_FILE = 'stress_summary.json'
+
+def new_run_id():
+    """Generate a run id shared by the controller and its workers / 生成控制进程与worker共享的运行ID"""
+    return f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}"
+
+def get_spool_dir(run_id):
+    """Spool directory of a run / 某次运行的缓冲目录"""
+    return os.path.join(SPOOL_ROOT, run_id)
+
+class MetricsSpooler:
+    """Periodically write this worker's metrics snapshot to its spool file / 定期将当前worker的指标快照写入缓冲文件
+
+    Snapshots are histograms rather than raw samples, so the cost is independent of the sample rate.
+    快照是直方图而非原始样本，开销与采样频率无关。
+    """
+    def __init__(self, run_id, worker_id=None, interval=None, sampler=None, profiler=None):
+        self.run_id = run_id
+        self.worker_id = worker_id or get_worker_id()
+        self.interval = interval or float(os.environ.get('METRICS_SPOOL_INTERVAL', DEFAULT_SPOOL_INTERVAL))
+        self.sampler = sampler
+        self.profiler = profiler
+        self.path = os.path.join(get_spool_dir(run_id), f"{self.worker_id}.json")
+        self._metrics = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def register(self, metrics):
+        """Include a PerformanceMetrics instance in this worker's snapshots / 将PerformanceMetrics实例纳入快照"""
+        with self._lock:
+            self._metrics.append(metrics)
+
+    def snapshot(self):
+        """Merged snapshot of all registered metrics / 所有已登记指标的合并快照"""
+        merged = PerformanceMetrics()
+        with self._lock:
+            registered = list(self._metrics)
+        for metrics in registered:
+            merged.merge(metrics)
+        return {
+            'worker': self.worker_id,
+            'timestamp': time.time(),
+            'metrics': merged.to_dict(),
+            'resources': self.sampler.series() if self.sampler is not None else [],
+            'commands': self.profiler.to_dict() if self.profiler is not None else {},
+        }
+
+    def flush(self):
+        """Atomically write the current snapshot / 原子写出当前快照"""
+        snapshot = self.snapshot()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_file = f"{self.path}.tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f)
+        os.replace(temp_file, self.path)
+
+    def _run(self):
+        """Snapshot loop / 快照循环"""
+        while not self._stop.wait(self.interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error("Metrics spool failed: %s / 指标缓冲写出失败: %s", e, e)
+
+    def start(self):
+        """Start the background snapshot thread / 启动后台快照线程"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="metrics-spooler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the thread and write the final snapshot / 停止线程并写出最终快照"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval * 2)
+            self._thread = None
+        self.flush()
+
+def load_worker_snapshots(run_id):
+    """Load the latest snapshot of every worker / 加载每个worker的最新快照"""
+    snapshots = {}
+    for path in sorted(glob.glob(os.path.join(get_spool_dir(run_id), '*.json'))):
+        try:
+            with open(path, encoding='utf-8') as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning("Skipping unreadable spool file %s: %s / 跳过无法读取的缓冲文件 %s: %s", path, e, path, e)
+            continue
+        snapshots[snapshot['worker']] = snapshot
+    return snapshots
+
+def aggregate_run(run_id):
+    """Merge worker snapshots into one run-wide PerformanceMetrics / 将各worker快照合并为整体PerformanceMetrics
+
+    Returns (merged_metrics, {worker: metrics}, {worker: resource_series}).
+    返回 (合并后的指标, {worker: 指标}, {worker: 资源序列})。
+    """
+    merged = PerformanceMetrics()
+    per_worker = {}
+    resources = {}
+    for worker, snapshot in load_worker_snapshots(run_id).items():
+        metrics = PerformanceMetrics.from_dict(snapshot['metrics'])
+        per_worker[worker] = metrics
+        resources[worker] = snapshot.get('resources', [])
+        merged.merge(metrics)
+    return merged, per_worker, resources
+
+def aggregate_commands(run_id):
+    """Merge the WebDriver command stats of all workers / 合并所有worker的WebDriver命令统计"""
+    profiler = CommandProfiler()
+    for snapshot in load_worker_snapshots(run_id).values():
+        profiler.merge(CommandProfiler.from_dict(snapshot.get('commands', {})))
+    return profiler
+
+def report_run(run_id, output_path=SUMMARY_FILE, cleanup=True):
+    """Log and save the run-wide summary with per-worker breakdown / 记录并保存包含各worker明细的整体摘要"""
+    merged, per_worker, resources = aggregate_run(run_id)
+    if not per_worker:
+        return None
+    summary = merged.get_summary()
+    if isinstance(summary, str):
+        logger.info(summary)
+        return None
+
+    response = summary['response_percentiles']
+    logger.info("Run-wide Summary (%s workers) / 整体运行摘要 (%s 个worker):", len(per_worker), len(per_worker))
+    logger.info("Total Tests: %s, Success Rate: %.2f%% / 总测试次数: %s, 成功率: %.2f%%", summary['total_tests'], summary['success_rate'], summary['total_tests'], summary['success_rate'])
+    logger.info("Response Time p50/p95/p99/max: %.3f/%.3f/%.3f/%.3fs / 响应时间 p50/p95/p99/最大值: %.3f/%.3f/%.3f/%.3f秒", response['p50'], response['p95'], response['p99'], response['max'], response['p50'], response['p95'], response['p99'], response['max'])
+    logger.info("Throughput: %.3f iterations/s / 吞吐量: %.3f 次迭代/秒", summary['throughput'], summary['throughput'])
+    for error_class, count in sorted(summary['errors'].items()):
+        retries = summary['retries'].get(error_class, 0)
+        logger.info("Errors '%s': %s, %s retried / 错误 '%s': %s 次, 重试 %s 次", error_class, count, retries, error_class, count, retries)
+    windows = summary['throughput_windows']
+    if windows:
+        worst = max(windows, key=lambda window: window['error_rate'])
+        start = datetime.fromtimestamp(worst['start']).strftime('%H:%M:%S')
+        logger.info("Peak window error rate %.1f%% at %s / 窗口错误率峰值 %.1f%%, 时间 %s", worst['error_rate'] * 100, start, worst['error_rate'] * 100, start)
+
+    workers = {}
+    for worker, metrics in sorted(per_worker.items()):
+        worker_summary = metrics.get_summary()
+        if isinstance(worker_summary, str):
+            continue
+        workers[worker] = worker_summary
+        logger.info("Worker %s: %s tests, %.2f%% success, p95 %.3fs, %.3f iterations/s / Worker %s: %s 次测试, 成功率 %.2f%%, p95 %.3f秒, %.3f 次迭代/秒", worker, worker_summary['total_tests'], worker_summary['success_rate'], worker_summary['response_percentiles']['p95'], worker_summary['throughput'], worker, worker_summary['total_tests'], worker_summary['success_rate'], worker_summary['response_percentiles']['p95'], worker_summary['throughput'])
+
+    profiler = aggregate_commands(run_id)
+    commands = profiler.report(summary['total_tests'])
+    profiler.log_report(summary['total_tests'])
+
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump({'run_id': run_id, 'summary': summary, 'workers': workers, 'resources': resources, 'commands': commands}, f, indent=2)
+    logger.info("Run-wide summary saved to %s / 整体摘要已保存至 %s", output_path, output_path)
+    if cleanup:
+        shutil.rmtree(get_spool_dir(run_id), ignore_errors=True)
+    return summary
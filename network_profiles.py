@@ -0,0 +1,188 @@
+import os
+import json
+import argparse
+from selenium.common.exceptions import WebDriverException
+from sample_store import RunStats
+from logger_config import setup_logger
+
+# Set up logger / 设置日志记录器
+logger = setup_logger()
+
+# Sweep results written next to stress_summary.json / 与stress_summary.json并列写入的扫描结果
+SWEEP_FILE = 'network_sweep.json'
+
+# Named profiles: RTT in ms, download/upload in kbit/s (0 is unlimited), packet loss in percent
+# 命名配置: RTT(毫秒), 下行/上行(kbit/s, 0为不限), 丢包率(百分比)
+NETWORK_PROFILES = {
+    'none': (0, 0, 0, 0),
+    'wifi': (30, 30000, 15000, 0),
+    '4g': (70, 9000, 9000, 0),
+    '3g': (562.5, 1475, 675, 0),
+    'slow-3g': (2000, 400, 400, 0),
+    'wan-high-latency': (250, 20000, 10000, 0),
+    'branch-office': (80, 2000, 1000, 1),
+}
+
+class NetworkProfile:
+    """Network conditions emulated in each browser session / 在每个浏览器会话中模拟的网络条件"""
+    def __init__(self, name, rtt_ms=0, download_kbps=0, upload_kbps=0, loss=0):
+        self.name = name
+        self.rtt_ms = rtt_ms
+        self.download_kbps = download_kbps
+        self.upload_kbps = upload_kbps
+        self.loss = loss
+
+    @property
+    def emulated(self):
+        """Whether the profile changes anything / 配置是否改变网络条件"""
+        return bool(self.rtt_ms or self.download_kbps or self.upload_kbps or self.loss)
+
+    def cdp_params(self):
+        """Parameters of Network.emulateNetworkConditions; throughput is in bytes/s / Network.emulateNetworkConditions参数; 吞吐量单位为字节/秒"""
+        params = {
+            'offline': False,
+            'latency': self.rtt_ms,
+            'downloadThroughput': self.download_kbps * 1000 / 8 if self.download_kbps else -1,
+            'uploadThroughput': self.upload_kbps * 1000 / 8 if self.upload_kbps else -1,
+        }
+        if self.loss:
+            params['packetLoss'] = self.loss
+        return params
+
+    def to_dict(self):
+        """Serialize the profile / 序列化配置"""
+        return {'name': self.name, 'rtt_ms': self.rtt_ms, 'download_kbps': self.download_kbps,
+                'upload_kbps': self.upload_kbps, 'loss': self.loss}
+
+    def __str__(self):
+        if not self.emulated:
+            return self.name
+        return f"{self.name} (RTT {self.rtt_ms:g}ms, {self.download_kbps or '-'}/{self.upload_kbps or '-'}kbps, loss {self.loss:g}%)"
+
+def parse_network_profile(spec):
+    """Parse a profile name or 'custom:<rtt_ms>:<down_kbps>:<up_kbps>[:<loss_percent>]' / 解析配置名称或 'custom:<RTT毫秒>:<下行kbps>:<上行kbps>[:<丢包百分比>]'"""
+    spec = (spec or 'none').strip()
+    if spec in NETWORK_PROFILES:
+        return NetworkProfile(spec, *NETWORK_PROFILES[spec])
+    kind, *values = spec.split(':')
+    try:
+        if kind != 'custom':
+            raise ValueError(f"Unknown network profile: {kind} / 未知的网络配置: {kind}")
+        numbers = [float(value) for value in values]
+        if len(numbers) not in (3, 4) or any(number < 0 for number in numbers):
+            raise ValueError("expected rtt_ms:down_kbps:up_kbps[:loss] / 需要 RTT毫秒:下行kbps:上行kbps[:丢包率]")
+    except ValueError as e:
+        raise ValueError(f"Invalid network profile '{spec}': {str(e)} / 无效的网络配置 '{spec}': {str(e)}")
+    return NetworkProfile(spec, *numbers)
+
+def get_network_profile():
+    """Profile selected by NETWORK_PROFILE / NETWORK_PROFILE选择的配置"""
+    return parse_network_profile(os.environ.get('NETWORK_PROFILE'))
+
+def apply_network_profile(driver, profile=None):
+    """Emulate the profile's network conditions in a session / 在会话中模拟配置的网络条件"""
+    profile = profile or get_network_profile()
+    if not profile.emulated:
+        return profile
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.emulateNetworkConditions", profile.cdp_params())
+    except (AttributeError, WebDriverException) as e:
+        logger.warning("Network emulation unavailable: %s / 网络模拟不可用: %s", e, e)
+    return profile
+
+def _solve(matrix, vector):
+    """Solve a small linear system by Gaussian elimination, None if singular / 高斯消元求解小型线性方程组, 奇异时返回None"""
+    size = len(vector)
+    rows = [list(row) + [value] for row, value in zip(matrix, vector)]
+    for column in range(size):
+        pivot = max(range(column, size), key=lambda index: abs(rows[index][column]))
+        if abs(rows[pivot][column]) < 1e-12:
+            return None
+        rows[column], rows[pivot] = rows[pivot], rows[column]
+        for index in range(size):
+            if index != column:
+                factor = rows[index][column] / rows[column][column]
+                rows[index] = [a - factor * b for a, b in zip(rows[index], rows[column])]
+    return [rows[index][size] / rows[index][index] for index in range(size)]
+
+def fit_latency(points):
+    """Fit latency = base + round_trips * RTT + bytes / bandwidth over (profile, seconds) points / 以 延迟 = 基础 + 往返次数 * RTT + 字节数 / 带宽 拟合 (配置, 秒) 数据点
+
+    Bandwidth is only fitted with at least three points and more than one bandwidth; returns None
+    when the points do not vary in RTT.
+    至少三个数据点且带宽不止一种时才拟合带宽；RTT没有变化时返回None。
+    """
+    features = [[1.0, profile.rtt_ms / 1000, 8 / (profile.download_kbps * 1000) if profile.download_kbps else 0.0]
+                for profile, _ in points]
+    values = [seconds for _, seconds in points]
+    if len({row[1] for row in features}) < 2:
+        return None
+    columns = 3 if len(points) >= 3 and len({row[2] for row in features}) > 1 else 2
+    features = [row[:columns] for row in features]
+    normal = [[sum(row[i] * row[j] for row in features) for j in range(columns)] for i in range(columns)]
+    target = [sum(row[i] * value for row, value in zip(features, values)) for i in range(columns)]
+    solution = _solve(normal, target)
+    if solution is None:
+        return None
+    return {
+        'base': solution[0],
+        'round_trips': solution[1],
+        'kilobytes': solution[2] / 1000 if columns == 3 else None,
+    }
+
+def sweep_report(run_ids):
+    """Step latency of each run and how it scales with RTT and bandwidth / 各运行的步骤延迟及其随RTT和带宽的变化"""
+    runs = []
+    for run_id in run_ids:
+        stats = RunStats.load(run_id)
+        runs.append((parse_network_profile(stats.meta.get('network_profile')), stats))
+    steps = sorted(set().union(*(stats.steps for _, stats in runs)))
+    report = {'runs': list(run_ids), 'profiles': [profile.to_dict() for profile, _ in runs], 'steps': {}}
+    for step in ['iteration'] + steps:
+        histograms = [stats.iterations if step == 'iteration' else stats.steps.get(step) for _, stats in runs]
+        p50 = [histogram.percentile(50) if histogram and histogram.count else None for histogram in histograms]
+        p95 = [histogram.percentile(95) if histogram and histogram.count else None for histogram in histograms]
+        points = [(profile, value) for (profile, _), value in zip(runs, p50) if value is not None]
+        report['steps'][step] = {'p50': p50, 'p95': p95, 'fit': fit_latency(points)}
+    return report
+
+def log_sweep_report(report):
+    """Log the sweep report / 输出扫描报告"""
+    names = ' / '.join(profile['name'] for profile in report['profiles'])
+    logger.info("Network sweep p50 (%s) / 网络扫描p50 (%s)", names, names)
+    for step, row in report['steps'].items():
+        values = ' / '.join(f"{value:.3f}" if value is not None else '-' for value in row['p50'])
+        fit = row['fit']
+        if fit is None:
+            logger.info("Step '%s': %ss / 步骤 '%s': %s秒", step, values, step, values)
+            continue
+        kilobytes = f"{fit['kilobytes']:.0f}KB" if fit['kilobytes'] is not None else '-'
+        logger.info("Step '%s': %ss, base %.3fs + %.1f round trips + %s / 步骤 '%s': %s秒, 基础 %.3f秒 + %.1f 次往返 + %s",
+                    step, values, fit['base'], fit['round_trips'], kilobytes, step, values, fit['base'], fit['round_trips'], kilobytes)
+
+def main(argv=None):
+    """Command line entry point / 命令行入口"""
+    parser = argparse.ArgumentParser(description="Network emulation profiles / 网络模拟配置")
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('list', help="List the named profiles / 列出命名配置")
+    report = commands.add_parser('report', help="Report a sweep over stored runs / 汇总已保存运行的扫描结果")
+    report.add_argument('runs', nargs='+', help="Run ids of the sweep / 扫描的运行ID")
+    args = parser.parse_args(argv)
+
+    if args.command == 'list':
+        for name in NETWORK_PROFILES:
+            print(parse_network_profile(name))
+        return 0
+    try:
+        result = sweep_report(args.runs)
+    except (FileNotFoundError, ValueError) as e:
+        logger.error("%s", e)
+        return 2
+    log_sweep_report(result)
+    with open(SWEEP_FILE, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,235 @@
+import os
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, ElementClickInterceptedException
+from readiness import get_readiness
+from config import USERNAME, PASSWORD, IMAGE_PATH, app_url
+from logger_config import setup_logger
+
+# Set up logger / 设置日志记录器
+logger = setup_logger()
+
+# Default page settings / 默认页面设置
+DEFAULT_TIMEOUT = 30
+# Kept below Selenium's default 30s script timeout / 低于Selenium默认30秒脚本超时
+DEFAULT_FILL_TIMEOUT = 10
+
+# Resolves a Selenium (by, value) locator inside the page / 在页面内解析Selenium (by, value) 定位器
+RESOLVE_SCRIPT = """
+function resolveLocator(by, value) {
+    if (by === 'xpath') {
+        return document.evaluate(value, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    }
+    if (by === 'name') { return document.querySelector('[name="' + value + '"]'); }
+    if (by === 'id') { return document.getElementById(value); }
+    return document.querySelector(value);
+}
+function isVisible(element) {
+    return !!element && element.getClientRects().length > 0;
+}
+"""
+
+# Waits in the page for all fields, then sets values through the native setter and fires the
+# events Vue's v-model listens to / 在页面内等待所有字段, 通过原生setter赋值并触发Vue v-model监听的事件
+FILL_SCRIPT = RESOLVE_SCRIPT + """
+var fields = arguments[0], timeoutMs = arguments[1], done = arguments[arguments.length - 1];
+var deadline = Date.now() + timeoutMs;
+(function attempt() {
+    var elements = [];
+    for (var i = 0; i < fields.length; i++) {
+        var element = resolveLocator(fields[i][0], fields[i][1]);
+        if (!isVisible(element) || element.disabled) {
+            if (Date.now() > deadline) { done(fields[i][1]); return; }
+            setTimeout(attempt, 50);
+            return;
+        }
+        elements.push(element);
+    }
+    for (var j = 0; j < elements.length; j++) {
+        var proto = elements[j] instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+        Object.getOwnPropertyDescriptor(proto, 'value').set.call(elements[j], fields[j][2]);
+        elements[j].dispatchEvent(new Event('input', {bubbles: true}));
+        elements[j].dispatchEvent(new Event('change', {bubbles: true}));
+    }
+    done(null);
+})();
+"""
+
+# Outcome of a form save as [kind, message], null while pending / 表单保存结果 [类型, 消息], 未完成时为null
+SAVE_RESULT_SCRIPT = """
+var field = document.querySelector('span.oxd-input-field-error-message');
+if (field) { return ['field', field.textContent]; }
+var message = document.querySelector('.oxd-toast p.oxd-text--toast-message');
+if (!message) { return null; }
+return [message.closest('.oxd-toast--error') ? 'toast' : 'success', message.textContent];
+"""
+
+class FormError(Exception):
+    """The application rejected a submitted form / 应用拒绝了提交的表单
+
+    `field` is True for an inline field error such as a duplicate employee ID, False for an error toast.
+    `field` 为True表示字段内联错误(如员工ID重复), False表示错误提示框。
+    """
+    def __init__(self, message, field=False):
+        super().__init__(message)
+        self.field = field
+
+def is_batching_enabled():
+    """Check whether forms are filled in one round trip / 检查是否单次往返填写表单"""
+    return os.environ.get('PAGE_BATCHING', '1') != '0'
+
+class BasePage:
+    """Shared waits and actions of OrangeHRM pages / OrangeHRM页面共用的等待和操作"""
+    # Main menu entries / 主菜单项
+    PIM_MENU = (By.CSS_SELECTOR, "a.oxd-main-menu-item[href*='/pim/viewPimModule']")
+    LEAVE_MENU = (By.CSS_SELECTOR, "a.oxd-main-menu-item[href*='/leave/viewLeaveModule']")
+    DASHBOARD_MENU = (By.CSS_SELECTOR, "a.oxd-main-menu-item[href*='/dashboard/index']")
+    PAGE_HEADER = (By.CSS_SELECTOR, "h6.oxd-text")
+
+    def __init__(self, driver, metrics=None, timeout=DEFAULT_TIMEOUT, batching=None):
+        self.driver = driver
+        self.timeout = timeout
+        self.batching = is_batching_enabled() if batching is None else batching
+        self.readiness = get_readiness(driver, metrics)
+
+    def find(self, locator, timeout=None):
+        """Wait for an element to be present / 等待元素出现"""
+        try:
+            return WebDriverWait(self.driver, timeout or self.timeout, poll_frequency=self.readiness.poll_frequency).until(EC.presence_of_element_located(locator))
+        except TimeoutException:
+            logger.error("Timeout waiting for element: %s / 等待元素超时: %s", locator[1], locator[1])
+            raise
+
+    def click(self, locator, timeout=None):
+        """Wait for an element to be clickable and click it / 等待元素可点击并点击"""
+        try:
+            element = WebDriverWait(self.driver, timeout or self.timeout, poll_frequency=self.readiness.poll_frequency).until(EC.element_to_be_clickable(locator))
+        except TimeoutException:
+            logger.error("Timeout waiting for clickable element: %s / 等待可点击元素超时: %s", locator[1], locator[1])
+            raise
+        try:
+            element.click()
+        except ElementClickInterceptedException:
+            # Fall back to a JavaScript click when an overlay intercepts it / 被遮挡时退回JavaScript点击
+            self.driver.execute_script("arguments[0].click();", element)
+        return element
+
+    def fill(self, fields, timeout=DEFAULT_FILL_TIMEOUT):
+        """Fill {locator: value} fields, in one round trip when batching / 填写 {定位器: 值} 字段, 批量模式下仅一次往返"""
+        if not self.batching:
+            for locator, value in fields.items():
+                element = self.find(locator)
+                element.clear()
+                element.send_keys(value)
+            return
+        missing = self.driver.execute_async_script(
+            FILL_SCRIPT, [[by, value, text] for (by, value), text in fields.items()], int(timeout * 1000)
+        )
+        if missing:
+            logger.error("Timeout waiting for field: %s / 等待字段超时: %s", missing, missing)
+            raise NoSuchElementException(f"Field not found: {missing} / 未找到字段: {missing}")
+
+    def open_menu(self, locator, route, label):
+        """Open a main menu entry and wait for its route / 打开主菜单项并等待其路由"""
+        self.click(locator)
+        self.readiness.wait_for_route(route, label)
+        return self
+
+    def header_text(self):
+        """Text of the page header / 页面标题文本"""
+        return self.find(self.PAGE_HEADER).text
+
+class LoginPage(BasePage):
+    """Login form / 登录表单"""
+    USERNAME_INPUT = (By.CSS_SELECTOR, "input[name='username']")
+    PASSWORD_INPUT = (By.CSS_SELECTOR, "input[name='password']")
+    SUBMIT_BUTTON = (By.CSS_SELECTOR, "button[type='submit']")
+
+    def open(self):
+        """Open the login page / 打开登录页面"""
+        self.driver.get(app_url('auth/login'))
+        self.readiness.wait_for_route("auth/login", "login_page")
+        return self
+
+    def enter_credentials(self, username=USERNAME, password=PASSWORD):
+        """Fill username and password / 填写用户名和密码"""
+        self.fill({self.USERNAME_INPUT: username, self.PASSWORD_INPUT: password})
+        return self
+
+    def submit(self):
+        """Submit the form and wait for the dashboard / 提交表单并等待仪表板"""
+        self.click(self.SUBMIT_BUTTON)
+        self.readiness.wait_for_route("dashboard", "post_login")
+        return self
+
+class PimListPage(BasePage):
+    """PIM employee list / PIM员工列表"""
+    ADD_BUTTON = (By.XPATH, "//div[contains(@class, 'orangehrm-header-container')]//button[normalize-space()='Add']")
+
+    def open(self):
+        """Open the PIM module from the main menu / 从主菜单打开PIM模块"""
+        return self.open_menu(self.PIM_MENU, "pim/viewEmployeeList", "pim_list")
+
+    def click_add(self):
+        """Open the Add Employee form / 打开添加员工表单"""
+        self.click(self.ADD_BUTTON)
+        self.readiness.wait_for_route("pim/addEmployee", "add_employee_form")
+        return AddEmployeePage(self.driver, timeout=self.timeout, batching=self.batching)
+
+class AddEmployeePage(BasePage):
+    """Add Employee form / 添加员工表单"""
+    FIRST_NAME_INPUT = (By.CSS_SELECTOR, "input[name='firstName']")
+    MIDDLE_NAME_INPUT = (By.CSS_SELECTOR, "input[name='middleName']")
+    LAST_NAME_INPUT = (By.CSS_SELECTOR, "input[name='lastName']")
+    EMPLOYEE_ID_INPUT = (By.XPATH, "//label[normalize-space()='Employee Id']/ancestor::div[contains(@class, 'oxd-input-group')]//input")
+    PHOTO_INPUT = (By.CSS_SELECTOR, "input[type='file']")
+    SAVE_BUTTON = (By.CSS_SELECTOR, "button[type='submit']")
+
+    def fill_employee(self, record):
+        """Fill names and employee ID of a record / 填写记录的姓名和员工ID"""
+        self.fill({
+            self.FIRST_NAME_INPUT: record.first_name,
+            self.MIDDLE_NAME_INPUT: record.middle_name,
+            self.LAST_NAME_INPUT: record.last_name,
+            self.EMPLOYEE_ID_INPUT: record.employee_id,
+        })
+        return self
+
+    def upload_photo(self, path=IMAGE_PATH):
+        """Choose the employee photo; file inputs only accept send_keys / 选择员工头像；文件输入框只接受send_keys"""
+        self.find(self.PHOTO_INPUT).send_keys(path)
+        self.readiness.wait_until_ready("photo_upload")
+        return self
+
+    def save(self):
+        """Submit the form / 提交表单"""
+        self.click(self.SAVE_BUTTON)
+        return self
+
+    def wait_for_toast(self):
+        """Wait for the save confirmation toast, raising FormError when the save is rejected / 等待保存成功提示, 保存被拒绝时抛出FormError"""
+        try:
+            kind, message = WebDriverWait(self.driver, self.timeout, poll_frequency=self.readiness.poll_frequency).until(
+                lambda driver: driver.execute_script(SAVE_RESULT_SCRIPT)
+            )
+        except TimeoutException:
+            logger.error("Timeout waiting for save result / 等待保存结果超时")
+            raise
+        if kind != 'success':
+            raise FormError(message, field=kind == 'field')
+        return message
+
+class LeaveListPage(BasePage):
+    """Leave list with its filter form / 带筛选表单的请假列表"""
+    SEARCH_BUTTON = (By.CSS_SELECTOR, "form .oxd-form-actions button[type='submit']")
+
+    def open(self):
+        """Open the Leave module from the main menu / 从主菜单打开请假模块"""
+        return self.open_menu(self.LEAVE_MENU, "leave/viewLeaveList", "leave_list")
+
+    def search(self):
+        """Run the leave search / 执行请假查询"""
+        self.click(self.SEARCH_BUTTON)
+        self.readiness.wait_until_ready("leave_search")
+        return self
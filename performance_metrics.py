@@ -0,0 +1,276 @@
+import time
+import threading
+from collections import deque
+import psutil
+from histogram import LogLinearHistogram
+from logger_config import set_log_context
+
+# Default throughput window settings / 默认吞吐量窗口设置
+DEFAULT_WINDOW_SECONDS = 10
+DEFAULT_MAX_WINDOWS = 360
+
+class ThroughputWindows:
+    """Iteration counts and latency per fixed time window, kept in a bounded ring / 按固定时间窗口统计迭代数和延迟, 保存在有界环形缓冲中"""
+    def __init__(self, window_seconds=DEFAULT_WINDOW_SECONDS, max_windows=DEFAULT_MAX_WINDOWS):
+        self.window_seconds = window_seconds
+        self.windows = deque(maxlen=max_windows)  # [window_start, passed, failed, latency_total, latency_max]
+
+    def record(self, success, timestamp=None, duration=None):
+        """Count a finished iteration in its window / 在所属窗口中计入一次完成的迭代"""
+        timestamp = time.time() if timestamp is None else timestamp
+        window_start = timestamp - timestamp % self.window_seconds
+        if not self.windows or self.windows[-1][0] < window_start:
+            self.windows.append([window_start, 0, 0, 0.0, 0.0])
+        window = self.windows[-1]
+        window[1 if success else 2] += 1
+        if duration is not None:
+            window[3] += duration
+            window[4] = max(window[4], duration)
+
+    def extend(self, windows):
+        """Add serialized windows, padding those without latency / 加入序列化的窗口, 为无延迟的窗口补齐"""
+        self.windows.extend(list(window) + [0.0] * (5 - len(window)) for window in windows)
+
+    def series(self):
+        """Throughput, error rate and latency per window / 每个窗口的吞吐量、错误率和延迟"""
+        return [
+            {'start': start, 'throughput': (passed + failed) / self.window_seconds, 'passed': passed, 'failed': failed,
+             'error_rate': failed / (passed + failed) if passed + failed else 0.0,
+             'mean_latency': latency_total / (passed + failed) if passed + failed else 0.0, 'max_latency': latency_max}
+            for start, passed, failed, latency_total, latency_max in self.windows
+        ]
+
+class PerformanceMetrics:
+    """Performance metrics collection class / 性能指标收集类
+
+    All samples go into fixed-size histograms, so memory stays constant however long the run.
+    所有样本写入固定大小的直方图，无论运行多久内存占用保持不变。
+    """
+    def __init__(self):
+        self.run_start = None
+        self.start_time = None
+        self.end_time = None
+        self.cpu_usage = LogLinearHistogram(unit=0.01)
+        self.memory_usage = LogLinearHistogram(unit=0.01)
+        self.response_times = LogLinearHistogram()
+        self.durations = LogLinearHistogram()
+        self.wait_times = {}
+        self.step_times = {}
+        self.browser_timings = {}
+        self.total_tests = 0
+        self.successful_tests = 0
+        self.in_flight = 0
+        self.throughput = ThroughputWindows()
+        self.error_counts = {}
+        self.retry_counts = {}
+        self.sample_writer = None
+        self._iteration = threading.local()
+        self._lock = threading.Lock()
+
+    def start_test(self, iteration=None):
+        """Start collecting metrics / 开始收集指标"""
+        self.start_time = time.time()
+        if self.run_start is None:
+            self.run_start = self.start_time
+        if iteration is not None:
+            self.set_iteration(iteration)
+            self.track_in_flight(1)
+
+    def track_in_flight(self, delta):
+        """Adjust the number of iterations currently running / 调整正在运行的迭代数"""
+        with self._lock:
+            self.in_flight = max(0, self.in_flight + delta)
+
+    def set_iteration(self, iteration):
+        """Set the iteration that samples on this thread belong to / 设置当前线程样本所属的迭代"""
+        self._iteration.value = iteration
+        set_log_context(iteration=iteration)
+
+    def current_iteration(self):
+        """Iteration of the current thread, or the completed count / 当前线程的迭代, 或已完成次数"""
+        return getattr(self._iteration, 'value', self.total_tests)
+
+    def record_metrics(self):
+        """Record current system metrics / 记录当前系统指标"""
+        cpu = psutil.cpu_percent()
+        memory = psutil.virtual_memory().percent
+        with self._lock:
+            self.cpu_usage.record(cpu)
+            self.memory_usage.record(memory)
+
+    def record_response_time(self, response_time):
+        """Record response time / 记录响应时间"""
+        with self._lock:
+            self.response_times.record(response_time)
+
+    def record_wait_time(self, label, wait_time):
+        """Record how long a readiness wait took / 记录就绪等待耗时"""
+        with self._lock:
+            histogram = self.wait_times.get(label)
+            if histogram is None:
+                histogram = self.wait_times[label] = LogLinearHistogram()
+            histogram.record(wait_time)
+
+    def record_step(self, path, step_time):
+        """Record latency of a named step such as 'add_employee/save' / 记录命名步骤(如'add_employee/save')的耗时"""
+        with self._lock:
+            histogram = self.step_times.get(path)
+            if histogram is None:
+                histogram = self.step_times[path] = LogLinearHistogram()
+            histogram.record(step_time)
+        if self.sample_writer is not None:
+            self.sample_writer.step(time.time(), self.current_iteration(), path, step_time)
+
+    def record_error(self, error_class, message):
+        """Count an error by class and persist it / 按类别统计错误并持久化"""
+        with self._lock:
+            self.error_counts[error_class] = self.error_counts.get(error_class, 0) + 1
+        if self.sample_writer is not None:
+            self.sample_writer.error(time.time(), self.current_iteration(), error_class, message)
+
+    def record_retry(self, error_class):
+        """Count a retried failure by class / 按类别统计重试的失败"""
+        with self._lock:
+            self.retry_counts[error_class] = self.retry_counts.get(error_class, 0) + 1
+
+    def record_browser_timing(self, step, name, value):
+        """Record a browser-side timing or counter for a step / 记录某步骤的浏览器端计时或计数"""
+        key = f"{step}.{name}"
+        with self._lock:
+            histogram = self.browser_timings.get(key)
+            if histogram is None:
+                histogram = self.browser_timings[key] = LogLinearHistogram()
+            histogram.record(value)
+
+    def end_test(self, success):
+        """End test and calculate metrics, returning the duration / 结束测试并计算指标, 返回持续时间"""
+        duration = time.time() - self.start_time
+        self.track_in_flight(-1)
+        self.record_result(duration, success)
+        return duration
+
+    def record_result(self, duration, success):
+        """Record result of a single iteration / 记录单次迭代结果"""
+        iteration = self.current_iteration()
+        with self._lock:
+            self.end_time = time.time()
+            if self.run_start is None:
+                self.run_start = self.end_time - duration
+            self.durations.record(duration)
+            self.total_tests += 1
+            self.successful_tests += 1 if success else 0
+            self.throughput.record(success, self.end_time, duration)
+        if self.sample_writer is not None:
+            self.sample_writer.iteration(self.end_time, iteration, duration, success)
+
+    def get_summary(self):
+        """Get test summary / 获取测试摘要"""
+        if not self.total_tests:
+            return "No tests executed / 没有执行测试"
+
+        with self._lock:
+            elapsed = max(self.end_time - self.run_start, 1e-9)
+            return {
+                'total_tests': self.total_tests,
+                'successful_tests': self.successful_tests,
+                'success_rate': (self.successful_tests / self.total_tests) * 100,
+                'avg_duration': self.durations.mean,
+                'avg_cpu': self.cpu_usage.mean,
+                'avg_memory': self.memory_usage.mean,
+                'avg_response': self.response_times.mean,
+                'duration_percentiles': self.durations.percentiles(),
+                'response_percentiles': self.response_times.percentiles(),
+                'throughput': self.total_tests / elapsed,
+                'throughput_windows': self.throughput.series(),
+                'step_percentiles': {
+                    path: dict(histogram.percentiles(), count=histogram.count, mean=histogram.mean)
+                    for path, histogram in self.step_times.items()
+                },
+                'browser_timings': {
+                    key: {'mean': histogram.mean, 'p95': histogram.percentile(95)}
+                    for key, histogram in self.browser_timings.items()
+                },
+                'wait_times': {label: histogram.mean for label, histogram in self.wait_times.items()},
+                'errors': dict(self.error_counts),
+                'retries': dict(self.retry_counts)
+            }
+
+    def to_dict(self):
+        """Serialize to a JSON-compatible dictionary / 序列化为可JSON化的字典"""
+        with self._lock:
+            return {
+                'run_start': self.run_start,
+                'end_time': self.end_time,
+                'total_tests': self.total_tests,
+                'successful_tests': self.successful_tests,
+                'in_flight': self.in_flight,
+                'cpu_usage': self.cpu_usage.to_dict(),
+                'memory_usage': self.memory_usage.to_dict(),
+                'response_times': self.response_times.to_dict(),
+                'durations': self.durations.to_dict(),
+                'wait_times': {label: h.to_dict() for label, h in self.wait_times.items()},
+                'step_times': {path: h.to_dict() for path, h in self.step_times.items()},
+                'browser_timings': {key: h.to_dict() for key, h in self.browser_timings.items()},
+                'throughput_windows': [list(window) for window in self.throughput.windows],
+                'error_counts': dict(self.error_counts),
+                'retry_counts': dict(self.retry_counts),
+            }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Deserialize from to_dict() output / 从to_dict()输出反序列化"""
+        metrics = cls()
+        metrics.run_start = data['run_start']
+        metrics.end_time = data['end_time']
+        metrics.total_tests = data['total_tests']
+        metrics.successful_tests = data['successful_tests']
+        metrics.in_flight = data.get('in_flight', 0)
+        metrics.cpu_usage = LogLinearHistogram.from_dict(data['cpu_usage'])
+        metrics.memory_usage = LogLinearHistogram.from_dict(data['memory_usage'])
+        metrics.response_times = LogLinearHistogram.from_dict(data['response_times'])
+        metrics.durations = LogLinearHistogram.from_dict(data['durations'])
+        metrics.wait_times = {label: LogLinearHistogram.from_dict(h) for label, h in data['wait_times'].items()}
+        metrics.step_times = {path: LogLinearHistogram.from_dict(h) for path, h in data['step_times'].items()}
+        metrics.browser_timings = {key: LogLinearHistogram.from_dict(h) for key, h in data['browser_timings'].items()}
+        metrics.throughput.extend(data['throughput_windows'])
+        metrics.error_counts = dict(data.get('error_counts', {}))
+        metrics.retry_counts = dict(data.get('retry_counts', {}))
+        return metrics
+
+    def merge(self, other):
+        """Merge another PerformanceMetrics into this one / 将另一个PerformanceMetrics合并到当前对象"""
+        # Copy `other` under its own lock first; it may still be recording / 先在其锁内复制`other`, 它可能仍在记录
+        other = PerformanceMetrics.from_dict(other.to_dict())
+        with self._lock:
+            starts = [t for t in (self.run_start, other.run_start) if t is not None]
+            ends = [t for t in (self.end_time, other.end_time) if t is not None]
+            self.run_start = min(starts) if starts else None
+            self.end_time = max(ends) if ends else None
+            self.total_tests += other.total_tests
+            self.successful_tests += other.successful_tests
+            self.in_flight += other.in_flight
+            for mine, theirs in ((self.error_counts, other.error_counts), (self.retry_counts, other.retry_counts)):
+                for error_class, count in theirs.items():
+                    mine[error_class] = mine.get(error_class, 0) + count
+            self.cpu_usage.merge(other.cpu_usage)
+            self.memory_usage.merge(other.memory_usage)
+            self.response_times.merge(other.response_times)
+            self.durations.merge(other.durations)
+            for mine, theirs in ((self.wait_times, other.wait_times),
+                                 (self.step_times, other.step_times),
+                                 (self.browser_timings, other.browser_timings)):
+                for key, histogram in theirs.items():
+                    if key in mine:
+                        mine[key].merge(histogram)
+                    else:
+                        mine[key] = LogLinearHistogram.from_dict(histogram.to_dict())
+            windows = {}
+            for start, passed, failed, latency_total, latency_max in list(self.throughput.windows) + list(other.throughput.windows):
+                window = windows.setdefault(start, [start, 0, 0, 0.0, 0.0])
+                window[1] += passed
+                window[2] += failed
+                window[3] += latency_total
+                window[4] = max(window[4], latency_max)
+            self.throughput.windows.clear()
+            self.throughput.windows.extend(windows[start] for start in sorted(windows))
+        return self
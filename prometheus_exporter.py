@@ -0,0 +1,188 @@
+import os
+import time
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from performance_metrics import PerformanceMetrics
+from metrics_aggregation import load_worker_snapshots
+from logger_config import setup_logger
+
+# Set up logger / 设置日志记录器
+logger = setup_logger()
+
+# Default exporter settings / 默认导出设置
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 9464
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+# Metric name prefix / 指标名前缀
+PREFIX = 'orangehrm_stress'
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+def get_buckets():
+    """Histogram bucket bounds in seconds from PROMETHEUS_BUCKETS / 从PROMETHEUS_BUCKETS获取直方图桶上界(秒)"""
+    spec = os.environ.get('PROMETHEUS_BUCKETS')
+    if not spec:
+        return DEFAULT_BUCKETS
+    try:
+        return tuple(sorted(float(bound) for bound in spec.split(',') if bound.strip()))
+    except ValueError:
+        logger.warning("Invalid PROMETHEUS_BUCKETS: %s / 无效的PROMETHEUS_BUCKETS: %s", spec, spec)
+        return DEFAULT_BUCKETS
+
+def _escape(value):
+    """Escape a label value / 转义标签值"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(labels):
+    """Format a label set / 格式化标签集"""
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+def _number(value):
+    """Format a sample value / 格式化样本值"""
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Exposition:
+    """Builds Prometheus text exposition, one HELP/TYPE header per family / 构建Prometheus文本格式, 每个指标族一个HELP/TYPE头"""
+    def __init__(self):
+        self.families = {}
+
+    def add(self, name, kind, help_text, value, labels=None, suffix=''):
+        """Add a sample to a family / 向指标族添加样本"""
+        family = self.families.setdefault(name, (kind, help_text, []))
+        family[2].append(f"{name}{suffix}{_labels(labels)} {_number(value)}")
+
+    def histogram(self, name, help_text, histogram, bounds, labels=None):
+        """Add a LogLinearHistogram as cumulative buckets / 以累积桶形式添加LogLinearHistogram"""
+        labels = labels or {}
+        for bound, count in zip(bounds, histogram.cumulative_counts(bounds)):
+            self.add(name, 'histogram', help_text, count, dict(labels, le=_number(float(bound))), '_bucket')
+        self.add(name, 'histogram', help_text, histogram.count, dict(labels, le='+Inf'), '_bucket')
+        self.add(name, 'histogram', help_text, histogram.total, labels, '_sum')
+        self.add(name, 'histogram', help_text, histogram.count, labels, '_count')
+
+    def render(self):
+        """Text of all families / 所有指标族的文本"""
+        lines = []
+        for name, (kind, help_text, samples) in self.families.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(samples)
+        return '\n'.join(lines) + '\n'
+
+def render_run(run_id, bounds=None):
+    """Prometheus text for the latest snapshot of every worker of a run / 某次运行各worker最新快照的Prometheus文本"""
+    bounds = bounds or get_buckets()
+    exposition = Exposition()
+    exposition.add(f"{PREFIX}_run_info", 'gauge', "Run being exported", 1, {'run_id': run_id})
+    now = time.time()
+    for worker, snapshot in sorted(load_worker_snapshots(run_id).items()):
+        metrics = PerformanceMetrics.from_dict(snapshot['metrics'])
+        labels = {'worker': worker}
+        exposition.add(f"{PREFIX}_snapshot_age_seconds", 'gauge', "Seconds since the worker's last snapshot",
+                       round(now - snapshot['timestamp'], 3), labels)
+        exposition.add(f"{PREFIX}_iterations_in_flight", 'gauge', "Iterations currently running", metrics.in_flight, labels)
+        exposition.add(f"{PREFIX}_iterations_total", 'counter', "Finished iterations by result",
+                       metrics.successful_tests, dict(labels, result='success'))
+        exposition.add(f"{PREFIX}_iterations_total", 'counter', "Finished iterations by result",
+                       metrics.total_tests - metrics.successful_tests, dict(labels, result='failure'))
+        for error_class, count in sorted(metrics.error_counts.items()):
+            exposition.add(f"{PREFIX}_errors_total", 'counter', "Failures by class", count, dict(labels, error_class=error_class))
+        for error_class, count in sorted(metrics.retry_counts.items()):
+            exposition.add(f"{PREFIX}_retries_total", 'counter', "Retried failures by class", count, dict(labels, error_class=error_class))
+        exposition.histogram(f"{PREFIX}_iteration_duration_seconds", "Iteration latency", metrics.durations, bounds, labels)
+        for step, histogram in sorted(metrics.step_times.items()):
+            exposition.histogram(f"{PREFIX}_step_duration_seconds", "Step latency", histogram, bounds, dict(labels, step=step))
+
+        # Latest resource sample of each browser session / 每个浏览器会话的最新资源样本
+        latest = {}
+        for sample in snapshot.get('resources', []):
+            latest[sample['label']] = sample
+        for session, sample in sorted(latest.items()):
+            session_labels = dict(labels, session=session)
+            exposition.add(f"{PREFIX}_browser_cpu_percent", 'gauge', "Browser and driver process tree CPU", sample['cpu'], session_labels)
+            exposition.add(f"{PREFIX}_browser_rss_bytes", 'gauge', "Browser and driver process tree RSS", sample['rss'], session_labels)
+    return exposition.render()
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """Serves /metrics from the worker spool files / 从worker缓冲文件提供/metrics"""
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        try:
+            body = render_run(self.server.run_id).encode('utf-8')
+        except Exception as e:
+            logger.error("Rendering metrics failed: %s / 生成指标失败: %s", e, e)
+            self.send_error(500)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Keep scrapes out of the log / 不记录抓取请求"""
+
+class PrometheusExporter:
+    """HTTP endpoint in a background thread; scrapes read snapshots, never the test threads' state / 后台线程中的HTTP端点；抓取读取快照, 不触及测试线程的状态"""
+    def __init__(self, run_id, port=None, host=None):
+        self.run_id = run_id
+        self.port = DEFAULT_PORT if port is None else port
+        self.host = host or DEFAULT_HOST
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        """Start serving / 开始提供服务"""
+        self._server = ThreadingHTTPServer((self.host, self.port), MetricsHandler)
+        self._server.daemon_threads = True
+        self._server.run_id = self.run_id
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="prometheus-exporter", daemon=True)
+        self._thread.start()
+        logger.info("Prometheus metrics at http://%s:%s/metrics / Prometheus指标地址 http://%s:%s/metrics", self.host, self.port, self.host, self.port)
+        return self
+
+    def stop(self):
+        """Stop serving / 停止服务"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            self._thread = None
+
+def start_exporter(run_id):
+    """Start the exporter when PROMETHEUS_PORT is set, else None / 设置PROMETHEUS_PORT时启动导出器, 否则返回None"""
+    port = os.environ.get('PROMETHEUS_PORT')
+    if not port:
+        return None
+    try:
+        return PrometheusExporter(run_id, int(port), os.environ.get('PROMETHEUS_HOST')).start()
+    except (ValueError, OSError) as e:
+        logger.error("Cannot start Prometheus exporter: %s / 无法启动Prometheus导出器: %s", e, e)
+        return None
+
+def main(argv=None):
+    """Serve the metrics of a run started elsewhere / 为其他进程启动的运行提供指标"""
+    parser = argparse.ArgumentParser(description="Prometheus endpoint for a stress run / 压力测试运行的Prometheus端点")
+    parser.add_argument('run_id', help="Run id, see STRESS_RUN_ID / 运行ID, 见STRESS_RUN_ID")
+    parser.add_argument('--host', default=os.environ.get('PROMETHEUS_HOST', DEFAULT_HOST), help="Listen address / 监听地址")
+    parser.add_argument('--port', type=int, default=int(os.environ.get('PROMETHEUS_PORT', DEFAULT_PORT)), help="Listen port / 监听端口")
+    args = parser.parse_args(argv)
+    exporter = PrometheusExporter(args.run_id, args.port, args.host).start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        exporter.stop()
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
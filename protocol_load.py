@@ -0,0 +1,211 @@
+import argparse
+import asyncio
+import base64
+import html
+import os
+import re
+import time
+import aiohttp
+from config import USERNAME, PASSWORD, IMAGE_PATH, app_url
+from performance_metrics import PerformanceMetrics
+from employee_data import EmployeeDataPool, EmployeeCleaner
+from sample_store import SampleWriter
+from load_scheduler import wait_for_start
+from logger_config import setup_logger
+
+# Set up logger / 设置日志记录器
+logger = setup_logger()
+
+# Default load settings / 默认负载设置
+DEFAULT_USERS = 10
+DEFAULT_ITERATIONS = 10
+DEFAULT_CONNECTIONS = 100
+DEFAULT_TIMEOUT = 30
+DEFAULT_DELETE_BATCH = 50
+
+# CSRF token embedded in the login page component / 登录页面组件中的CSRF令牌
+TOKEN_PATTERN = re.compile(r':token="([^"]+)"')
+
+class ProtocolError(Exception):
+    """Unexpected response from OrangeHRM / OrangeHRM返回了非预期响应"""
+
+def load_photo(path=IMAGE_PATH):
+    """Load employee photo as API payload / 将员工头像加载为API载荷"""
+    with open(path, 'rb') as f:
+        content = f.read()
+    return {
+        'name': os.path.basename(path),
+        'type': 'image/jpeg',
+        'size': str(len(content)),
+        'base64': base64.b64encode(content).decode('ascii'),
+    }
+
+async def protocol_login(session):
+    """Session-cookie login through the auth form / 通过认证表单进行会话cookie登录"""
+    async with session.get(app_url('auth/login')) as response:
+        page = await response.text()
+    match = TOKEN_PATTERN.search(page)
+    if not match:
+        raise ProtocolError("Login token not found / 未找到登录令牌")
+    token = html.unescape(match.group(1)).strip('"')
+    form = {'_token': token, 'username': USERNAME, 'password': PASSWORD}
+    async with session.post(app_url('auth/validate'), data=form) as response:
+        await response.read()
+        if 'dashboard' not in str(response.url):
+            raise ProtocolError(f"Login rejected, landed on {response.url} / 登录被拒绝，跳转到 {response.url}")
+
+async def protocol_add_employee(session, record, photo):
+    """Create an employee and upload the photo / 创建员工并上传头像"""
+    payload = {
+        'firstName': record.first_name,
+        'middleName': record.middle_name,
+        'lastName': record.last_name,
+        'empPicture': None,
+        'employeeId': record.employee_id,
+    }
+    async with session.post(app_url('api/v2/pim/employees'), json=payload) as response:
+        if response.status != 200:
+            raise ProtocolError(f"Employee create returned HTTP {response.status} / 创建员工返回HTTP {response.status}")
+        emp_number = (await response.json())['data']['empNumber']
+    async with session.put(app_url(f'api/v2/pim/employees/{emp_number}/picture'), json={'empPicture': photo}) as response:
+        if response.status != 200:
+            raise ProtocolError(f"Photo upload returned HTTP {response.status} / 上传头像返回HTTP {response.status}")
+    return emp_number
+
+async def protocol_find_employee(session, employee_id):
+    """Look up the empNumber of an employee ID / 查询员工ID对应的empNumber"""
+    params = {'nameOrId': employee_id, 'includeEmployees': 'currentAndPast', 'limit': '50'}
+    async with session.get(app_url('api/v2/pim/employees'), params=params) as response:
+        if response.status != 200:
+            raise ProtocolError(f"Employee search returned HTTP {response.status} / 查询员工返回HTTP {response.status}")
+        employees = (await response.json())['data']
+    for employee in employees:
+        if employee.get('employeeId') == employee_id:
+            return employee['empNumber']
+    return None
+
+async def protocol_delete_employees(session, records, batch_size=DEFAULT_DELETE_BATCH):
+    """Delete employees with one request per batch, returning the deleted records / 每批一个请求删除员工, 返回已删除的记录"""
+    # Records created without a known empNumber are looked up first / 先查询未知empNumber的记录
+    missing = [record for record in records if record.emp_number is None]
+    numbers = await asyncio.gather(*(protocol_find_employee(session, record.employee_id) for record in missing), return_exceptions=True)
+    for record, number in zip(missing, numbers):
+        record.emp_number = number if isinstance(number, int) else None
+    # Records never found were not created, so they count as deleted / 从未找到的记录未被创建, 视为已删除
+    deleted = [record for record, number in zip(missing, numbers) if number is None]
+    known = [record for record in records if record.emp_number is not None]
+
+    async def delete_batch(batch):
+        async with session.delete(app_url('api/v2/pim/employees'), json={'ids': [record.emp_number for record in batch]}) as response:
+            if response.status != 200:
+                raise ProtocolError(f"Employee delete returned HTTP {response.status} / 删除员工返回HTTP {response.status}")
+        return batch
+
+    batches = [known[i:i + batch_size] for i in range(0, len(known), batch_size)]
+    for result in await asyncio.gather(*(delete_batch(batch) for batch in batches), return_exceptions=True):
+        if isinstance(result, BaseException):
+            logger.error("Employee delete batch failed: %s / 员工批量删除失败: %s", result, result)
+        else:
+            deleted.extend(result)
+    return deleted
+
+async def _cleanup_employees(records, batch_size):
+    """Log in and delete records / 登录并删除记录"""
+    timeout = aiohttp.ClientTimeout(total=DEFAULT_TIMEOUT)
+    async with aiohttp.ClientSession(cookie_jar=aiohttp.CookieJar(unsafe=True), timeout=timeout) as session:
+        await protocol_login(session)
+        return await protocol_delete_employees(session, records, batch_size)
+
+def cleanup_employees(records, batch_size=DEFAULT_DELETE_BATCH):
+    """Blocking entry point used by EmployeeCleaner / EmployeeCleaner使用的阻塞入口"""
+    return asyncio.run(_cleanup_employees(records, batch_size))
+
+async def virtual_user(user, iterations, connector, metrics, photo, employee_data, start_delay=0):
+    """Run login once then add employees / 登录一次后循环添加员工"""
+    if start_delay:
+        await asyncio.sleep(start_delay)
+    timeout = aiohttp.ClientTimeout(total=DEFAULT_TIMEOUT)
+    async with aiohttp.ClientSession(connector=connector, connector_owner=False,
+                                     cookie_jar=aiohttp.CookieJar(unsafe=True), timeout=timeout) as session:
+        start_time = time.perf_counter()
+        try:
+            await protocol_login(session)
+            # Kept out of response_times, which hold add-employee latency only / 不计入仅含添加员工耗时的response_times
+            metrics.record_step('login', time.perf_counter() - start_time)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ProtocolError) as e:
+            logger.error("VU %s login failed: %s / 虚拟用户 %s 登录失败: %s", user, e, user, e)
+            metrics.record_result(time.perf_counter() - start_time, False)
+            return
+
+        for iteration in range(iterations):
+            start_time = time.perf_counter()
+            record = employee_data.allocate()
+            try:
+                employee_data.mark_created(record, await protocol_add_employee(session, record, photo))
+                duration = time.perf_counter() - start_time
+                metrics.record_response_time(duration)
+                metrics.record_result(duration, True)
+            except (aiohttp.ClientError, asyncio.TimeoutError, ProtocolError, KeyError, ValueError) as e:
+                # The employee may exist even if a later call failed / 后续调用失败时员工仍可能已创建
+                employee_data.mark_created(record)
+                logger.error("VU %s iteration %s failed: %s / 虚拟用户 %s 第 %s 次迭代失败: %s", user, iteration + 1, e, user, iteration + 1, e)
+                metrics.record_result(time.perf_counter() - start_time, False)
+
+async def run_protocol_load(users=DEFAULT_USERS, iterations=DEFAULT_ITERATIONS,
+                            connections=DEFAULT_CONNECTIONS, ramp_up=0, metrics=None, employee_data=None):
+    """Run concurrent virtual users over pooled keep-alive connections / 通过复用的长连接运行并发虚拟用户"""
+    metrics = metrics or PerformanceMetrics()
+    employee_data = employee_data or EmployeeDataPool(size=users * iterations)
+    photo = load_photo()
+    logger.info("Starting protocol load: %s users x %s iterations / 开始协议级负载: %s 个用户 x %s 次迭代", users, iterations, users, iterations)
+    connector = aiohttp.TCPConnector(limit=connections, keepalive_timeout=60)
+    try:
+        metrics.start_test()
+        tasks = [
+            virtual_user(user, iterations, connector, metrics, photo, employee_data, ramp_up * user / max(1, users))
+            for user in range(users)
+        ]
+        await asyncio.gather(*tasks)
+        metrics.record_metrics()
+    finally:
+        await connector.close()
+    return metrics
+
+def main():
+    """Command line entry point / 命令行入口"""
+    parser = argparse.ArgumentParser(description="OrangeHRM protocol-level load generator / OrangeHRM协议级负载生成器")
+    parser.add_argument('--users', type=int, default=DEFAULT_USERS, help="Concurrent virtual users / 并发虚拟用户数")
+    parser.add_argument('--iterations', type=int, default=DEFAULT_ITERATIONS, help="Add-employee iterations per user / 每个用户的添加员工次数")
+    parser.add_argument('--connections', type=int, default=DEFAULT_CONNECTIONS, help="Keep-alive connection pool size / 长连接池大小")
+    parser.add_argument('--ramp-up', type=float, default=0, help="Seconds to spread user start over / 用户启动分散的秒数")
+    parser.add_argument('--keep-data', action='store_true', help="Do not delete the created employees / 不删除创建的员工")
+    parser.add_argument('--samples', help="Write raw samples to this sample store file / 将原始样本写入此样本存储文件")
+    parser.add_argument('--start-at', type=float, help="Wall-clock time to start at, as epoch seconds / 开始时间(epoch秒)")
+    args = parser.parse_args()
+
+    employee_data = EmployeeDataPool(size=args.users * args.iterations)
+    metrics = PerformanceMetrics()
+    if args.samples:
+        metrics.sample_writer = SampleWriter(args.samples, meta={'mode': 'protocol', 'users': args.users, 'iterations': args.iterations})
+    wait_for_start(args.start_at)
+    try:
+        asyncio.run(run_protocol_load(args.users, args.iterations, args.connections, args.ramp_up, metrics=metrics, employee_data=employee_data))
+    finally:
+        if metrics.sample_writer is not None:
+            metrics.sample_writer.close()
+    if not args.keep_data:
+        EmployeeCleaner(employee_data, cleanup_employees).stop()
+    summary = metrics.get_summary()
+    if isinstance(summary, str):
+        logger.info(summary)
+        return 1
+    logger.info("Total Tests: %s / 总测试次数: %s", summary['total_tests'], summary['total_tests'])
+    logger.info("Success Rate: %.2f%% / 成功率: %.2f%%", summary['success_rate'], summary['success_rate'])
+    logger.info("Average Response Time: %.3fs / 平均响应时间: %.3f秒", summary['avg_response'], summary['avg_response'])
+    response = summary['response_percentiles']
+    logger.info("Response Time p50/p95/p99: %.3f/%.3f/%.3fs / 响应时间 p50/p95/p99: %.3f/%.3f/%.3f秒", response['p50'], response['p95'], response['p99'], response['p50'], response['p95'], response['p99'])
+    logger.info("Throughput: %.2f iterations/s / 吞吐量: %.2f 次迭代/秒", summary['throughput'], summary['throughput'])
+    return 0 if summary['successful_tests'] == summary['total_tests'] else 1
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,147 @@
+import time
+import weakref
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from logger_config import setup_logger
+
+# Set up logger / 设置日志记录器
+logger = setup_logger()
+
+# OrangeHRM loader overlays that block interaction / 阻塞交互的OrangeHRM加载遮罩
+LOADER_SELECTORS = [
+    ".oxd-form-loader",
+    ".oxd-loading-spinner",
+    ".oxd-loading-spinner-container",
+]
+
+# Default readiness settings / 默认就绪等待设置
+DEFAULT_TIMEOUT = 30
+DEFAULT_POLL_FREQUENCY = 0.05
+DEFAULT_QUIET_MS = 100
+
+# Tracks in-flight XHR/fetch requests in the page / 跟踪页面中进行中的XHR/fetch请求
+NETWORK_TRACKER_SCRIPT = """
+(function () {
+    if (window.__hrmNetTracker) { return; }
+    var tracker = window.__hrmNetTracker = {pending: 0, lastActivity: Date.now()};
+    function start() { tracker.pending++; tracker.lastActivity = Date.now(); }
+    function done() { tracker.pending = Math.max(0, tracker.pending - 1); tracker.lastActivity = Date.now(); }
+    var send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        start();
+        this.addEventListener('loadend', done);
+        return send.apply(this, arguments);
+    };
+    if (window.fetch) {
+        var originalFetch = window.fetch;
+        window.fetch = function () {
+            start();
+            return originalFetch.apply(this, arguments).then(
+                function (response) { done(); return response; },
+                function (error) { done(); throw error; }
+            );
+        };
+    }
+})();
+"""
+
+# Returns true once the document, loaders and network are all idle / 文档、加载遮罩和网络均空闲时返回true
+READY_CHECK_SCRIPT = """
+var selectors = arguments[0];
+var quietMs = arguments[1];
+if (document.readyState !== 'complete') { return false; }
+for (var i = 0; i < selectors.length; i++) {
+    var loaders = document.querySelectorAll(selectors[i]);
+    for (var j = 0; j < loaders.length; j++) {
+        if (loaders[j].getClientRects().length > 0) { return false; }
+    }
+}
+var tracker = window.__hrmNetTracker;
+if (!tracker) { return true; }
+if (tracker.pending > 0) { return false; }
+return (Date.now() - tracker.lastActivity) >= quietMs;
+"""
+
+class ReadinessEngine:
+    """Wait on real page signals instead of fixed sleeps / 基于真实页面信号而非固定延时进行等待"""
+    def __init__(self, driver, metrics=None, timeout=DEFAULT_TIMEOUT,
+                 poll_frequency=DEFAULT_POLL_FREQUENCY, quiet_ms=DEFAULT_QUIET_MS):
+        self.driver = driver
+        self.metrics = metrics
+        self.timeout = timeout
+        self.poll_frequency = poll_frequency
+        self.quiet_ms = quiet_ms
+        self.wait_stats = {}
+        self.install_network_tracker()
+
+    def install_network_tracker(self):
+        """Install XHR/fetch tracker for current and future documents / 为当前及后续文档安装XHR/fetch跟踪器"""
+        try:
+            self.driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": NETWORK_TRACKER_SCRIPT})
+        except (AttributeError, WebDriverException) as e:
+            logger.debug("CDP tracker injection unavailable: %s / CDP跟踪器注入不可用: %s", e, e)
+        self._inject_current_document()
+
+    def _inject_current_document(self):
+        """Inject tracker into the already loaded document / 向已加载文档注入跟踪器"""
+        try:
+            self.driver.execute_script(NETWORK_TRACKER_SCRIPT)
+        except WebDriverException as e:
+            logger.debug("Tracker injection failed: %s / 跟踪器注入失败: %s", e, e)
+
+    def _is_ready(self, driver):
+        """Single readiness probe / 单次就绪探测"""
+        return driver.execute_script(READY_CHECK_SCRIPT, LOADER_SELECTORS, self.quiet_ms)
+
+    def _record(self, label, elapsed):
+        """Record how long a wait took / 记录等待实际耗时"""
+        count, total, longest = self.wait_stats.get(label, (0, 0.0, 0.0))
+        self.wait_stats[label] = (count + 1, total + elapsed, max(longest, elapsed))
+        if self.metrics is not None:
+            self.metrics.record_wait_time(label, elapsed)
+        logger.debug("Wait '%s' took %.3fs / 等待 '%s' 耗时 %.3f秒", label, elapsed, label, elapsed)
+
+    def wait_for(self, condition, label, timeout=None):
+        """Wait for an arbitrary condition and record its duration / 等待任意条件并记录耗时"""
+        start_time = time.perf_counter()
+        try:
+            result = WebDriverWait(self.driver, timeout or self.timeout, poll_frequency=self.poll_frequency).until(condition)
+        except TimeoutException:
+            logger.error("Timeout waiting for readiness: %s / 等待就绪超时: %s", label, label)
+            raise
+        self._record(label, time.perf_counter() - start_time)
+        return result
+
+    def wait_until_ready(self, label="page_ready", timeout=None):
+        """Wait until loaders are gone and the network is idle / 等待加载遮罩消失且网络空闲"""
+        self._inject_current_document()
+        return self.wait_for(self._is_ready, label, timeout)
+
+    def wait_for_route(self, url_fragment, label=None, timeout=None):
+        """Wait for route change to finish and the page to settle / 等待路由切换完成且页面稳定"""
+        label = label or f"route:{url_fragment}"
+        start_time = time.perf_counter()
+        self.wait_for(lambda driver: url_fragment in driver.current_url, f"{label}:url", timeout)
+        self.wait_until_ready(f"{label}:settle", timeout)
+        elapsed = time.perf_counter() - start_time
+        self._record(label, elapsed)
+        return elapsed
+
+    def get_summary(self):
+        """Get per-label wait statistics / 获取按标签统计的等待数据"""
+        return {
+            label: {'count': count, 'total': total, 'avg': total / count, 'max': longest}
+            for label, (count, total, longest) in self.wait_stats.items()
+        }
+
+_engines = weakref.WeakKeyDictionary()
+
+def get_readiness(driver, metrics=None):
+    """Get the readiness engine bound to a driver / 获取绑定到driver的就绪等待引擎"""
+    engine = _engines.get(driver)
+    if engine is None:
+        engine = ReadinessEngine(driver, metrics)
+        _engines[driver] = engine
+    elif metrics is not None:
+        engine.metrics = metrics
+    return engine
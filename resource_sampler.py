@@ -0,0 +1,134 @@
+import os
+import time
+import threading
+from collections import deque
+import psutil
+from logger_config import setup_logger
+
+# Set up logger / 设置日志记录器
+logger = setup_logger()
+
+# Default sampler settings / 默认采样设置
+DEFAULT_INTERVAL = 1.0
+DEFAULT_CAPACITY = 3600
+
+def get_worker_id():
+    """Get xdist worker id, or 'main' outside xdist / 获取xdist worker标识, 非xdist时为'main'"""
+    return os.environ.get('PYTEST_XDIST_WORKER', 'main')
+
+class ResourceSampler:
+    """Background sampler for browser and driver process trees / 浏览器和驱动进程树的后台采样器
+
+    Each sample is (timestamp, label, cpu_percent, rss_bytes, threads, handles), kept in a
+    fixed-size ring buffer. Timestamps use time.time() so they line up with iteration timings.
+    每个样本为 (时间戳, 标签, CPU百分比, RSS字节, 线程数, 句柄数)，保存在固定大小的环形缓冲中。
+    """
+    def __init__(self, interval=None, capacity=None):
+        self.interval = interval or float(os.environ.get('RESOURCE_SAMPLE_INTERVAL', DEFAULT_INTERVAL))
+        self.samples = deque(maxlen=capacity or int(os.environ.get('RESOURCE_SAMPLE_CAPACITY', DEFAULT_CAPACITY)))
+        self.writer = None
+        self._roots = {}
+        self._processes = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def track(self, label, pid):
+        """Start sampling the process tree rooted at pid / 开始采样以pid为根的进程树"""
+        try:
+            with self._lock:
+                self._roots[label] = psutil.Process(pid)
+        except psutil.Error as e:
+            logger.warning("Cannot track process %s: %s / 无法跟踪进程 %s: %s", pid, e, pid, e)
+
+    def untrack(self, label):
+        """Stop sampling a process tree / 停止采样进程树"""
+        with self._lock:
+            self._roots.pop(label, None)
+
+    def _process(self, process):
+        """Reuse psutil handles so cpu_percent() measures since the last sample / 复用psutil句柄以便cpu_percent()计算自上次采样以来的值"""
+        key = (process.pid, process.create_time())
+        cached = self._processes.get(key)
+        if cached is None:
+            cached = self._processes[key] = process
+            cached.cpu_percent(None)
+        return cached
+
+    def sample_tree(self, root):
+        """Aggregate CPU, RSS, threads and handles over a process tree / 汇总进程树的CPU、RSS、线程数和句柄数"""
+        cpu = 0.0
+        rss = threads = handles = 0
+        try:
+            tree = [root] + root.children(recursive=True)
+        except psutil.Error:
+            return None
+        for process in tree:
+            try:
+                process = self._process(process)
+                with process.oneshot():
+                    cpu += process.cpu_percent(None)
+                    rss += process.memory_info().rss
+                    threads += process.num_threads()
+                    handles += process.num_handles() if os.name == 'nt' else process.num_fds()
+            except psutil.Error:
+                continue
+        return cpu, rss, threads, handles
+
+    def sample_once(self):
+        """Take one sample of every tracked tree / 对所有跟踪的进程树采样一次"""
+        with self._lock:
+            roots = list(self._roots.items())
+        timestamp = time.time()
+        for label, root in roots:
+            values = self.sample_tree(root)
+            if values is not None:
+                self.samples.append((timestamp, label) + values)
+                if self.writer is not None:
+                    self.writer.resource(timestamp, label, *values)
+        # Drop handles of processes that have exited / 清除已退出进程的句柄
+        self._processes = {key: process for key, process in self._processes.items() if process.is_running()}
+
+    def _run(self):
+        """Sampling loop / 采样循环"""
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample_once()
+            except Exception as e:
+                logger.error("Resource sampling failed: %s / 资源采样失败: %s", e, e)
+
+    def start(self):
+        """Start the sampler thread / 启动采样线程"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="resource-sampler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the sampler thread / 停止采样线程"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval * 2)
+            self._thread = None
+
+    def series(self, label=None):
+        """Timestamped samples, optionally for one label / 带时间戳的样本, 可按标签过滤"""
+        return [
+            {'timestamp': timestamp, 'label': sample_label, 'cpu': cpu, 'rss': rss, 'threads': threads, 'handles': handles}
+            for timestamp, sample_label, cpu, rss, threads, handles in list(self.samples)
+            if label is None or sample_label == label
+        ]
+
+    def get_summary(self):
+        """Per-label average CPU and peak RSS, threads and handles / 各标签的平均CPU及峰值RSS、线程数和句柄数"""
+        summary = {}
+        for timestamp, label, cpu, rss, threads, handles in list(self.samples):
+            entry = summary.setdefault(label, {'samples': 0, 'cpu_total': 0.0, 'peak_rss': 0, 'peak_threads': 0, 'peak_handles': 0})
+            entry['samples'] += 1
+            entry['cpu_total'] += cpu
+            entry['peak_rss'] = max(entry['peak_rss'], rss)
+            entry['peak_threads'] = max(entry['peak_threads'], threads)
+            entry['peak_handles'] = max(entry['peak_handles'], handles)
+        for entry in summary.values():
+            entry['avg_cpu'] = entry.pop('cpu_total') / entry['samples']
+        return summary
@@ -1,55 +1,192 @@
 import subprocess
 import sys
 import os
+import re
+import json
+import argparse
+import threading
+from metrics_aggregation import new_run_id, aggregate_run
+import standin_server
+from network_profiles import parse_network_profile, sweep_report, log_sweep_report, SWEEP_FILE
 from logger_config import setup_logger
 
 # Set up logger / 设置日志记录器
 logger = setup_logger()
 
+# Test file and HTML report of each suite / 各测试套件的测试文件和HTML报告
+SUITES = {
+    'functional': ('test_orangehrm.py', 'report.html'),
+    'stress': ('stress_test_orangehrm.py', 'stress_report.html'),
+}
+
+# Default seconds between live progress lines / 默认实时进度输出间隔秒数
+DEFAULT_PROGRESS_INTERVAL = 10.0
+
+# Exit code when the run is interrupted, as with SIGINT / 运行被中断时的退出码, 与SIGINT一致
+INTERRUPTED = 130
+
+class SuiteRun:
+    """A pytest child process whose output is streamed line by line / 逐行流式输出的pytest子进程"""
+    def __init__(self, suite, command, env):
+        self.suite = suite
+        self.command = command
+        self.env = env
+        self.process = None
+        self._reader = None
+
+    def start(self):
+        """Start the child and the output reader thread / 启动子进程和输出读取线程"""
+        logger.info("Starting %s suite: %s / 开始执行%s测试套件: %s", self.suite, ' '.join(self.command), self.suite, ' '.join(self.command))
+        self.process = subprocess.Popen(self.command, env=self.env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                        text=True, encoding='utf-8', errors='replace', bufsize=1)
+        self._reader = threading.Thread(target=self._pump, name=f"{self.suite}-output", daemon=True)
+        self._reader.start()
+        return self
+
+    def _pump(self):
+        """Forward child output with a suite prefix as it arrives / 实时转发子进程输出并加上套件前缀"""
+        for line in self.process.stdout:
+            sys.stdout.write(f"[{self.suite}] {line}")
+            sys.stdout.flush()
+        self.process.stdout.close()
+
+    def wait(self):
+        """Wait for the child and return its exit code / 等待子进程并返回退出码"""
+        returncode = self.process.wait()
+        self._reader.join()
+        if returncode == 0:
+            logger.info("%s suite completed successfully / %s测试套件执行成功", self.suite, self.suite)
+        else:
+            logger.error("%s suite failed with exit code %s / %s测试套件失败, 退出码 %s", self.suite, returncode, self.suite, returncode)
+        return returncode
+
+    def terminate(self):
+        """Stop the child if it is still running / 如子进程仍在运行则停止"""
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+
+def build_command(suite, workers=None):
+    """Build the pytest command of a suite / 构建测试套件的pytest命令"""
+    test_file, report = SUITES[suite]
+    command = [sys.executable, "-m", "pytest", test_file, "-v",
+               f"--html={report}", "--self-contained-html",
+               f"--alluredir={os.path.join('allure-results', suite)}"]
+    if workers:
+        command += ["-n", str(workers)]
+    return command
+
+def build_env(suite, args):
+    """Child environment with scenario, target and run id / 包含场景、目标和运行ID的子进程环境"""
+    env = os.environ.copy()
+    env['PYTHONUNBUFFERED'] = '1'
+    # Separate run ids keep sample stores of parallel suites apart / 独立运行ID使并行套件的样本存储互不干扰
+    env['STRESS_RUN_ID'] = f"{new_run_id()}_{suite}"
+    if args.base_url:
+        env['ORANGEHRM_BASE_URL'] = args.base_url
+    if args.username:
+        env['ORANGEHRM_USERNAME'] = args.username
+    if args.password:
+        env['ORANGEHRM_PASSWORD'] = args.password
+    if args.browser_profile:
+        env['BROWSER_PROFILE'] = args.browser_profile
+    if args.browser_cache:
+        env['BROWSER_CACHE'] = args.browser_cache
+    if args.network_profile:
+        env['NETWORK_PROFILE'] = args.network_profile
+    if suite == 'stress':
+        if args.iterations is not None:
+            env['STRESS_TEST_ITERATIONS'] = str(args.iterations)
+        if args.duration is not None:
+            env['STRESS_TEST_DURATION'] = str(args.duration)
+        if args.profile:
+            env['STRESS_TEST_PROFILE'] = args.profile
+        if args.soak:
+            env['STRESS_SOAK_DURATION'] = args.soak
+        if args.prometheus_port:
+            env['PROMETHEUS_PORT'] = str(args.prometheus_port)
+    return env
+
+def report_progress(run_id, stop, interval):
+    """Log live throughput, p95 and errors from the worker spool files / 根据worker缓冲文件输出实时吞吐量、p95和错误数"""
+    while not stop.wait(interval):
+        try:
+            merged, per_worker, _ = aggregate_run(run_id)
+        except Exception as e:
+            logger.debug("Progress read failed: %s / 读取进度失败: %s", e, e)
+            continue
+        summary = merged.get_summary()
+        if isinstance(summary, str):
+            continue
+        p95 = summary['duration_percentiles']['p95']
+        errors = sum(summary['errors'].values())
+        logger.info("Progress: %s iterations, %.2f iterations/s, p95 %.3fs, %s errors, %s workers / 进度: %s 次迭代, %.2f 次迭代/秒, p95 %.3f秒, %s 个错误, %s 个worker",
+                    summary['total_tests'], summary['throughput'], p95, errors, len(per_worker),
+                    summary['total_tests'], summary['throughput'], p95, errors, len(per_worker))
+
+def run_suites(suites, args):
+    """Run suites in parallel and return the combined exit code / 并行运行测试套件并返回合并后的退出码"""
+    runs = []
+    stop = threading.Event()
+    try:
+        for suite in suites:
+            env = build_env(suite, args)
+            workers = args.workers if suite == 'stress' else args.functional_workers
+            runs.append(SuiteRun(suite, build_command(suite, workers), env).start())
+            if suite == 'stress' and args.progress_interval > 0:
+                threading.Thread(target=report_progress, args=(env['STRESS_RUN_ID'], stop, args.progress_interval),
+                                 name="stress-progress", daemon=True).start()
+        # Any failing suite fails the run with its own exit code / 任一套件失败时以其退出码作为整体结果
+        return max(run.wait() for run in runs)
+    except KeyboardInterrupt:
+        logger.info("Test suite interrupted by user / 测试套件被用户中断")
+        for run in runs:
+            run.terminate()
+        return INTERRUPTED
+    except OSError as e:
+        logger.error("Error starting test suite: %s / 启动测试套件时发生错误: %s", e, e)
+        for run in runs:
+            run.terminate()
+        return 1
+    finally:
+        stop.set()
+
+def run_network_sweep(args):
+    """Run the stress suite once per network profile and report step scaling / 每个网络配置运行一次压力测试并报告步骤延迟变化"""
+    profiles = [spec.strip() for spec in args.network_sweep.split(',') if spec.strip()]
+    for spec in profiles:
+        parse_network_profile(spec)
+    run_ids = []
+    exit_code = 0
+    for spec in profiles:
+        env = build_env('stress', args)
+        env['NETWORK_PROFILE'] = spec
+        env['STRESS_RUN_ID'] = f"{env['STRESS_RUN_ID']}_{re.sub(r'[^A-Za-z0-9.-]+', '-', spec)}"
+        run = SuiteRun(f"stress:{spec}", build_command('stress', args.workers), env).start()
+        try:
+            exit_code = max(exit_code, run.wait())
+        except KeyboardInterrupt:
+            logger.info("Test suite interrupted by user / 测试套件被用户中断")
+            run.terminate()
+            return INTERRUPTED
+        run_ids.append(env['STRESS_RUN_ID'])
+    try:
+        report = sweep_report(run_ids)
+    except (FileNotFoundError, ValueError) as e:
+        logger.error("Network sweep report failed: %s / 网络扫描报告生成失败: %s", e, e)
+        return max(exit_code, 1)
+    log_sweep_report(report)
+    with open(SWEEP_FILE, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    logger.info("Network sweep saved to %s / 网络扫描结果已保存至 %s", SWEEP_FILE, SWEEP_FILE)
+    return exit_code
+
 def run_full_process_test():
     """Run single full process test / 运行单次全流程测试"""
-    logger.info("Starting full process test / 开始执行全流程测试")
-    try:
-        result = subprocess.run([
-            "pytest",
-            "test_orangehrm.py",
-            "-v",
-            "--html=report.html",
-            "--self-contained-html"
-        ], capture_output=True, text=True)
-        
-        if result.returncode == 0:
-            logger.info("Full process test completed successfully / 全流程测试执行成功")
-        else:
-            logger.error(f"Full process test failed: {result.stderr} / 全流程测试失败: {result.stderr}")
-            
-    except Exception as e:
-        logger.error(f"Error running full process test: {str(e)} / 运行全流程测试时发生错误: {str(e)}")
+    return run_suites(['functional'], parse_args(['functional']))
 
 def run_stress_test(iterations):
     """Run stress test with specified iterations / 运行指定次数的压力测试"""
-    logger.info(f"Starting stress test with {iterations} iterations / 开始执行{iterations}次压力测试")
-    try:
-        # Set environment variable for iterations / 设置迭代次数的环境变量
-        env = os.environ.copy()
-        env['STRESS_TEST_ITERATIONS'] = str(iterations)
-        
-        result = subprocess.run([
-            "pytest",
-            "stress_test_orangehrm.py",
-            "-v",
-            "--html=stress_report.html",
-            "--self-contained-html",
-            "-n", "auto"
-        ], capture_output=True, text=True, env=env)
-        
-        if result.returncode == 0:
-            logger.info("Stress test completed failed / 压力测试执行失败")
-        else:
-            logger.error(f"Stress test completed successfully: {result.stderr} / 压力测试成功: {result.stderr}")
-            
-    except Exception as e:
-        logger.error(f"Error running stress test: {str(e)} / 运行压力测试时发生错误: {str(e)}")
+    return run_suites(['stress'], parse_args(['stress', '--iterations', str(iterations)]))
 
 def get_user_choice():
     """Get user's choice for test mode / 获取用户选择的测试模式"""
@@ -58,19 +195,19 @@ def get_user_choice():
         print("1. Run Full Process Test / 运行全流程测试")
         print("2. Run Stress Test / 运行压力测试")
         print("3. Exit / 退出")
-        
+
         choice = input("\nPlease select an option (1-3) / 请选择选项 (1-3): ")
-        
+
         if choice == "1":
             return "full"
         elif choice == "2":
             while True:
                 try:
-                    iterations = int(input("\nEnter number of iterations (1-100) / 输入测试次数 (1-100): "))
-                    if 1 <= iterations <= 100:
+                    iterations = int(input("\nEnter number of iterations / 输入测试次数: "))
+                    if iterations >= 1:
                         return ("stress", iterations)
                     else:
-                        print("Please enter a number between 1 and 100 / 请输入1到100之间的数字")
+                        print("Please enter a positive number / 请输入正整数")
                 except ValueError:
                     print("Please enter a valid number / 请输入有效的数字")
         elif choice == "3":
@@ -78,28 +215,74 @@ def get_user_choice():
         else:
             print("Invalid option. Please try again. / 无效选项，请重试。")
 
-def main():
+def interactive():
+    """Interactive menu, used when no scenario is given / 交互式菜单, 未指定场景时使用"""
+    while True:
+        choice = get_user_choice()
+
+        if choice == "exit":
+            print("\nExiting test suite / 退出测试套件")
+            break
+        elif choice == "full":
+            run_full_process_test()
+        elif isinstance(choice, tuple) and choice[0] == "stress":
+            run_stress_test(choice[1])
+
+        input("\nPress Enter to continue / 按Enter继续...")
+    return 0
+
+def parse_args(argv=None):
+    """Parse command line arguments / 解析命令行参数"""
+    parser = argparse.ArgumentParser(description="OrangeHRM test orchestrator / OrangeHRM测试编排")
+    parser.add_argument('scenario', nargs='?', choices=['functional', 'stress', 'all'],
+                        help="Suite to run; 'all' runs both in parallel. Omit for the interactive menu / 要运行的套件；'all' 并行运行两者。省略则进入交互菜单")
+    parser.add_argument('--iterations', type=int, help="Stress iterations / 压力测试迭代次数")
+    parser.add_argument('--duration', type=float, help="Stress duration limit in seconds / 压力测试时长限制(秒)")
+    parser.add_argument('--soak', help="Soak duration such as 12h, see STRESS_SOAK_DURATION / 浸泡时长(如12h), 见STRESS_SOAK_DURATION")
+    parser.add_argument('--profile', help="Open-loop load profile, see STRESS_TEST_PROFILE / 开环负载曲线, 见STRESS_TEST_PROFILE")
+    parser.add_argument('--workers', default='auto', help="xdist workers for the stress suite, 0 disables xdist / 压力测试的xdist worker数, 0为不使用xdist")
+    parser.add_argument('--functional-workers', help="xdist workers for the functional suite / 功能测试的xdist worker数")
+    parser.add_argument('--base-url', help="Target OrangeHRM URL / 目标OrangeHRM地址")
+    parser.add_argument('--username', help="Login username / 登录用户名")
+    parser.add_argument('--password', help="Login password / 登录密码")
+    parser.add_argument('--browser-profile', choices=['default', 'lean'], help="Browser profile, see BROWSER_PROFILE / 浏览器配置, 见BROWSER_PROFILE")
+    parser.add_argument('--browser-cache', choices=['warm', 'cold'], help="HTTP cache mode, see BROWSER_CACHE / HTTP缓存模式, 见BROWSER_CACHE")
+    parser.add_argument('--network-profile', help="Emulated network profile, see NETWORK_PROFILE / 模拟的网络配置, 见NETWORK_PROFILE")
+    parser.add_argument('--network-sweep', help="Comma-separated network profiles to run the stress suite across / 逐个运行压力测试的网络配置, 逗号分隔")
+    parser.add_argument('--prometheus-port', type=int, help="Serve live stress metrics for Prometheus on this port, see PROMETHEUS_PORT / 在此端口提供Prometheus实时压力指标, 见PROMETHEUS_PORT")
+    parser.add_argument('--standin', action='store_true', help="Run against a local stand-in server, see STANDIN_* / 针对本地替身服务运行, 见STANDIN_*")
+    parser.add_argument('--standin-port', type=int, default=standin_server.DEFAULT_PORT, help="Port of the stand-in server / 替身服务端口")
+    parser.add_argument('--progress-interval', type=float, default=DEFAULT_PROGRESS_INTERVAL,
+                        help="Seconds between progress lines, 0 disables / 进度输出间隔秒数, 0为关闭")
+    return parser.parse_args(argv)
+
+def main(argv=None):
     """Main function / 主函数"""
+    args = parse_args(argv)
+    server = None
     try:
-        while True:
-            choice = get_user_choice()
-            
-            if choice == "exit":
-                print("\nExiting test suite / 退出测试套件")
-                break
-            elif choice == "full":
-                run_full_process_test()
-            elif isinstance(choice, tuple) and choice[0] == "stress":
-                run_stress_test(choice[1])
-                
-            input("\nPress Enter to continue / 按Enter继续...")
-            
+        if args.scenario is None:
+            return interactive()
+        if args.standin:
+            server = standin_server.launch(port=args.standin_port)
+            args.base_url = args.base_url or standin_server.base_url(port=args.standin_port)
+            logger.info("Using stand-in server at %s / 使用替身服务 %s", args.base_url, args.base_url)
+        if args.network_sweep:
+            return run_network_sweep(args)
+        suites = list(SUITES) if args.scenario == 'all' else [args.scenario]
+        return run_suites(suites, args)
     except KeyboardInterrupt:
         print("\nTest suite interrupted by user / 测试套件被用户中断")
         logger.info("Test suite interrupted by user / 测试套件被用户中断")
+        return INTERRUPTED
     except Exception as e:
         print(f"\nAn error occurred: {str(e)} / 发生错误: {str(e)}")
-        logger.error(f"Error in main function: {str(e)} / 主函数中发生错误: {str(e)}")
+        logger.error("Error in main function: %s / 主函数中发生错误: %s", e, e)
+        return 1
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,337 @@
+import os
+import sys
+import glob
+import json
+import shutil
+import time
+import struct
+import argparse
+import threading
+from histogram import LogLinearHistogram
+from logger_config import setup_logger
+
+# Set up logger / 设置日志记录器
+logger = setup_logger()
+
+# Raw sample runs and stored baselines / 原始样本运行目录和基线目录
+RUNS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Runs')
+BASELINES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Baselines')
+SAMPLE_SUFFIX = '.samples'
+
+# Default regression thresholds in percent / 默认回归阈值(百分比)
+DEFAULT_P95_THRESHOLD = 10.0
+DEFAULT_THROUGHPUT_THRESHOLD = 10.0
+# Latency increases smaller than this are treated as noise / 小于该值的延迟增加视为噪声
+MIN_REGRESSION_SECONDS = 0.005
+
+# Seconds between flushes, so the files can be followed while a run is in progress / 刷新间隔秒数, 便于运行期间跟踪文件
+DEFAULT_FLUSH_INTERVAL = 1.0
+
+MAGIC = b'OHRMSMP1'
+MAX_ERROR_LENGTH = 1024
+
+# Record layouts, each prefixed with a one-byte type tag / 记录布局, 每条记录以一个字节的类型标记开头
+NAME = struct.Struct('<HH')           # name id, byte length / 名称ID, 字节长度
+STEP = struct.Struct('<dIHf')         # timestamp, iteration, step name id, seconds / 时间戳, 迭代, 步骤名ID, 秒
+ITERATION = struct.Struct('<dIfB')    # timestamp, iteration, seconds, success / 时间戳, 迭代, 秒, 是否成功
+RESOURCE = struct.Struct('<dHfQII')   # timestamp, label id, cpu, rss, threads, handles / 时间戳, 标签ID, CPU, RSS, 线程数, 句柄数
+ERROR = struct.Struct('<dIHH')        # timestamp, iteration, error class id, message length / 时间戳, 迭代, 错误类别ID, 消息长度
+META = struct.Struct('<I')            # JSON byte length / JSON字节长度
+
+class SampleWriter:
+    """Append-only, buffered binary writer for raw samples / 追加写入、带缓冲的原始样本二进制写入器
+
+    Strings (step names, labels, error classes) are interned once per file so records stay fixed-size.
+    字符串(步骤名、标签、错误类别)在每个文件中只写一次，使记录保持定长。
+    """
+    def __init__(self, path, meta=None):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        is_new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, 'ab', buffering=64 * 1024)
+        self._names = {}
+        self._lock = threading.Lock()
+        self.flush_interval = float(os.environ.get('SAMPLE_FLUSH_INTERVAL', DEFAULT_FLUSH_INTERVAL))
+        self._last_flush = time.monotonic()
+        if is_new:
+            self._file.write(MAGIC)
+        if meta:
+            self.write_meta(meta)
+
+    def _name_id(self, name):
+        """Intern a string and return its id / 登记字符串并返回其ID"""
+        name_id = self._names.get(name)
+        if name_id is None:
+            name_id = self._names[name] = len(self._names)
+            encoded = name.encode('utf-8')[:65535]
+            self._file.write(b'N' + NAME.pack(name_id, len(encoded)) + encoded)
+        return name_id
+
+    def _write(self, record):
+        """Append a record, flushing at most once per interval; the lock must be held / 追加记录, 每个间隔最多刷新一次；调用时须持有锁"""
+        self._file.write(record)
+        now = time.monotonic()
+        if now - self._last_flush >= self.flush_interval:
+            self._file.flush()
+            self._last_flush = now
+
+    def write_meta(self, meta):
+        """Write run metadata as JSON / 以JSON写入运行元数据"""
+        encoded = json.dumps(meta).encode('utf-8')
+        with self._lock:
+            self._write(b'M' + META.pack(len(encoded)) + encoded)
+
+    def step(self, timestamp, iteration, path, duration):
+        """Write a step timing / 写入步骤耗时"""
+        with self._lock:
+            self._write(b'S' + STEP.pack(timestamp, iteration, self._name_id(path), duration))
+
+    def iteration(self, timestamp, iteration, duration, success):
+        """Write an iteration result / 写入迭代结果"""
+        with self._lock:
+            self._write(b'I' + ITERATION.pack(timestamp, iteration, duration, 1 if success else 0))
+
+    def resource(self, timestamp, label, cpu, rss, threads, handles):
+        """Write a resource sample / 写入资源样本"""
+        with self._lock:
+            self._write(b'R' + RESOURCE.pack(timestamp, self._name_id(label), cpu, rss, threads, handles))
+
+    def error(self, timestamp, iteration, error_class, message):
+        """Write an error / 写入错误"""
+        encoded = str(message).encode('utf-8')[:MAX_ERROR_LENGTH]
+        with self._lock:
+            self._write(b'E' + ERROR.pack(timestamp, iteration, self._name_id(error_class), len(encoded)) + encoded)
+
+    def flush(self):
+        """Flush buffered records to disk / 将缓冲记录写入磁盘"""
+        with self._lock:
+            self._file.flush()
+
+    def close(self):
+        """Flush and close the file / 刷新并关闭文件"""
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+def _read_exact(f, size):
+    """Read a length-prefixed payload, failing like struct on a short read / 读取带长度前缀的数据, 读取不足时与struct一样报错"""
+    data = f.read(size)
+    if len(data) < size:
+        raise struct.error(f"expected {size} bytes, got {len(data)}")
+    return data
+
+def read_samples(path, live=False):
+    """Yield (type, record) tuples from a sample file / 从样本文件逐条产出(类型, 记录)
+
+    With live=True the file is still being written, so a partial last record is expected.
+    live=True 表示文件仍在写入, 最后一条记录不完整属于正常情况。
+    """
+    names = {}
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"Not a sample file: {path} / 不是样本文件: {path}")
+        while True:
+            tag = f.read(1)
+            if not tag:
+                return
+            try:
+                if tag == b'N':
+                    name_id, length = NAME.unpack(f.read(NAME.size))
+                    names[name_id] = _read_exact(f, length).decode('utf-8')
+                elif tag == b'S':
+                    timestamp, iteration, name_id, duration = STEP.unpack(f.read(STEP.size))
+                    yield 'step', (timestamp, iteration, names[name_id], duration)
+                elif tag == b'I':
+                    timestamp, iteration, duration, success = ITERATION.unpack(f.read(ITERATION.size))
+                    yield 'iteration', (timestamp, iteration, duration, bool(success))
+                elif tag == b'R':
+                    timestamp, name_id, cpu, rss, threads, handles = RESOURCE.unpack(f.read(RESOURCE.size))
+                    yield 'resource', (timestamp, names[name_id], cpu, rss, threads, handles)
+                elif tag == b'E':
+                    timestamp, iteration, name_id, length = ERROR.unpack(f.read(ERROR.size))
+                    yield 'error', (timestamp, iteration, names[name_id], _read_exact(f, length).decode('utf-8', 'replace'))
+                elif tag == b'M':
+                    (length,) = META.unpack(f.read(META.size))
+                    yield 'meta', json.loads(_read_exact(f, length).decode('utf-8'))
+                else:
+                    raise ValueError(f"Corrupt record tag {tag!r} in {path} / {path} 中的记录标记 {tag!r} 已损坏")
+            except struct.error:
+                # Truncated tail from an interrupted run / 中断运行留下的截断尾部
+                if not live:
+                    logger.warning("Truncated sample file: %s / 样本文件被截断: %s", path, path)
+                return
+
+def resolve_run(name):
+    """Resolve a run id, baseline name or directory to its sample directory / 将运行ID、基线名称或目录解析为样本目录"""
+    for candidate in (name, os.path.join(RUNS_DIR, name), os.path.join(BASELINES_DIR, name)):
+        if os.path.isdir(candidate):
+            return candidate
+    raise FileNotFoundError(f"Run not found: {name} / 未找到运行: {name}")
+
+class RunStats:
+    """Latency distributions and throughput of a stored run / 已保存运行的延迟分布和吞吐量"""
+    def __init__(self, name):
+        self.name = name
+        self.iterations = LogLinearHistogram()
+        self.steps = {}
+        self.passed = 0
+        self.failed = 0
+        self.errors = {}
+        self.browser_profile = None
+        self.session_rss = {}
+        self.meta = {}
+        self.first_timestamp = None
+        self.last_timestamp = None
+
+    @classmethod
+    def load(cls, name, prefix='', live=False):
+        """Stream the sample files of a run, optionally only those starting with prefix, into histograms / 将运行的样本文件(可仅限指定前缀)流式读入直方图"""
+        stats = cls(name)
+        for path in sorted(glob.glob(os.path.join(resolve_run(name), f'{glob.escape(prefix)}*{SAMPLE_SUFFIX}'))):
+            for kind, record in read_samples(path, live):
+                if kind == 'step':
+                    timestamp, _, step, duration = record
+                    stats.steps.setdefault(step, LogLinearHistogram()).record(duration)
+                elif kind == 'iteration':
+                    timestamp, _, duration, success = record
+                    stats.iterations.record(duration)
+                    if success:
+                        stats.passed += 1
+                    else:
+                        stats.failed += 1
+                    stats.first_timestamp = min(timestamp - duration, stats.first_timestamp or timestamp)
+                    stats.last_timestamp = max(timestamp, stats.last_timestamp or timestamp)
+                elif kind == 'error':
+                    stats.errors[record[2]] = stats.errors.get(record[2], 0) + 1
+                elif kind == 'resource':
+                    _, label, _, rss, _, _ = record
+                    stats.session_rss[label] = max(rss, stats.session_rss.get(label, 0))
+                elif kind == 'meta':
+                    stats.meta.update(record)
+                    if record.get('browser_profile'):
+                        stats.browser_profile = f"{record['browser_profile']}/{record.get('browser_cache', 'warm')}"
+        return stats
+
+    def merge(self, other):
+        """Merge another run's stats into this one / 将另一次运行的统计合并到当前统计"""
+        self.iterations.merge(other.iterations)
+        for step, histogram in other.steps.items():
+            self.steps.setdefault(step, LogLinearHistogram()).merge(histogram)
+        self.passed += other.passed
+        self.failed += other.failed
+        for error_class, count in other.errors.items():
+            self.errors[error_class] = self.errors.get(error_class, 0) + count
+        self.session_rss.update(other.session_rss)
+        if other.first_timestamp is not None:
+            self.first_timestamp = min(other.first_timestamp, self.first_timestamp or other.first_timestamp)
+            self.last_timestamp = max(other.last_timestamp, self.last_timestamp or other.last_timestamp)
+        return self
+
+    @property
+    def session_memory_mb(self):
+        """Mean peak RSS of a browser session in MB / 浏览器会话的平均峰值RSS(MB)"""
+        if not self.session_rss:
+            return 0.0
+        return sum(self.session_rss.values()) / len(self.session_rss) / 1024 / 1024
+
+    @property
+    def throughput(self):
+        """Iterations per second over the run / 运行期间每秒迭代数"""
+        if self.first_timestamp is None:
+            return 0.0
+        return (self.passed + self.failed) / max(self.last_timestamp - self.first_timestamp, 1e-9)
+
+def latency_regression(baseline, candidate, threshold):
+    """Percent p95 increase if it exceeds threshold and the noise floor, else None / p95增幅超过阈值和噪声下限时返回百分比, 否则返回None"""
+    before, after = baseline.percentile(95), candidate.percentile(95)
+    change = percent_change(before, after)
+    if change > threshold and after - before > MIN_REGRESSION_SECONDS:
+        return change
+    return None
+
+def percent_change(baseline, candidate):
+    """Relative change from baseline in percent / 相对基线的变化百分比"""
+    if not baseline:
+        return 0.0
+    return (candidate - baseline) / baseline * 100
+
+def compare_runs(names, baseline=None, p95_threshold=DEFAULT_P95_THRESHOLD,
+                 throughput_threshold=DEFAULT_THROUGHPUT_THRESHOLD):
+    """Print latency distributions and gate the last run against the baseline / 打印延迟分布并以基线检查最后一次运行
+
+    Returns the list of regression messages (empty when the gate passes).
+    返回回归信息列表(通过时为空)。
+    """
+    runs = [RunStats.load(name) for name in ([baseline] if baseline else []) + list(names)]
+    if len(runs) < 2:
+        raise ValueError("Need a baseline and at least one run to compare / 需要一个基线和至少一次运行进行比较")
+    if not runs[0].passed + runs[0].failed:
+        # An empty baseline would pass every run / 空基线会让任何运行都通过
+        raise ValueError(f"Baseline {runs[0].name} has no iteration samples / 基线 {runs[0].name} 没有迭代样本")
+
+    print(f"{'run':<32}{'browser':>14}{'iterations':>11}{'errors':>8}{'p50':>9}{'p90':>9}{'p95':>9}{'p99':>9}{'max':>9}{'iter/s':>9}{'MB/session':>12}")
+    for run in runs:
+        p = run.iterations.percentiles()
+        print(f"{run.name[-32:]:<32}{run.browser_profile or '-':>14}{run.passed + run.failed:>11}{run.failed:>8}{p['p50']:>9.3f}{p['p90']:>9.3f}{p['p95']:>9.3f}{p['p99']:>9.3f}{p['max']:>9.3f}{run.throughput:>9.3f}{run.session_memory_mb:>12.1f}")
+    steps = sorted(set().union(*(run.steps for run in runs)))
+    for step in steps:
+        row = "  ".join(f"{run.steps[step].percentile(95):.3f}" if step in run.steps else "-" for run in runs)
+        print(f"  step {step:<40} p95: {row}")
+
+    reference, candidate = runs[0], runs[-1]
+    regressions = []
+    p95_change = latency_regression(reference.iterations, candidate.iterations, p95_threshold)
+    if p95_change is not None:
+        regressions.append(f"Iteration p95 regressed by {p95_change:.1f}% (threshold {p95_threshold:.1f}%) / 迭代p95退化 {p95_change:.1f}%")
+    for step in steps:
+        if step in reference.steps and step in candidate.steps:
+            change = latency_regression(reference.steps[step], candidate.steps[step], p95_threshold)
+            if change is not None:
+                regressions.append(f"Step '{step}' p95 regressed by {change:.1f}% / 步骤 '{step}' p95退化 {change:.1f}%")
+    throughput_change = percent_change(reference.throughput, candidate.throughput)
+    if -throughput_change > throughput_threshold:
+        regressions.append(f"Throughput dropped by {-throughput_change:.1f}% (threshold {throughput_threshold:.1f}%) / 吞吐量下降 {-throughput_change:.1f}%")
+    return regressions
+
+def save_baseline(run, name):
+    """Copy a run's sample files into the baselines directory / 将运行的样本文件复制到基线目录"""
+    target = os.path.join(BASELINES_DIR, name)
+    if os.path.isdir(target):
+        shutil.rmtree(target)
+    shutil.copytree(resolve_run(run), target)
+    return target
+
+def main(argv=None):
+    """Command line entry point / 命令行入口"""
+    parser = argparse.ArgumentParser(description="Stress run sample store / 压力测试样本存储")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    compare = commands.add_parser('compare', help="Compare runs and gate on regressions / 比较运行并检查回归")
+    compare.add_argument('runs', nargs='+', help="Run ids or directories; the last one is the candidate / 运行ID或目录, 最后一个为待检运行")
+    compare.add_argument('--baseline', help="Stored baseline name; defaults to the first run / 已保存的基线名称, 默认为第一个运行")
+    compare.add_argument('--p95-threshold', type=float, default=DEFAULT_P95_THRESHOLD, help="Allowed p95 increase in percent / 允许的p95增幅(百分比)")
+    compare.add_argument('--throughput-threshold', type=float, default=DEFAULT_THROUGHPUT_THRESHOLD, help="Allowed throughput drop in percent / 允许的吞吐量降幅(百分比)")
+
+    baseline = commands.add_parser('baseline', help="Store a run as a named baseline / 将运行保存为命名基线")
+    baseline.add_argument('run', help="Run id or directory / 运行ID或目录")
+    baseline.add_argument('--name', default='default', help="Baseline name / 基线名称")
+
+    args = parser.parse_args(argv)
+    try:
+        if args.command == 'baseline':
+            target = save_baseline(args.run, args.name)
+            print(f"Baseline saved to {target} / 基线已保存至 {target}")
+            return 0
+        regressions = compare_runs(args.runs, args.baseline, args.p95_threshold, args.throughput_threshold)
+    except (FileNotFoundError, ValueError) as e:
+        print(str(e), file=sys.stderr)
+        return 2
+    for regression in regressions:
+        print(f"REGRESSION: {regression}")
+    if regressions:
+        return 1
+    print("No regression against baseline / 相对基线无回归")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
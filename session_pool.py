@@ -0,0 +1,205 @@
+import os
+import queue
+import threading
+import time
+import itertools
+import concurrent.futures
+import psutil
+from selenium.common.exceptions import WebDriverException
+from browser import create_edge_driver, get_startup_summary
+from resource_sampler import get_worker_id
+from logger_config import setup_logger
+
+# Set up logger / 设置日志记录器
+logger = setup_logger()
+
+# Default pool settings / 默认会话池设置
+DEFAULT_SESSIONS_PER_CORE = 1
+DEFAULT_PRELAUNCH = 1
+DEFAULT_MAX_USES = 20
+DEFAULT_MAX_RSS_GROWTH_MB = 512
+DEFAULT_CHECKOUT_TIMEOUT = 300
+
+# Clears page storage before the session is returned / 会话归还前清理页面存储
+CLEAR_STORAGE_SCRIPT = """
+try { window.localStorage.clear(); } catch (e) {}
+try { window.sessionStorage.clear(); } catch (e) {}
+"""
+
+def _env_number(name, default, cast=int):
+    """Read a numeric setting from environment variable / 从环境变量读取数值设置"""
+    try:
+        return cast(os.environ.get(name, default))
+    except (ValueError, TypeError):
+        return default
+
+def get_pool_size():
+    """Get pool size for this worker / 获取当前worker的会话池大小"""
+    explicit_size = _env_number('SESSION_POOL_SIZE', 0)
+    if explicit_size > 0:
+        return explicit_size
+    sessions_per_core = _env_number('SESSIONS_PER_CORE', DEFAULT_SESSIONS_PER_CORE, float)
+    workers = _env_number('PYTEST_XDIST_WORKER_COUNT', 1)
+    return max(1, int((os.cpu_count() or 1) * sessions_per_core / max(1, workers)))
+
+def get_prelaunch_count(size):
+    """Sessions launched up front; the rest start on demand at checkout / 预先启动的会话数; 其余在借出时按需启动"""
+    return max(0, min(size, _env_number('POOL_PRELAUNCH', DEFAULT_PRELAUNCH)))
+
+class PooledSession:
+    """Browser session tracked by the pool / 由会话池跟踪的浏览器会话"""
+    def __init__(self, driver, label=None):
+        self.driver = driver
+        self.label = label
+        self.uses = 0
+        self.created_at = time.time()
+        self.baseline_rss = self.rss()
+
+    def processes(self):
+        """Get msedgedriver and its browser process tree / 获取msedgedriver及其浏览器进程树"""
+        try:
+            root = psutil.Process(self.driver.service.process.pid)
+            return [root] + root.children(recursive=True)
+        except (AttributeError, psutil.Error):
+            return []
+
+    def rss(self):
+        """Get total RSS of the session process tree in bytes / 获取会话进程树的总RSS(字节)"""
+        total = 0
+        for process in self.processes():
+            try:
+                total += process.memory_info().rss
+            except psutil.Error:
+                pass
+        return total
+
+    def rss_growth_mb(self):
+        """Get RSS growth since launch in MB / 获取自启动以来的RSS增长(MB)"""
+        return (self.rss() - self.baseline_rss) / (1024 * 1024)
+
+    def is_healthy(self):
+        """Check that browser and driver still respond / 检查浏览器和驱动是否仍可响应"""
+        try:
+            return self.driver.execute_script("return 1;") == 1 and bool(self.driver.window_handles)
+        except WebDriverException:
+            return False
+
+    def reset(self):
+        """Reset cookies, storage and page / 重置cookies、存储和页面"""
+        self.driver.execute_script(CLEAR_STORAGE_SCRIPT)
+        try:
+            self.driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        except (AttributeError, WebDriverException):
+            self.driver.delete_all_cookies()
+        self.driver.get("about:blank")
+
+    def quit(self):
+        """Close the browser / 关闭浏览器"""
+        try:
+            self.driver.quit()
+        except Exception as e:
+            logger.error("Error closing browser: %s / 关闭浏览器时发生错误: %s", e, e)
+
+class EdgeSessionPool:
+    """Pool of warm, reusable Edge sessions / 预热、可复用的Edge会话池"""
+    def __init__(self, size=None, max_uses=None, max_rss_growth_mb=None, factory=create_edge_driver, sampler=None):
+        self.size = size or get_pool_size()
+        self.max_uses = max_uses or _env_number('SESSION_MAX_USES', DEFAULT_MAX_USES)
+        self.max_rss_growth_mb = max_rss_growth_mb or _env_number('SESSION_MAX_RSS_GROWTH_MB', DEFAULT_MAX_RSS_GROWTH_MB, float)
+        self.factory = factory
+        self.sampler = sampler
+        self._labels = itertools.count(1)
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._sessions = set()
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _launch(self):
+        """Launch and register a new session / 启动并登记新会话"""
+        session = PooledSession(self.factory(), f"{get_worker_id()}:session{next(self._labels)}")
+        with self._lock:
+            self._sessions.add(session)
+        if self.sampler is not None:
+            try:
+                self.sampler.track(session.label, session.driver.service.process.pid)
+            except AttributeError:
+                pass
+        return session
+
+    def _retire(self, session, reason):
+        """Quit and forget a session / 关闭并移除会话"""
+        logger.info("Recycling browser session (%s) / 回收浏览器会话 (%s)", reason, reason)
+        with self._lock:
+            self._sessions.discard(session)
+        if self.sampler is not None:
+            self.sampler.untrack(session.label)
+        session.quit()
+
+    def prelaunch(self, count=None):
+        """Launch `count` sessions (default POOL_PRELAUNCH) up front in parallel / 并行预先启动`count`个会话(默认POOL_PRELAUNCH)"""
+        count = get_prelaunch_count(self.size) if count is None else min(count, self.size)
+        if count <= 0:
+            return
+        logger.info("Pre-launching %s of %s browser sessions / 预先启动 %s/%s 个浏览器会话", count, self.size, count, self.size)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=count) as executor:
+            futures = [executor.submit(self._launch) for _ in range(count)]
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    self._idle.put(future.result())
+                except Exception as e:
+                    logger.error("Failed to pre-launch session: %s / 预启动会话失败: %s", e, e)
+
+    def checkout(self, timeout=DEFAULT_CHECKOUT_TIMEOUT):
+        """Check out a healthy session / 借出健康的会话"""
+        if self._closed:
+            raise RuntimeError("Session pool is closed / 会话池已关闭")
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError("Timeout waiting for browser session / 等待浏览器会话超时")
+        try:
+            while True:
+                try:
+                    session = self._idle.get_nowait()
+                except queue.Empty:
+                    session = self._launch()
+                if session.is_healthy():
+                    session.uses += 1
+                    return session
+                self._retire(session, "failed health check")
+        except Exception:
+            self._slots.release()
+            raise
+
+    def checkin(self, session, recycle=None):
+        """Return a session, resetting or recycling it; `recycle` gives a reason to always recycle / 归还会话并重置或回收; `recycle` 为强制回收的原因"""
+        try:
+            if self._closed:
+                self._retire(session, "pool closed")
+            elif recycle:
+                self._retire(session, recycle)
+            elif session.uses >= self.max_uses:
+                self._retire(session, f"reached {self.max_uses} uses")
+            elif session.rss_growth_mb() > self.max_rss_growth_mb:
+                self._retire(session, f"RSS grew more than {self.max_rss_growth_mb:.0f}MB")
+            else:
+                try:
+                    session.reset()
+                    self._idle.put(session)
+                except WebDriverException as e:
+                    self._retire(session, f"reset failed: {str(e)}")
+        finally:
+            self._slots.release()
+
+    def close(self):
+        """Quit all sessions / 关闭全部会话"""
+        self._closed = True
+        with self._lock:
+            sessions = list(self._sessions)
+            self._sessions.clear()
+        for session in sessions:
+            session.quit()
+        startup = get_startup_summary()
+        resolution = startup['driver_resolution']['total']
+        launch = startup['browser_launch']['total']
+        logger.info("Startup time: driver resolution %.2fs, browser launch %.2fs / 启动耗时: 驱动解析 %.2f秒, 浏览器启动 %.2f秒", resolution, launch, resolution, launch)
+        logger.info("Browser session pool closed / 浏览器会话池已关闭")
@@ -0,0 +1,276 @@
+import os
+import json
+import math
+import time
+import psutil
+from logger_config import setup_logger
+
+# Set up logger / 设置日志记录器
+logger = setup_logger()
+
+# Trend series settings / 趋势序列设置
+DEFAULT_BUCKET_SECONDS = 60
+DEFAULT_CAPACITY = 720
+SESSION_BUCKET_SECONDS = 30
+SESSION_CAPACITY = 240
+DEFAULT_MIN_POINTS = 10
+
+# Default soak thresholds / 默认浸泡测试阈值
+DEFAULT_CHECK_INTERVAL = 300
+DEFAULT_T_THRESHOLD = 3.0
+DEFAULT_LATENCY_DRIFT_PERCENT = 20
+DEFAULT_ERROR_RATE_DRIFT = 0.02
+DEFAULT_LEAK_MB_PER_HOUR = 50
+DEFAULT_RECYCLE_MB = 100
+
+# Soak report written next to stress_summary.json / 与stress_summary.json并列写入的浸泡测试报告
+SOAK_SUMMARY_FILE = 'soak_summary.json'
+
+MB = 1024 * 1024
+
+# Units of STRESS_SOAK_DURATION / STRESS_SOAK_DURATION的单位
+DURATION_UNITS = {'s': 1, 'm': 60, 'h': 3600}
+
+def _env_number(name, default, cast=float):
+    """Read a numeric setting from environment variable / 从环境变量读取数值设置"""
+    try:
+        return cast(os.environ.get(name, default))
+    except (ValueError, TypeError):
+        return default
+
+def parse_duration(spec):
+    """Parse '3600', '90m' or '12h' into seconds / 将 '3600'、'90m' 或 '12h' 解析为秒"""
+    spec = spec.strip().lower()
+    unit = DURATION_UNITS.get(spec[-1:])
+    try:
+        seconds = float(spec[:-1] if unit else spec) * (unit or 1)
+    except ValueError:
+        raise ValueError(f"Invalid duration: {spec} / 无效的时长: {spec}")
+    if seconds <= 0:
+        raise ValueError(f"Duration must be positive: {spec} / 时长必须为正数: {spec}")
+    return seconds
+
+def get_soak_duration():
+    """Soak duration in seconds from STRESS_SOAK_DURATION, None when not a soak run / 从STRESS_SOAK_DURATION获取浸泡时长(秒), 非浸泡运行时为None"""
+    spec = os.environ.get('STRESS_SOAK_DURATION')
+    return parse_duration(spec) if spec else None
+
+class TrendSeries:
+    """Bucketed time series in bounded memory / 有界内存的分桶时间序列
+
+    At most `capacity` buckets of (count, sum) are kept. When full, neighbouring buckets are merged
+    and the bucket width doubles, so the series always covers the whole run.
+    最多保留 `capacity` 个 (次数, 总和) 桶；桶满时合并相邻桶并将桶宽加倍，使序列始终覆盖整个运行。
+    """
+    def __init__(self, bucket_seconds=DEFAULT_BUCKET_SECONDS, capacity=DEFAULT_CAPACITY):
+        self.bucket_seconds = bucket_seconds
+        self.capacity = capacity
+        self.origin = None
+        self.buckets = []  # [index, count, total]
+
+    def record(self, value, timestamp=None):
+        """Add a value to the bucket of its time / 将数值计入所属时间的桶"""
+        timestamp = time.time() if timestamp is None else timestamp
+        if self.origin is None:
+            self.origin = timestamp
+        index = int((timestamp - self.origin) // self.bucket_seconds)
+        if self.buckets and self.buckets[-1][0] == index:
+            self.buckets[-1][1] += 1
+            self.buckets[-1][2] += value
+            return
+        while len(self.buckets) >= self.capacity:
+            self._compact()
+            index = int((timestamp - self.origin) // self.bucket_seconds)
+            if self.buckets[-1][0] == index:
+                self.buckets[-1][1] += 1
+                self.buckets[-1][2] += value
+                return
+        self.buckets.append([index, 1, value])
+
+    def _compact(self):
+        """Merge neighbouring buckets and double the width / 合并相邻桶并将桶宽加倍"""
+        self.bucket_seconds *= 2
+        merged = []
+        for index, count, total in self.buckets:
+            index //= 2
+            if merged and merged[-1][0] == index:
+                merged[-1][1] += count
+                merged[-1][2] += total
+            else:
+                merged.append([index, count, total])
+        self.buckets = merged
+
+    def points(self):
+        """(seconds since start, mean, count) per bucket / 每个桶的 (距开始秒数, 平均值, 次数)"""
+        return [((index + 0.5) * self.bucket_seconds, total / count, count) for index, count, total in self.buckets]
+
+    def fit(self, min_points=DEFAULT_MIN_POINTS):
+        """Least-squares line through the bucket means, weighted by count / 按次数加权的桶均值最小二乘直线
+
+        Returns the slope per hour, its t statistic and the fitted levels at the first and last
+        bucket, or None with fewer than `min_points` buckets.
+        返回每小时斜率、其t统计量以及首尾桶的拟合值；桶数少于 `min_points` 时返回None。
+        """
+        points = self.points()
+        if len(points) < max(min_points, 3):
+            return None
+        hours = [seconds / 3600 for seconds, _, _ in points]
+        weight = sum(count for _, _, count in points)
+        x_mean = sum(x * count for x, (_, _, count) in zip(hours, points)) / weight
+        y_mean = sum(y * count for _, y, count in points) / weight
+        sxx = sum(count * (x - x_mean) ** 2 for x, (_, _, count) in zip(hours, points))
+        if sxx <= 0:
+            return None
+        slope = sum(count * (x - x_mean) * (y - y_mean) for x, (_, y, count) in zip(hours, points)) / sxx
+        intercept = y_mean - slope * x_mean
+        residual = sum(count * (y - intercept - slope * x) ** 2 for x, (_, y, count) in zip(hours, points)) / (len(points) - 2)
+        stderr = math.sqrt(residual / sxx)
+        if stderr > 0:
+            t = slope / stderr
+        else:
+            t = 0.0 if slope == 0 else math.copysign(math.inf, slope)
+        return {
+            'slope_per_hour': slope,
+            't': t,
+            'start': intercept + slope * hours[0],
+            'end': intercept + slope * hours[-1],
+            'hours': hours[-1] - hours[0],
+            'points': len(points),
+        }
+
+class SoakMonitor:
+    """Rolling trends of a soak run with live drift and leak detection / 浸泡运行的滚动趋势及实时漂移和泄漏检测
+
+    Tracks iteration latency, error rate, per-session browser RSS and the harness's own RSS.
+    A trend is flagged when its slope is significant (t above SOAK_T_THRESHOLD) and large enough
+    to matter; sessions whose own RSS keeps climbing are reported for recycling.
+    跟踪迭代延迟、错误率、每会话浏览器RSS和测试框架自身RSS。斜率显著(t超过SOAK_T_THRESHOLD)且幅度足够大时
+    标记趋势；自身RSS持续上升的会话会被报告以便回收。
+    """
+    METRICS = ('latency', 'error_rate', 'session_rss_mb', 'harness_rss_mb')
+
+    def __init__(self, check_interval=None, t_threshold=None, latency_drift_percent=None,
+                 error_rate_drift=None, leak_mb_per_hour=None, recycle_mb=None):
+        self.check_interval = check_interval or _env_number('SOAK_CHECK_INTERVAL', DEFAULT_CHECK_INTERVAL)
+        self.t_threshold = t_threshold or _env_number('SOAK_T_THRESHOLD', DEFAULT_T_THRESHOLD)
+        self.latency_drift_percent = latency_drift_percent or _env_number('SOAK_LATENCY_DRIFT_PERCENT', DEFAULT_LATENCY_DRIFT_PERCENT)
+        self.error_rate_drift = error_rate_drift or _env_number('SOAK_ERROR_RATE_DRIFT', DEFAULT_ERROR_RATE_DRIFT)
+        self.leak_mb_per_hour = leak_mb_per_hour or _env_number('SOAK_LEAK_MB_PER_HOUR', DEFAULT_LEAK_MB_PER_HOUR)
+        self.recycle_mb = recycle_mb or _env_number('SOAK_RECYCLE_MB', DEFAULT_RECYCLE_MB)
+        self.series = {metric: TrendSeries() for metric in self.METRICS}
+        self.sessions = {}
+        self.findings = {}
+        self.iterations = 0
+        self.failures = 0
+        self.sessions_recycled = 0
+        self.start_time = time.time()
+        self._last_check = self.start_time
+        self._process = psutil.Process()
+
+    def start_session(self, session):
+        """Start tracking a checked-out session / 开始跟踪借出的会话"""
+        self.sessions[session.label] = TrendSeries(SESSION_BUCKET_SECONDS, SESSION_CAPACITY)
+
+    def end_session(self, session, reason=None):
+        """Stop tracking a session, counting it when recycled / 停止跟踪会话, 回收时计数"""
+        self.sessions.pop(session.label, None)
+        if reason:
+            self.sessions_recycled += 1
+            logger.warning("Recycling session %s: %s / 回收会话 %s: %s", session.label, reason, session.label, reason)
+
+    def record_iteration(self, duration, success, session=None, timestamp=None):
+        """Record one iteration and the current memory / 记录一次迭代及当前内存"""
+        timestamp = time.time() if timestamp is None else timestamp
+        self.iterations += 1
+        self.failures += 0 if success else 1
+        if success:
+            self.series['latency'].record(duration, timestamp)
+        self.series['error_rate'].record(0.0 if success else 1.0, timestamp)
+        self.series['harness_rss_mb'].record(self._process.memory_info().rss / MB, timestamp)
+        if session is not None:
+            rss = session.rss() / MB
+            if rss:
+                self.series['session_rss_mb'].record(rss, timestamp)
+                series = self.sessions.get(session.label)
+                if series is not None:
+                    series.record(rss, timestamp)
+
+    def check_session(self, session):
+        """Reason to recycle a session whose RSS keeps growing, or None / 会话RSS持续增长时返回回收原因, 否则为None"""
+        series = self.sessions.get(session.label)
+        fit = series.fit() if series is not None else None
+        if fit is None or fit['t'] < self.t_threshold:
+            return None
+        growth = fit['end'] - fit['start']
+        if growth < self.recycle_mb:
+            return None
+        return f"RSS grew {growth:.0f}MB at {fit['slope_per_hour']:.0f}MB/h"
+
+    def _drift(self, metric, fit):
+        """Describe a significant upward trend, or None / 描述显著的上升趋势, 否则为None"""
+        if fit is None or fit['t'] < self.t_threshold:
+            return None
+        if metric == 'latency':
+            if fit['start'] <= 0:
+                return None
+            percent = (fit['end'] - fit['start']) / fit['start'] * 100
+            if percent >= self.latency_drift_percent:
+                return f"latency drifted {percent:+.0f}% ({fit['start']:.3f}s -> {fit['end']:.3f}s)"
+        elif metric == 'error_rate':
+            if fit['end'] - fit['start'] >= self.error_rate_drift:
+                return f"error rate rose from {fit['start']:.1%} to {fit['end']:.1%}"
+        elif fit['slope_per_hour'] >= self.leak_mb_per_hour:
+            return f"{metric} leaks {fit['slope_per_hour']:.0f}MB/h ({fit['start']:.0f}MB -> {fit['end']:.0f}MB)"
+        return None
+
+    def trends(self):
+        """Current fit of every metric / 各指标的当前拟合"""
+        return {metric: series.fit() for metric, series in self.series.items()}
+
+    def evaluate(self):
+        """Fit all trends now, logging status and new findings / 立即拟合所有趋势, 输出状态和新发现"""
+        self._last_check = time.time()
+        hours = (self._last_check - self.start_time) / 3600
+        logger.info("Soak check after %.2fh: %s iterations, %s failed, %s sessions recycled / 浸泡检查 %.2f 小时: %s 次迭代, %s 次失败, 回收 %s 个会话",
+                    hours, self.iterations, self.failures, self.sessions_recycled, hours, self.iterations, self.failures, self.sessions_recycled)
+        for metric, fit in self.trends().items():
+            if fit is None:
+                continue
+            logger.info("Trend '%s': %.4g -> %.4g, slope %.4g/h, t=%.1f / 趋势 '%s': %.4g -> %.4g, 斜率 %.4g/小时, t=%.1f",
+                        metric, fit['start'], fit['end'], fit['slope_per_hour'], fit['t'], metric, fit['start'], fit['end'], fit['slope_per_hour'], fit['t'])
+            finding = self._drift(metric, fit)
+            if finding and metric not in self.findings:
+                logger.warning("Soak drift detected: %s / 检测到浸泡漂移: %s", finding, finding)
+            if finding:
+                self.findings[metric] = finding
+        return self.findings
+
+    def maybe_evaluate(self, now=None):
+        """Evaluate when SOAK_CHECK_INTERVAL has passed since the last check / 距上次检查超过SOAK_CHECK_INTERVAL时进行评估"""
+        now = time.time() if now is None else now
+        if now - self._last_check >= self.check_interval:
+            self.evaluate()
+
+    def report(self):
+        """Trends, findings and the bucketed series / 趋势、发现和分桶序列"""
+        return {
+            'duration': time.time() - self.start_time,
+            'iterations': self.iterations,
+            'failures': self.failures,
+            'sessions_recycled': self.sessions_recycled,
+            'trends': self.trends(),
+            'findings': dict(self.findings),
+            'series': {
+                metric: {'bucket_seconds': series.bucket_seconds, 'origin': series.origin, 'points': series.points()}
+                for metric, series in self.series.items()
+            },
+        }
+
+    def save(self, path=SOAK_SUMMARY_FILE):
+        """Evaluate once more and write the report / 再次评估并写入报告"""
+        self.evaluate()
+        report = self.report()
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        logger.info("Soak report saved to %s / 浸泡测试报告已保存至 %s", path, path)
+        return report
@@ -0,0 +1,35 @@
+import time
+import threading
+from contextlib import contextmanager
+
+# Per-thread stack of open spans: (name, metrics) / 每个线程的打开span栈: (名称, 指标)
+_local = threading.local()
+
+def _stack():
+    """Get the span stack of the current thread / 获取当前线程的span栈"""
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+def current_path():
+    """Get the path of the innermost open span, e.g. 'add_employee/save' / 获取最内层span的路径"""
+    stack = _stack()
+    return '/'.join(name for name, _ in stack) if stack else None
+
+@contextmanager
+def span(name, metrics=None):
+    """Time a named step; nested spans inherit metrics and form a path / 为命名步骤计时；嵌套span继承指标并组成路径"""
+    stack = _stack()
+    if metrics is None and stack:
+        metrics = stack[-1][1]
+    stack.append((name, metrics))
+    path = '/'.join(step for step, _ in stack)
+    start_time = time.perf_counter()
+    try:
+        yield path
+    finally:
+        elapsed = time.perf_counter() - start_time
+        stack.pop()
+        if metrics is not None:
+            metrics.record_step(path, elapsed)
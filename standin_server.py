@@ -0,0 +1,571 @@
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import os
+import random
+import secrets
+import socket
+import subprocess
+import sys
+import time
+from aiohttp import web
+from histogram import LogLinearHistogram
+from config import USERNAME, PASSWORD
+from logger_config import setup_logger
+
+# Set up logger / 设置日志记录器
+logger = setup_logger()
+
+# Default listen address / 默认监听地址
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8080
+# Seconds to wait for a launched stand-in to accept connections / 等待启动的替身服务接受连接的秒数
+STARTUP_TIMEOUT = 15
+
+# Same layout as a real OrangeHRM install / 与真实OrangeHRM部署相同的路径布局
+WEB_ROOT = '/web/index.php/'
+SESSION_COOKIE = 'orangehrm'
+# Paths never delayed or failed, so cookie restores and stats stay accurate / 不注入延迟和错误的路径, 保证cookie恢复和统计准确
+EXEMPT_PATHS = ('/favicon.ico', '/__standin/')
+
+def _env(name, default):
+    """Read a stand-in setting from the environment / 从环境变量读取替身服务设置"""
+    return os.environ.get(name, default)
+
+class Latency:
+    """Latency distribution in seconds, parsed from a spec such as 'lognormal:0.05:0.4' / 以秒为单位的延迟分布, 由如'lognormal:0.05:0.4'的描述解析
+
+    Specs / 描述:
+        none
+        fixed:<seconds>
+        uniform:<low>:<high>
+        normal:<mean>:<stddev>
+        lognormal:<median>:<sigma>
+        exp:<mean>
+    """
+    PARAMETERS = {'none': 0, 'fixed': 1, 'uniform': 2, 'normal': 2, 'lognormal': 2, 'exp': 1}
+
+    def __init__(self, kind='none', params=()):
+        self.kind = kind
+        self.params = tuple(params)
+
+    @classmethod
+    def parse(cls, spec):
+        """Parse a latency spec / 解析延迟描述"""
+        kind, *values = (spec or 'none').strip().split(':')
+        try:
+            if kind not in cls.PARAMETERS:
+                raise ValueError(f"Unknown distribution: {kind} / 未知的分布: {kind}")
+            params = [float(value) for value in values]
+            if len(params) != cls.PARAMETERS[kind]:
+                raise ValueError(f"expected {cls.PARAMETERS[kind]} values / 需要 {cls.PARAMETERS[kind]} 个参数")
+            if any(value < 0 for value in params):
+                raise ValueError("values must not be negative / 参数不能为负数")
+        except ValueError as e:
+            raise ValueError(f"Invalid latency '{spec}': {str(e)} / 无效的延迟 '{spec}': {str(e)}")
+        return cls(kind, params)
+
+    def sample(self, rng):
+        """Draw one delay in seconds / 抽取一次延迟(秒)"""
+        if self.kind == 'fixed':
+            return self.params[0]
+        if self.kind == 'uniform':
+            return rng.uniform(*self.params)
+        if self.kind == 'normal':
+            return max(0.0, rng.gauss(*self.params))
+        if self.kind == 'lognormal':
+            median, sigma = self.params
+            return rng.lognormvariate(math.log(median), sigma) if median > 0 else 0.0
+        if self.kind == 'exp':
+            return rng.expovariate(1 / self.params[0]) if self.params[0] > 0 else 0.0
+        return 0.0
+
+    def __str__(self):
+        return ':'.join([self.kind] + [f"{value:g}" for value in self.params])
+
+class RateLimiter:
+    """Admit at most `rate` requests per second, queueing the rest in arrival order / 每秒最多放行rate个请求, 其余按到达顺序排队"""
+    def __init__(self, rate):
+        self.interval = 1 / rate if rate and rate > 0 else 0
+        self._next = 0.0
+
+    async def wait(self):
+        """Wait for the next free slot and return the time queued / 等待下一个空闲时隙并返回排队时间"""
+        if not self.interval:
+            return 0.0
+        now = asyncio.get_running_loop().time()
+        slot = max(now, self._next)
+        self._next = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+        return slot - now
+
+class FaultInjector:
+    """Delays, throttles and fails requests according to the settings / 按设置对请求注入延迟、限流和错误
+
+    One seeded generator drives every draw, so a single-user run replays the same delays and errors.
+    所有随机抽取使用同一个带种子的生成器, 单用户运行可复现相同的延迟和错误。
+    """
+    def __init__(self, page_latency=None, api_latency=None, error_rate=0.0, error_scope='api', error_status=500,
+                 max_rps=0, concurrency=0, seed=None):
+        self.latency = {'page': page_latency or Latency(), 'api': api_latency or Latency()}
+        self.error_rate = error_rate
+        self.error_scope = error_scope
+        self.error_status = error_status
+        self.limiter = RateLimiter(max_rps)
+        self.max_rps = max_rps
+        self.concurrency = concurrency
+        self._slots = asyncio.Semaphore(concurrency) if concurrency else None
+        self.rng = random.Random(seed)
+        self.reset()
+
+    def reset(self):
+        """Clear the statistics / 清空统计"""
+        self.requests = {'page': 0, 'api': 0}
+        self.errors = {'page': 0, 'api': 0}
+        self.injected = {'page': LogLinearHistogram(), 'api': LogLinearHistogram()}
+        self.served = {'page': LogLinearHistogram(), 'api': LogLinearHistogram()}
+        self.queued = LogLinearHistogram()
+
+    def describe(self):
+        """One-line description of the active settings / 当前设置的单行描述"""
+        return (f"page latency={self.latency['page']}, api latency={self.latency['api']}, "
+                f"error rate={self.error_rate:g} ({self.error_scope}), max rps={self.max_rps or '-'}, concurrency={self.concurrency or '-'}")
+
+    @web.middleware
+    async def middleware(self, request, handler):
+        """aiohttp middleware applying the faults / 注入故障的aiohttp中间件"""
+        if request.path.startswith(EXEMPT_PATHS):
+            return await handler(request)
+        kind = 'api' if request.path.startswith(f"{WEB_ROOT}api/") else 'page'
+        start_time = time.perf_counter()
+        self.requests[kind] += 1
+        self.queued.record(await self.limiter.wait())
+        if self._slots is not None:
+            async with self._slots:
+                response = await self._serve(kind, request, handler)
+        else:
+            response = await self._serve(kind, request, handler)
+        self.served[kind].record(time.perf_counter() - start_time)
+        return response
+
+    async def _serve(self, kind, request, handler):
+        """Delay, then fail or handle the request / 延迟后返回错误或处理请求"""
+        delay = self.latency[kind].sample(self.rng)
+        self.injected[kind].record(delay)
+        if delay:
+            await asyncio.sleep(delay)
+        if self.error_rate and (self.error_scope == 'all' or kind == 'api') and self.rng.random() < self.error_rate:
+            self.errors[kind] += 1
+            return web.json_response({'error': {'status': str(self.error_status), 'message': 'Injected error'}}, status=self.error_status)
+        return await handler(request)
+
+    def stats(self):
+        """Requests, injected errors and latency percentiles per kind / 按类型统计的请求数、注入错误和延迟百分位"""
+        return {
+            kind: {
+                'requests': self.requests[kind],
+                'errors': self.errors[kind],
+                'injected': dict(self.injected[kind].percentiles(), mean=self.injected[kind].mean),
+                'served': dict(self.served[kind].percentiles(), mean=self.served[kind].mean),
+            }
+            for kind in ('page', 'api')
+        } | {'queued': dict(self.queued.percentiles(), mean=self.queued.mean)}
+
+def _page(title, content, script=''):
+    """HTML document / HTML文档"""
+    return f"""<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8"><title>{title} - OrangeHRM</title>
+<style>
+body {{ font-family: sans-serif; margin: 0; }}
+.oxd-layout {{ display: flex; }}
+.oxd-sidepanel {{ width: 200px; background: #f6f6f6; min-height: 100vh; }}
+.oxd-main-menu {{ list-style: none; padding: 0; }}
+.oxd-main-menu-item {{ display: block; padding: 8px 16px; }}
+.oxd-layout-container {{ flex: 1; padding: 0 16px; }}
+.oxd-input-group {{ margin: 8px 0; }}
+.oxd-form-loader {{ position: fixed; inset: 0; background: rgba(255, 255, 255, 0.5); }}
+.oxd-toast-container {{ position: fixed; bottom: 16px; left: 16px; }}
+</style></head>
+<body>{content}<script>
+var ROOT = '{WEB_ROOT}';
+function api(method, path, body) {{
+    var options = {{method: method, headers: {{'Content-Type': 'application/json'}}}};
+    if (body !== undefined) {{ options.body = JSON.stringify(body); }}
+    return fetch(ROOT + 'api/v2/' + path, options).then(function (response) {{
+        if (!response.ok) {{ throw new Error('HTTP ' + response.status); }}
+        return response.json();
+    }});
+}}
+function toast(title, message, type) {{
+    var container = document.getElementById('toasts');
+    container.innerHTML = '<div class="oxd-toast oxd-toast--' + type + '"><p class="oxd-text oxd-text--toast-title">' + title +
+        '</p><p class="oxd-text oxd-text--toast-message">' + message + '</p></div>';
+}}
+{script}
+</script></body></html>"""
+
+def _layout(title, content, script=''):
+    """Page with the main menu and top bar of a logged-in user / 带已登录用户主菜单和顶栏的页面"""
+    menu = ''.join(
+        f'<li><a class="oxd-main-menu-item" href="{WEB_ROOT}{path}"><span class="oxd-text">{label}</span></a></li>'
+        for path, label in (('pim/viewPimModule', 'PIM'), ('leave/viewLeaveModule', 'Leave'), ('dashboard/index', 'Dashboard'))
+    )
+    body = f"""<div class="oxd-layout">
+<aside class="oxd-sidepanel"><nav><ul class="oxd-main-menu">{menu}</ul></nav></aside>
+<div class="oxd-layout-container">
+<header class="oxd-topbar"><h6 class="oxd-text oxd-topbar-header-breadcrumb-module">{title}</h6></header>
+<div class="oxd-layout-context">{content}</div>
+</div></div>
+<div class="oxd-toast-container" id="toasts"></div>"""
+    return web.Response(text=_page(title, body, script), content_type='text/html')
+
+LOGIN_CONTENT = """<div class="orangehrm-login-container"><h5 class="oxd-text">Login</h5>
+<auth-login :token="&quot;{token}&quot;"></auth-login>
+<form class="oxd-form" method="post" action="{root}auth/validate">
+<input type="hidden" name="_token" value="{token}">
+<div class="oxd-input-group"><div class="oxd-input-group__label-wrapper"><label class="oxd-label">Username</label></div><div><input class="oxd-input" name="username" placeholder="Username"></div></div>
+<div class="oxd-input-group"><div class="oxd-input-group__label-wrapper"><label class="oxd-label">Password</label></div><div><input class="oxd-input" type="password" name="password" placeholder="Password"></div></div>
+{error}<div class="oxd-form-actions"><button type="submit" class="oxd-button orangehrm-login-button">Login</button></div>
+</form></div>"""
+
+DASHBOARD_CONTENT = '<div class="orangehrm-dashboard-grid"><div class="orangehrm-dashboard-widget" id="action-summary"></div></div>'
+DASHBOARD_SCRIPT = """
+api('GET', 'dashboard/employees/action-summary').then(function (body) {
+    document.getElementById('action-summary').textContent = body.data.length + ' pending actions';
+});"""
+
+PIM_LIST_CONTENT = """<div class="orangehrm-paper-container">
+<div class="orangehrm-header-container"><button type="button" class="oxd-button oxd-button--secondary" id="add-employee">Add</button></div>
+<div class="orangehrm-horizontal-padding"><span class="oxd-text" id="record-count"></span></div>
+</div>"""
+PIM_LIST_SCRIPT = """
+document.getElementById('add-employee').addEventListener('click', function () { location.href = ROOT + 'pim/addEmployee'; });
+api('GET', 'pim/employees?limit=50&offset=0').then(function (body) {
+    document.getElementById('record-count').textContent = '(' + body.meta.total + ') Records Found';
+});"""
+
+ADD_EMPLOYEE_CONTENT = """<div class="orangehrm-card-container"><h6 class="oxd-text orangehrm-main-title">Add Employee</h6>
+<form class="oxd-form" id="employee-form">
+<div class="orangehrm-employee-image"><input class="oxd-file-input" type="file" accept="image/gif, image/jpeg, image/png"></div>
+<div class="oxd-input-group"><div class="oxd-input-group__label-wrapper"><label class="oxd-label">Employee Full Name</label></div>
+<div><input class="oxd-input" name="firstName" placeholder="First Name"><input class="oxd-input" name="middleName" placeholder="Middle Name"><input class="oxd-input" name="lastName" placeholder="Last Name"></div></div>
+<div class="oxd-input-group"><div class="oxd-input-group__label-wrapper"><label class="oxd-label">Employee Id</label></div><div><input class="oxd-input" id="employee-id" value="{employee_id}"></div></div>
+<div class="oxd-form-actions"><button type="button" class="oxd-button">Cancel</button><button type="submit" class="oxd-button">Save</button></div>
+</form></div>"""
+# Saves like the real Vue app: create, upload the photo, toast, then a client-side route change
+# 与真实Vue应用相同的保存流程: 创建、上传头像、提示, 然后在客户端切换路由
+ADD_EMPLOYEE_SCRIPT = """
+var form = document.getElementById('employee-form'), photo = null;
+form.querySelector('input[type=file]').addEventListener('change', function (event) {
+    var file = event.target.files[0], reader = new FileReader();
+    if (!file) { photo = null; return; }
+    reader.onload = function () {
+        photo = {name: file.name, type: file.type, size: String(file.size), base64: reader.result.split(',')[1]};
+    };
+    reader.readAsDataURL(file);
+});
+form.addEventListener('submit', function (event) {
+    event.preventDefault();
+    var value = function (name) { return form.querySelector('input[name="' + name + '"]').value; };
+    var loader = document.createElement('div');
+    loader.className = 'oxd-form-loader';
+    document.body.appendChild(loader);
+    api('POST', 'pim/employees', {
+        firstName: value('firstName'), middleName: value('middleName'), lastName: value('lastName'),
+        empPicture: null, employeeId: document.getElementById('employee-id').value
+    }).then(function (body) {
+        var empNumber = body.data.empNumber;
+        if (!photo) { return empNumber; }
+        return api('PUT', 'pim/employees/' + empNumber + '/picture', {empPicture: photo}).then(function () { return empNumber; });
+    }).then(function (empNumber) {
+        toast('Success', 'Successfully Saved', 'success');
+        history.pushState({}, '', ROOT + 'pim/viewPersonalDetails/empNumber/' + empNumber);
+        document.querySelector('.oxd-layout-context').innerHTML = '<h6 class="oxd-text orangehrm-main-title">Personal Details</h6>';
+    }).catch(function (error) {
+        toast('Error', error.message, 'error');
+    }).then(function () {
+        loader.remove();
+    });
+});"""
+
+PERSONAL_DETAILS_CONTENT = '<h6 class="oxd-text orangehrm-main-title">Personal Details</h6><p class="oxd-text">{name}</p>'
+
+LEAVE_LIST_CONTENT = """<div class="oxd-table-filter"><h5 class="oxd-text">Leave List</h5>
+<form class="oxd-form" id="leave-form">
+<div class="oxd-input-group"><div class="oxd-input-group__label-wrapper"><label class="oxd-label">From Date</label></div><div><input class="oxd-input" name="fromDate" placeholder="yyyy-dd-mm"></div></div>
+<div class="oxd-input-group"><div class="oxd-input-group__label-wrapper"><label class="oxd-label">To Date</label></div><div><input class="oxd-input" name="toDate" placeholder="yyyy-dd-mm"></div></div>
+<div class="oxd-form-actions"><button type="button" class="oxd-button">Reset</button><button type="submit" class="oxd-button">Search</button></div>
+</form></div>
+<div class="orangehrm-paper-container"><span class="oxd-text" id="record-count"></span></div>"""
+LEAVE_LIST_SCRIPT = """
+var form = document.getElementById('leave-form');
+function search() {
+    var query = 'fromDate=' + encodeURIComponent(form.fromDate.value) + '&toDate=' + encodeURIComponent(form.toDate.value);
+    api('GET', 'leave/employees/leave-requests?' + query).then(function (body) {
+        document.getElementById('record-count').textContent = '(' + body.meta.total + ') Records Found';
+    });
+}
+form.addEventListener('submit', function (event) { event.preventDefault(); search(); });
+search();"""
+
+class StandinApp:
+    """In-memory stand-in for the OrangeHRM pages and APIs the suites use / 测试套件所用OrangeHRM页面和API的内存替身
+
+    Serves login, dashboard, PIM list, add employee with photo upload and the leave list with the
+    DOM hooks pages.py locates, plus the employee APIs protocol_load.py calls.
+    提供登录、仪表板、PIM列表、带头像上传的添加员工和请假列表页面, 使用pages.py定位的DOM结构, 以及protocol_load.py调用的员工API。
+    """
+    def __init__(self, faults=None, username=USERNAME, password=PASSWORD):
+        self.faults = faults or FaultInjector()
+        self.username = username
+        self.password = password
+        self.sessions = {}
+        self.employees = {}
+        self._emp_numbers = itertools.count(1)
+
+    def build(self):
+        """Create the aiohttp application / 创建aiohttp应用"""
+        app = web.Application(middlewares=[self.faults.middleware], client_max_size=16 * 1024 * 1024)
+        root = WEB_ROOT
+        app.add_routes([
+            web.get('/', self.index),
+            web.get(root.rstrip('/'), self.index),
+            web.get('/favicon.ico', self.favicon),
+            web.get('/__standin/stats', self.stats),
+            web.post('/__standin/reset', self.reset),
+            web.get(f'{root}auth/login', self.login_page),
+            web.post(f'{root}auth/validate', self.validate),
+            web.get(f'{root}auth/logout', self.logout),
+            web.get(f'{root}dashboard/index', self.dashboard),
+            web.get(f'{root}pim/viewPimModule', self.redirect_to('pim/viewEmployeeList')),
+            web.get(f'{root}pim/viewEmployeeList', self.employee_list),
+            web.get(f'{root}pim/addEmployee', self.add_employee),
+            web.get(root + 'pim/viewPersonalDetails/empNumber/{emp_number:\\d+}', self.personal_details),
+            web.get(f'{root}leave/viewLeaveModule', self.redirect_to('leave/viewLeaveList')),
+            web.get(f'{root}leave/viewLeaveList', self.leave_list),
+            web.get(f'{root}api/v2/dashboard/employees/action-summary', self.api_action_summary),
+            web.get(f'{root}api/v2/pim/employees', self.api_list_employees),
+            web.post(f'{root}api/v2/pim/employees', self.api_create_employee),
+            web.delete(f'{root}api/v2/pim/employees', self.api_delete_employees),
+            web.put(root + 'api/v2/pim/employees/{emp_number:\\d+}/picture', self.api_upload_picture),
+            web.get(f'{root}api/v2/leave/employees/leave-requests', self.api_leave_requests),
+        ])
+        return app
+
+    def _session(self, request):
+        """Session of the request cookie, if any / 请求cookie对应的会话(如有)"""
+        return self.sessions.get(request.cookies.get(SESSION_COOKIE))
+
+    def _authenticated(self, request):
+        """Check the request belongs to a logged-in session / 检查请求是否属于已登录会话"""
+        session = self._session(request)
+        return session is not None and session['user'] is not None
+
+    @staticmethod
+    def _redirect(path):
+        """Redirect under the web root / 重定向到站点下的路径"""
+        return web.HTTPFound(f"{WEB_ROOT}{path}")
+
+    def redirect_to(self, path):
+        """Handler redirecting logged-in users to a path / 将已登录用户重定向到指定路径的处理器"""
+        async def handler(request):
+            raise self._redirect(path if self._authenticated(request) else 'auth/login')
+        return handler
+
+    def _require_login(self, request):
+        """Send anonymous page requests to the login page / 将匿名页面请求重定向到登录页"""
+        if not self._authenticated(request):
+            raise self._redirect('auth/login')
+
+    def _require_api_login(self, request):
+        """Reject anonymous API requests / 拒绝匿名API请求"""
+        if not self._authenticated(request):
+            raise web.HTTPUnauthorized(text=json.dumps({'error': {'status': '401', 'message': 'Session expired'}}),
+                                       content_type='application/json')
+
+    async def index(self, request):
+        raise self._redirect('auth/login')
+
+    async def favicon(self, request):
+        return web.Response(body=b'', content_type='image/x-icon')
+
+    async def stats(self, request):
+        return web.json_response(self.faults.stats() | {'sessions': len(self.sessions), 'employees': len(self.employees)})
+
+    async def reset(self, request):
+        self.faults.reset()
+        return web.json_response({'reset': True})
+
+    async def login_page(self, request):
+        sid = request.cookies.get(SESSION_COOKIE)
+        if sid not in self.sessions:
+            sid = secrets.token_urlsafe(24)
+            self.sessions[sid] = {'user': None, 'token': None}
+        token = self.sessions[sid]['token'] = secrets.token_urlsafe(16)
+        error = '<p class="oxd-text oxd-alert-content-text">Invalid credentials</p>' if 'error' in request.query else ''
+        content = LOGIN_CONTENT.format(token=token, root=WEB_ROOT, error=error)
+        response = web.Response(text=_page('Login', content), content_type='text/html')
+        response.set_cookie(SESSION_COOKIE, sid, path='/', httponly=True)
+        return response
+
+    async def validate(self, request):
+        form = await request.post()
+        session = self._session(request)
+        if (session is None or not session['token'] or form.get('_token') != session['token']
+                or form.get('username') != self.username or form.get('password') != self.password):
+            raise self._redirect('auth/login?error=1')
+        session['user'] = self.username
+        session['token'] = None
+        raise self._redirect('dashboard/index')
+
+    async def logout(self, request):
+        self.sessions.pop(request.cookies.get(SESSION_COOKIE), None)
+        raise self._redirect('auth/login')
+
+    async def dashboard(self, request):
+        self._require_login(request)
+        return _layout('Dashboard', DASHBOARD_CONTENT, DASHBOARD_SCRIPT)
+
+    async def employee_list(self, request):
+        self._require_login(request)
+        return _layout('PIM', PIM_LIST_CONTENT, PIM_LIST_SCRIPT)
+
+    async def add_employee(self, request):
+        self._require_login(request)
+        employee_id = f"{len(self.employees) + 1:04d}"
+        return _layout('PIM', ADD_EMPLOYEE_CONTENT.format(employee_id=employee_id), ADD_EMPLOYEE_SCRIPT)
+
+    async def personal_details(self, request):
+        self._require_login(request)
+        employee = self.employees.get(int(request.match_info['emp_number']))
+        if employee is None:
+            raise web.HTTPNotFound()
+        name = f"{employee['firstName']} {employee['lastName']}"
+        return _layout('PIM', PERSONAL_DETAILS_CONTENT.format(name=name))
+
+    async def leave_list(self, request):
+        self._require_login(request)
+        return _layout('Leave', LEAVE_LIST_CONTENT, LEAVE_LIST_SCRIPT)
+
+    async def api_action_summary(self, request):
+        self._require_api_login(request)
+        return web.json_response({'data': [], 'meta': {}, 'rels': []})
+
+    async def api_list_employees(self, request):
+        self._require_api_login(request)
+        needle = request.query.get('nameOrId', '').lower()
+        matches = [
+            employee for employee in self.employees.values()
+            if not needle or needle == employee['employeeId'].lower()
+            or needle in f"{employee['firstName']} {employee['middleName']} {employee['lastName']}".lower()
+        ]
+        offset = int(request.query.get('offset', 0))
+        limit = int(request.query.get('limit', 50))
+        return web.json_response({'data': matches[offset:offset + limit], 'meta': {'total': len(matches)}, 'rels': []})
+
+    async def api_create_employee(self, request):
+        self._require_api_login(request)
+        payload = await request.json()
+        employee_id = payload.get('employeeId') or ''
+        if not payload.get('firstName') or not payload.get('lastName') or len(employee_id) > 10:
+            return web.json_response({'error': {'status': '422', 'message': 'Invalid Parameter'}}, status=422)
+        if employee_id and any(employee['employeeId'] == employee_id for employee in self.employees.values()):
+            return web.json_response({'error': {'status': '422', 'message': 'Employee Id already exists'}}, status=422)
+        emp_number = next(self._emp_numbers)
+        employee = self.employees[emp_number] = {
+            'empNumber': emp_number,
+            'employeeId': employee_id,
+            'firstName': payload['firstName'],
+            'middleName': payload.get('middleName') or '',
+            'lastName': payload['lastName'],
+            'terminationId': None,
+            'pictureSize': 0,
+        }
+        return web.json_response({'data': employee, 'meta': [], 'rels': []})
+
+    async def api_upload_picture(self, request):
+        self._require_api_login(request)
+        employee = self.employees.get(int(request.match_info['emp_number']))
+        if employee is None:
+            return web.json_response({'error': {'status': '404', 'message': 'Record Not Found'}}, status=404)
+        picture = (await request.json()).get('empPicture') or {}
+        # Only the size is kept to stay lightweight under load / 仅保留大小, 以便在负载下保持轻量
+        employee['pictureSize'] = len(picture.get('base64') or '')
+        return web.json_response({'data': {'empNumber': employee['empNumber'], 'size': employee['pictureSize']}, 'meta': [], 'rels': []})
+
+    async def api_delete_employees(self, request):
+        self._require_api_login(request)
+        ids = (await request.json()).get('ids') or []
+        deleted = [emp_number for emp_number in ids if self.employees.pop(emp_number, None) is not None]
+        if not deleted:
+            return web.json_response({'error': {'status': '404', 'message': 'Records Not Found'}}, status=404)
+        return web.json_response({'data': deleted, 'meta': [], 'rels': []})
+
+    async def api_leave_requests(self, request):
+        self._require_api_login(request)
+        return web.json_response({'data': [], 'meta': {'total': 0}, 'rels': []})
+
+def base_url(host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """ORANGEHRM_BASE_URL of a stand-in / 替身服务的ORANGEHRM_BASE_URL"""
+    return f"http://{host}:{port}/"
+
+def launch(host=DEFAULT_HOST, port=DEFAULT_PORT, timeout=STARTUP_TIMEOUT):
+    """Start the stand-in in a child process and wait until it listens / 在子进程中启动替身服务并等待其开始监听
+
+    Fault settings are passed through the STANDIN_* environment variables.
+    故障设置通过STANDIN_*环境变量传递。
+    """
+    process = subprocess.Popen([sys.executable, os.path.abspath(__file__), '--host', host, '--port', str(port)])
+    deadline = time.monotonic() + timeout
+    while True:
+        if process.poll() is not None:
+            raise RuntimeError(f"Stand-in server exited with code {process.returncode} / 替身服务已退出, 退出码 {process.returncode}")
+        try:
+            socket.create_connection((host, port), timeout=0.5).close()
+            return process
+        except OSError:
+            if time.monotonic() > deadline:
+                process.terminate()
+                raise RuntimeError(f"Stand-in server did not start within {timeout}s / 替身服务未在 {timeout} 秒内启动")
+            time.sleep(0.1)
+
+def parse_args(argv=None):
+    """Parse command line arguments, defaulting to STANDIN_* variables / 解析命令行参数, 默认取STANDIN_*环境变量"""
+    parser = argparse.ArgumentParser(description="Local OrangeHRM stand-in with fault injection / 带故障注入的本地OrangeHRM替身服务")
+    parser.add_argument('--host', default=_env('STANDIN_HOST', DEFAULT_HOST), help="Listen address / 监听地址")
+    parser.add_argument('--port', type=int, default=int(_env('STANDIN_PORT', DEFAULT_PORT)), help="Listen port / 监听端口")
+    parser.add_argument('--latency', default=_env('STANDIN_LATENCY', 'none'), help="Page latency distribution / 页面延迟分布")
+    parser.add_argument('--api-latency', default=_env('STANDIN_API_LATENCY', 'none'), help="API latency distribution / API延迟分布")
+    parser.add_argument('--error-rate', type=float, default=float(_env('STANDIN_ERROR_RATE', 0)), help="Fraction of failed requests / 失败请求比例")
+    parser.add_argument('--error-scope', choices=['api', 'all'], default=_env('STANDIN_ERROR_SCOPE', 'api'),
+                        help="Requests that may fail / 可能失败的请求")
+    parser.add_argument('--error-status', type=int, default=int(_env('STANDIN_ERROR_STATUS', 500)), help="HTTP status of injected errors / 注入错误的HTTP状态码")
+    parser.add_argument('--max-rps', type=float, default=float(_env('STANDIN_MAX_RPS', 0)), help="Requests admitted per second, 0 is unlimited / 每秒放行请求数, 0为不限")
+    parser.add_argument('--concurrency', type=int, default=int(_env('STANDIN_CONCURRENCY', 0)),
+                        help="Requests served at once, 0 is unlimited / 同时处理的请求数, 0为不限")
+    parser.add_argument('--seed', type=int, default=int(_env('STANDIN_SEED', 1)), help="Random seed / 随机种子")
+    parser.add_argument('--username', default=USERNAME, help="Accepted username / 接受的用户名")
+    parser.add_argument('--password', default=PASSWORD, help="Accepted password / 接受的密码")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Command line entry point / 命令行入口"""
+    args = parse_args(argv)
+    try:
+        page_latency, api_latency = Latency.parse(args.latency), Latency.parse(args.api_latency)
+    except ValueError as e:
+        logger.error("%s", e)
+        return 2
+    faults = FaultInjector(page_latency, api_latency, args.error_rate, args.error_scope, args.error_status,
+                           args.max_rps, args.concurrency, args.seed)
+    app = StandinApp(faults, args.username, args.password)
+    logger.info("Stand-in server at %s (%s) / 替身服务地址 %s (%s)", base_url(args.host, args.port), faults.describe(), base_url(args.host, args.port), faults.describe())
+    web.run_app(app.build(), host=args.host, port=args.port, print=None, access_log=None)
+    logger.info("Stand-in stats: %s / 替身服务统计: %s", json.dumps(faults.stats()), json.dumps(faults.stats()))
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
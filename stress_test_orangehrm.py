@@ -1,331 +1,465 @@
 import pytest
 import time
-import psutil
 import os
 from datetime import datetime
-from selenium import webdriver
-from selenium.webdriver.edge.service import Service
-from selenium.webdriver.edge.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, ElementClickInterceptedException
-from webdriver_manager.microsoft import EdgeChromiumDriverManager
+from selenium.common.exceptions import TimeoutException
 import allure
 from logger_config import setup_logger
-import concurrent.futures
-import statistics
-import sys
+from performance_metrics import PerformanceMetrics
+from load_scheduler import OpenLoopScheduler, parse_profile, wait_for_start
+from spans import span
+from browser_perf import get_browser_perf
+from pages import BasePage, LoginPage, PimListPage
+from command_profiler import get_command_profiler
+from browser import get_profile, get_cache_mode
+from auth_cache import get_login_cache
+from network_profiles import apply_network_profile, get_network_profile
+from soak import SoakMonitor, get_soak_duration
+from iteration_engine import IterationEngine, StepFailed, CircuitOpen, classify_error, SESSION_LOST, VALIDATION_ERROR
+from config import app_url
+import itertools
+import json
+import re
+import threading
 
 # Set up logger / 设置日志记录器
 logger = setup_logger()
 
+# empNumber in the employee details URL after saving / 保存后员工详情URL中的empNumber
+EMP_NUMBER_PATTERN = re.compile(r'empNumber/(\d+)')
+
 # Default number of iterations / 默认迭代次数
 DEFAULT_ITERATIONS = 10
 
+def get_duration():
+    """Get run duration limit in seconds from environment variable / 从环境变量获取运行时长限制(秒)"""
+    try:
+        duration = float(os.environ.get('STRESS_TEST_DURATION', 0))
+        return duration if duration > 0 else None
+    except (ValueError, TypeError):
+        return None
+
 def get_iterations():
-    """Get number of iterations from environment variable / 从环境变量获取迭代次数"""
+    """Get number of iterations from environment variable / 从环境变量获取迭代次数
+
+    Returns None when only a duration limit is configured / 仅配置了时长限制时返回None
+    """
+    if 'STRESS_TEST_ITERATIONS' not in os.environ and get_duration() is not None:
+        return None
     try:
         iterations = int(os.environ.get('STRESS_TEST_ITERATIONS', DEFAULT_ITERATIONS))
-        return max(1, min(100, iterations))  # Ensure value is between 1 and 100
+        return max(1, iterations)
     except (ValueError, TypeError):
         return DEFAULT_ITERATIONS
 
-class PerformanceMetrics:
-    """Performance metrics collection class / 性能指标收集类"""
-    def __init__(self):
-        self.start_time = None
-        self.end_time = None
-        self.cpu_usage = []
-        self.memory_usage = []
-        self.response_times = []
-        self.test_results = []
-
-    def start_test(self):
-        """Start collecting metrics / 开始收集指标"""
-        self.start_time = time.time()
-        self.cpu_usage = []
-        self.memory_usage = []
-        self.response_times = []
-
-    def record_metrics(self):
-        """Record current system metrics / 记录当前系统指标"""
-        self.cpu_usage.append(psutil.cpu_percent())
-        self.memory_usage.append(psutil.virtual_memory().percent)
-
-    def record_response_time(self, response_time):
-        """Record response time / 记录响应时间"""
-        self.response_times.append(response_time)
-
-    def end_test(self, success):
-        """End test and calculate metrics / 结束测试并计算指标"""
-        self.end_time = time.time()
-        duration = self.end_time - self.start_time
-        avg_cpu = statistics.mean(self.cpu_usage) if self.cpu_usage else 0
-        avg_memory = statistics.mean(self.memory_usage) if self.memory_usage else 0
-        avg_response = statistics.mean(self.response_times) if self.response_times else 0
-        
-        self.test_results.append({
-            'duration': duration,
-            'avg_cpu': avg_cpu,
-            'avg_memory': avg_memory,
-            'avg_response': avg_response,
-            'success': success
-        })
-
-    def get_summary(self):
-        """Get test summary / 获取测试摘要"""
-        if not self.test_results:
-            return "No tests executed / 没有执行测试"
-        
-        successful_tests = sum(1 for r in self.test_results if r['success'])
-        total_tests = len(self.test_results)
-        success_rate = (successful_tests / total_tests) * 100
-        
-        avg_duration = statistics.mean(r['duration'] for r in self.test_results)
-        avg_cpu = statistics.mean(r['avg_cpu'] for r in self.test_results)
-        avg_memory = statistics.mean(r['avg_memory'] for r in self.test_results)
-        avg_response = statistics.mean(r['avg_response'] for r in self.test_results)
-        
-        return {
-            'total_tests': total_tests,
-            'successful_tests': successful_tests,
-            'success_rate': success_rate,
-            'avg_duration': avg_duration,
-            'avg_cpu': avg_cpu,
-            'avg_memory': avg_memory,
-            'avg_response': avg_response
-        }
+def get_load_profile():
+    """Get open-loop load profile from environment variable / 从环境变量获取开环负载曲线"""
+    spec = os.environ.get('STRESS_TEST_PROFILE')
+    return parse_profile(spec) if spec else None
 
 @pytest.fixture(scope="class")
-def metrics():
+def metrics(metrics_spooler, sample_writer):
     """Performance metrics fixture / 性能指标fixture"""
-    return PerformanceMetrics()
+    performance_metrics = PerformanceMetrics()
+    performance_metrics.sample_writer = sample_writer
+    metrics_spooler.register(performance_metrics)
+    return performance_metrics
+
+@pytest.fixture(scope="class")
+def iteration_engine(metrics):
+    """Retrying iteration engine with a circuit breaker / 带熔断器的重试迭代引擎"""
+    return IterationEngine(metrics)
 
 @pytest.fixture(scope="function")
-def driver():
+def driver(session_pool):
     """Set up test environment / 设置测试环境"""
     logger.info("Starting test environment setup / 开始设置测试环境")
-    driver = None
+    session = None
     try:
-        edge_options = Options()
-        edge_options.add_argument("--start-maximized")
-        edge_options.add_argument("--disable-notifications")
-        edge_options.add_argument("--disable-gpu")
-        edge_options.add_argument("--no-sandbox")
-        edge_options.add_argument("--disable-dev-shm-usage")
-        edge_options.add_argument("--disable-extensions")
-        edge_options.add_argument("--disable-popup-blocking")
-        edge_options.add_argument("--remote-debugging-port=9222")
-        
-        service = Service(EdgeChromiumDriverManager().install())
-        driver = webdriver.Edge(service=service, options=edge_options)
-        driver.implicitly_wait(30)
-        
+        session = session_pool.checkout()
+        apply_network_profile(session.driver)
         logger.info("Test environment setup completed / 测试环境设置完成")
-        yield driver
+        yield session.driver
         
     except Exception as e:
-        logger.error(f"Test environment setup failed: {str(e)} / 测试环境设置失败: {str(e)}")
+        logger.error("Test environment setup failed: %s / 测试环境设置失败: %s", e, e)
         raise
     finally:
-        if driver:
+        if session:
             try:
-                driver.quit()
+                session_pool.checkin(session)
             except Exception as e:
-                logger.error(f"Error closing browser: {str(e)} / 关闭浏览器时发生错误: {str(e)}")
-
-def wait_for_element(driver, by, value, timeout=30):
-    """Wait for element to be present / 等待元素出现"""
-    try:
-        element = WebDriverWait(driver, timeout).until(
-            EC.presence_of_element_located((by, value))
-        )
-        return element
-    except TimeoutException:
-        logger.error(f"Timeout waiting for element: {value} / 等待元素超时: {value}")
-        raise
-
-def wait_for_element_clickable(driver, by, value, timeout=30):
-    """Wait for element to be clickable / 等待元素可点击"""
-    try:
-        element = WebDriverWait(driver, timeout).until(
-            EC.element_to_be_clickable((by, value))
-        )
-        return element
-    except TimeoutException:
-        logger.error(f"Timeout waiting for clickable element: {value} / 等待可点击元素超时: {value}")
-        raise
+                logger.error("Error returning browser session: %s / 归还浏览器会话时发生错误: %s", e, e)
 
 def login(driver, metrics):
     """Login function with performance monitoring / 带性能监控的登录函数"""
     start_time = time.time()
     try:
-        driver.get("https://opensource-demo.orangehrmlive.com/")
-        metrics.record_metrics()
-        
-        username_field = wait_for_element(driver, By.CSS_SELECTOR, "input[name='username']")
-        password_field = wait_for_element(driver, By.CSS_SELECTOR, "input[name='password']")
-        
-        username_field.send_keys("Admin")
-        password_field.send_keys("admin123")
-        
-        login_button = wait_for_element_clickable(driver, By.CSS_SELECTOR, "button[type='submit']")
-        login_button.click()
-        
-        # Wait for successful login / 等待登录成功
-        try:
-            wait_for_element(driver, By.CSS_SELECTOR, "h6.oxd-text")
-            logger.info("Login successful / 登录成功")
-            end_time = time.time()
-            metrics.record_response_time(end_time - start_time)
-            return True
-        except TimeoutException:
-            error_msg = "Login verification failed - timeout waiting for dashboard / 登录验证失败 - 等待仪表板超时"
-            logger.error(error_msg)
-            return False
+        browser_perf = get_browser_perf(driver, metrics)
+        login_page = LoginPage(driver, metrics)
+        with span("login", metrics):
+            with span("open_page"):
+                login_page.open()
+                metrics.record_metrics()
+            browser_perf.collect("login/open_page")
+            
+            with span("fill_credentials"):
+                login_page.enter_credentials()
+            
+            # Submit and wait for successful login / 提交并等待登录成功
+            try:
+                with span("submit"):
+                    login_page.submit()
+                browser_perf.collect("login/dashboard")
+                logger.info("Login successful / 登录成功")
+                end_time = time.time()
+                metrics.record_response_time(end_time - start_time)
+                return True
+            except TimeoutException:
+                error_msg = "Login verification failed - timeout waiting for dashboard / 登录验证失败 - 等待仪表板超时"
+                logger.error(error_msg)
+                metrics.record_error(classify_error(TimeoutException(), driver), error_msg)
+                return False
         
     except Exception as e:
         error_msg = f"Login failed: {str(e)} / 登录失败: {str(e)}"
         logger.error(error_msg, exc_info=True)
+        metrics.record_error(classify_error(e, driver), str(e))
         return False
 
-def add_employee(driver, metrics, iteration):
-    """Add employee function with performance monitoring / 带性能监控的添加员工函数"""
-    start_time = time.time()
+def reload_dashboard(driver):
+    """Recover from a broken page by loading the dashboard directly / 直接加载仪表板以从异常页面恢复"""
+    driver.get(app_url("dashboard/index"))
+
+def return_to_dashboard(driver, dashboard, engine):
+    """Go back to the dashboard, retrying within the budget; returns the failure class or None / 返回仪表板, 在预算内重试；返回失败类别或None"""
     try:
+        engine.step("dashboard", lambda: dashboard.open_menu(dashboard.DASHBOARD_MENU, "dashboard", "dashboard"),
+                    driver, recover=lambda error_class: reload_dashboard(driver))
+        return None
+    except StepFailed as e:
+        logger.error("Cannot return to dashboard: %s / 无法返回仪表板: %s", e, e)
+        return e.error_class
+
+def add_employee(driver, metrics, iteration, employee_data, engine):
+    """Add employee function with performance monitoring / 带性能监控的添加员工函数
+
+    Retryable failures reopen the form with a new record; a record rejected as a duplicate is
+    dropped, one that may have been saved is kept for cleanup.
+    可重试的失败会以新记录重新打开表单；因重复被拒绝的记录被丢弃, 可能已保存的记录保留以便清理。
+    """
+    start_time = time.time()
+    browser_perf = get_browser_perf(driver, metrics)
+    form = record = None
+    submitted = False
+    
+    def open_form():
         # Navigate to PIM module / 导航到PIM模块
-        pim_menu = wait_for_element_clickable(driver, By.XPATH, "//span[text()='PIM']")
-        time.sleep(1)  # Add delay before clicking PIM menu
-        pim_menu.click()
-        time.sleep(2)  # Add delay after clicking PIM menu
+        with span("pim_navigation"):
+            pim_page = PimListPage(driver, metrics).open()
+        browser_perf.collect("add_employee/pim_navigation")
         
         # Click Add Employee / 点击添加员工
-        add_employee_button = wait_for_element_clickable(driver, By.XPATH, "/html/body/div/div[1]/div[2]/div[2]/div/div[2]/div[1]/button")
-        time.sleep(1)  # Add delay before clicking Add button
-        add_employee_button.click()
-        time.sleep(2)  # Add delay after clicking Add button
-        
-        # Fill in employee details / 填写员工信息
-        first_name = wait_for_element(driver, By.NAME, "firstName")
-        middle_name = wait_for_element(driver, By.NAME, "middleName")
-        last_name = wait_for_element(driver, By.NAME, "lastName")
+        with span("open_form"):
+            page = pim_page.click_add()
+        browser_perf.collect("add_employee/open_form")
+        return page
+    
+    def submit():
+        nonlocal record, submitted
+        record = employee_data.allocate()
+        submitted = False
         
-        # Set name with iteration number / 设置带迭代次数的名字
-        iteration_str = str(iteration).zfill(3)  # Convert iteration to 3-digit string
-        name = f"Castorice{iteration_str}"
-        first_name.send_keys(name)
-        time.sleep(0.5)  # Add delay between input fields
-        middle_name.send_keys(name)
-        time.sleep(0.5)  # Add delay between input fields
-        last_name.send_keys(name)
-        time.sleep(0.5)  # Add delay between input fields
+        # Names and ID come from this worker's reserved range / 姓名和ID来自当前worker预留的区间
+        with span("fill_form"):
+            form.fill_employee(record)
         
         # Upload image / 上传头像
-        image_input = wait_for_element(driver, By.CSS_SELECTOR, "input[type='file']")
-        image_path = os.path.join(os.path.dirname(__file__), "image", "1.jpg")
-        image_input.send_keys(image_path)
-        time.sleep(1)  # Add delay after uploading image
-        
-        # Set Employee ID with iteration / 设置带迭代次数的员工ID
-        employee_id_xpath = "/html/body/div/div[1]/div[2]/div[2]/div/div/form/div[1]/div[2]/div[1]/div[2]/div/div/div[2]/input"
-        employee_id = wait_for_element(driver, By.XPATH, employee_id_xpath)
-        employee_id.clear()
-        time.sleep(0.5)  # Add delay after clearing
-        employee_id.send_keys(f"418{iteration_str}")
-        time.sleep(1)  # Add delay after filling all fields
+        with span("photo_upload"):
+            form.upload_photo()
+        browser_perf.collect("add_employee/photo_upload")
         
         # Save employee / 保存员工信息
-        save_button = wait_for_element_clickable(driver, By.XPATH, "//button[@type='submit']")
-        time.sleep(1)  # Add delay before clicking Save button
-        save_button.click()
-        time.sleep(2)  # Add delay after clicking Save button
+        with span("save"):
+            form.save()
+            submitted = True
         
         # Wait for success message and continue / 等待成功消息并继续
-        success_message = wait_for_element(driver, By.XPATH, "//p[contains(@class, 'oxd-text--toast-message')]")
-        if success_message:
-            logger.info(f"Employee Castorice{iteration_str} added successfully / 员工 Castorice{iteration_str} 添加成功")
-            end_time = time.time()
-            metrics.record_response_time(end_time - start_time)
-            return True
-        
-        return False
-        
-    except Exception as e:
-        logger.error(f"Add employee failed: {str(e)} / 添加员工失败: {str(e)}")
+        with span("toast"):
+            form.wait_for_toast()
+        browser_perf.collect("add_employee/save")
+    
+    def settle(error_class):
+        # A submitted form may still have created the employee / 已提交的表单仍可能创建了员工
+        nonlocal record
+        if record is None:
+            return
+        if error_class == VALIDATION_ERROR:
+            logger.warning("Employee ID %s rejected, skipping it / 员工ID %s 被拒绝, 跳过", record.employee_id, record.employee_id)
+        elif submitted:
+            employee_data.mark_created(record)
+        else:
+            employee_data.release(record)
+        record = None
+    
+    def reopen(error_class):
+        nonlocal form
+        settle(error_class)
+        form = open_form()
+    
+    try:
+        with span("add_employee", metrics):
+            form = engine.step("open_form", open_form, driver, recover=lambda error_class: reload_dashboard(driver))
+            engine.step("submit", submit, driver, recover=reopen)
+        match = EMP_NUMBER_PATTERN.search(driver.current_url)
+        employee_data.mark_created(record, int(match.group(1)) if match else None)
+        logger.info("Employee %s added successfully / 员工 %s 添加成功", record.name, record.name)
+        metrics.record_response_time(time.time() - start_time)
+        return True
+    except StepFailed as e:
+        logger.error("Add employee failed: %s / 添加员工失败: %s", e, e)
+        settle(e.error_class)
         return False
 
-def test_full_process_stress(driver, metrics):
-    """Stress test for full process / 全流程压力测试"""
+def test_full_process_stress(driver, metrics, employee_data, iteration_engine):
+    """Stress test for full process / 全流程压力测试
+
+    Failed iterations are counted and the run goes on; only the circuit breaker or a lost browser
+    session stops it early.
+    失败的迭代计入统计且运行继续；只有熔断器或浏览器会话丢失会提前终止运行。
+    """
+    if get_soak_duration() is not None:
+        pytest.skip("STRESS_SOAK_DURATION set, test_soak_stress runs instead / 已设置STRESS_SOAK_DURATION, 改为执行test_soak_stress")
     iterations = get_iterations()
-    logger.info(f"Starting full process stress test with {iterations} iterations / 开始执行{iterations}次全流程压力测试")
+    duration = get_duration()
+    total = iterations if iterations is not None else "-"
+    logger.info("Starting full process stress test with %s iterations, duration limit %ss / 开始执行%s次全流程压力测试, 时长限制 %s秒", total, duration, total, duration)
     
-    try:
-        # Login once at the beginning / 开始时登录一次
-        if not login(driver, metrics):
-            error_msg = "Initial login failed / 初始登录失败"
-            logger.error(error_msg)
-            return  # Keep browser open on failure
+    # Login once at the beginning; the shared cached session is opt-in here (LOGIN_CACHE=1) / 开始时登录一次; 此处共享缓存会话需显式启用 (LOGIN_CACHE=1)
+    if not get_login_cache().login(driver, lambda d: login(d, metrics), metrics, default=False):
+        logger.error("Initial login failed / 初始登录失败")
+        return
+    
+    # Wait for dashboard to settle after login / 登录后等待仪表板稳定
+    dashboard = BasePage(driver, metrics)
+    dashboard.readiness.wait_for_route("dashboard", "post_login")
+    
+    # Distributed agents start their load together / 分布式agent同时开始施加负载
+    wait_for_start()
+    run_start = time.perf_counter()
+    passed = failed = 0
+    for i in itertools.count():
+        if iterations is not None and i >= iterations:
+            break
+        if duration is not None and time.perf_counter() - run_start >= duration:
+            break
+        try:
+            iteration_engine.begin()
+        except CircuitOpen as e:
+            logger.error("Stopping early, circuit breaker open: %s / 熔断器打开, 提前停止: %s", e, e)
+            break
+        logger.info("Starting iteration %s/%s / 开始第 %s/%s 次迭代", i + 1, total, i + 1, total)
+        metrics.start_test(i)
         
-        # Add a small delay after login / 登录后添加短暂延迟
-        time.sleep(2)
+        # Add employee, starting from the PIM menu, then return to dashboard / 从PIM菜单开始添加员工, 然后返回仪表板
+        success = add_employee(driver, metrics, i, employee_data, iteration_engine)
+        error_class = return_to_dashboard(driver, dashboard, iteration_engine)
+        success = success and error_class is None
         
-        for i in range(iterations):
-            logger.info(f"Starting iteration {i + 1}/{iterations} / 开始第 {i + 1}/{iterations} 次迭代")
-            metrics.start_test()
-            
+        latency = metrics.end_test(success)
+        iteration_engine.record_result(success)
+        if success:
+            passed += 1
+            logger.info("Completed iteration %s/%s / 完成第 %s/%s 次迭代", i + 1, total, i + 1, total, extra={'latency': latency})
+        else:
+            failed += 1
+            logger.error("Iteration %s/%s failed / 第 %s/%s 次迭代失败", i + 1, total, i + 1, total, extra={'latency': latency})
+        if error_class == SESSION_LOST:
+            logger.error("Browser session lost, stopping / 浏览器会话丢失, 停止运行")
+            break
+    
+    logger.info("Finished %s iterations: %s passed, %s failed / 完成 %s 次迭代: %s 次成功, %s 次失败", passed + failed, passed, failed, passed + failed, passed, failed)
+
+def test_soak_stress(session_pool, metrics, employee_data, iteration_engine):
+    """Duration-based soak of the full process with drift and leak detection / 带漂移和泄漏检测、按时长运行的全流程浸泡测试"""
+    duration = get_soak_duration()
+    if duration is None:
+        pytest.skip("STRESS_SOAK_DURATION not set / 未设置STRESS_SOAK_DURATION")
+    logger.info("Starting soak test for %.0fs / 开始执行 %.0f 秒浸泡测试", duration, duration)
+    
+    monitor = SoakMonitor()
+    session = dashboard = None
+    
+    def recycle(reason):
+        nonlocal session, dashboard
+        monitor.end_session(session, reason)
+        session_pool.checkin(session, recycle=reason)
+        session = dashboard = None
+    
+    wait_for_start()
+    run_start = time.perf_counter()
+    try:
+        for i in itertools.count():
+            if time.perf_counter() - run_start >= duration:
+                break
             try:
-                # Navigate to PIM module / 导航到PIM模块
-                pim_menu = wait_for_element_clickable(driver, By.XPATH, "//span[text()='PIM']")
-                time.sleep(1)  # Add delay before clicking PIM menu
-                pim_menu.click()
-                time.sleep(2)  # Add delay after clicking PIM menu
-                
-                # Add employee / 添加员工
-                if not add_employee(driver, metrics, i):
-                    error_msg = f"Add employee failed in iteration {i + 1} / 第 {i + 1} 次迭代添加员工失败"
-                    logger.error(error_msg)
-                    return  # Keep browser open on failure
-                
-                # Return to dashboard / 返回仪表板
-                dashboard_menu = wait_for_element_clickable(driver, By.XPATH, "//span[text()='Dashboard']")
-                time.sleep(1)  # Add delay before clicking Dashboard menu
-                dashboard_menu.click()
-                time.sleep(2)  # Add delay after clicking Dashboard menu
-                
-                metrics.end_test(True)
-                logger.info(f"Completed iteration {i + 1}/{iterations} / 完成第 {i + 1}/{iterations} 次迭代")
-                
-            except Exception as e:
-                error_msg = f"Error in iteration {i + 1}: {str(e)} / 第 {i + 1} 次迭代发生错误: {str(e)}"
-                logger.error(error_msg, exc_info=True)
-                metrics.end_test(False)
-                return  # Keep browser open on failure
+                iteration_engine.begin()
+            except CircuitOpen as e:
+                logger.error("Stopping soak early, circuit breaker open: %s / 熔断器打开, 提前停止浸泡测试: %s", e, e)
+                break
+            metrics.start_test(i)
             
-            # Add a delay between iterations / 在迭代之间添加延迟
-            if i < iterations - 1:
-                time.sleep(3)
-        
-        # Log final success message / 记录最终成功消息
-        logger.info(f"Successfully completed all {iterations} iterations / 成功完成所有 {iterations} 次迭代")
-        driver.quit()  # Close browser on success
-                
-    except Exception as e:
-        error_msg = f"Test process failed: {str(e)} / 测试过程失败: {str(e)}"
-        logger.error(error_msg, exc_info=True)
-        return  # Keep browser open on failure
+            # Check out and log in a fresh session after start-up or recycling / 启动或回收后借出新会话并登录
+            if session is None:
+                session = session_pool.checkout()
+                apply_network_profile(session.driver)
+                monitor.start_session(session)
+                if not get_login_cache().login(session.driver, lambda d: login(d, metrics), metrics, default=False):
+                    monitor.record_iteration(metrics.end_test(False), False)
+                    iteration_engine.record_result(False)
+                    recycle("login failed")
+                    continue
+                dashboard = BasePage(session.driver, metrics)
+                dashboard.readiness.wait_for_route("dashboard", "post_login")
+            
+            # A failed iteration is counted and the run goes on / 失败的迭代计入统计, 运行继续
+            success = add_employee(session.driver, metrics, i, employee_data, iteration_engine)
+            if return_to_dashboard(session.driver, dashboard, iteration_engine) is not None:
+                success = False
+                recycle("dashboard unreachable")
+            latency = metrics.end_test(success)
+            iteration_engine.record_result(success)
+            monitor.record_iteration(latency, success, session)
+            
+            if session is not None:
+                reason = monitor.check_session(session)
+                if reason:
+                    recycle(reason)
+            monitor.maybe_evaluate()
+    finally:
+        if session is not None:
+            monitor.end_session(session)
+            session_pool.checkin(session)
+    
+    report = monitor.save()
+    allure.attach(json.dumps(report), name="Soak Report / 浸泡测试报告", attachment_type=allure.attachment_type.JSON)
+    if report['findings'] and os.environ.get('SOAK_FAIL_ON_DRIFT', '1') != '0':
+        pytest.fail("Soak drift detected: " + "; ".join(report['findings'].values()))
+
+def test_open_loop_stress(session_pool, metrics, employee_data, iteration_engine):
+    """Open-loop stress test driven by STRESS_TEST_PROFILE / 由STRESS_TEST_PROFILE驱动的开环压力测试"""
+    profile = get_load_profile()
+    if profile is None:
+        pytest.skip("STRESS_TEST_PROFILE not set / 未设置STRESS_TEST_PROFILE")
+    
+    # Each scheduler thread keeps one logged-in session / 每个调度线程持有一个已登录会话
+    local = threading.local()
+    sessions = []
+    sessions_lock = threading.Lock()
+    
+    def worker_driver():
+        if getattr(local, 'driver', None) is None:
+            session = session_pool.checkout()
+            with sessions_lock:
+                sessions.append(session)
+            if not get_login_cache().login(session.driver, lambda d: login(d, metrics), metrics, default=False):
+                # Hand the slot back so other workers are not starved / 归还会话槽位, 避免其他worker饥饿
+                with sessions_lock:
+                    sessions.remove(session)
+                session_pool.checkin(session, recycle="login failed")
+                raise RuntimeError("Worker login failed / worker登录失败")
+            local.driver = session.driver
+        return local.driver
+    
+    def run_iteration(iteration):
+        try:
+            iteration_engine.begin()
+        except CircuitOpen:
+            scheduler.stop()
+            raise
+        success = add_employee(worker_driver(), metrics, iteration, employee_data, iteration_engine)
+        iteration_engine.record_result(success)
+        return success
+    
+    scheduler = OpenLoopScheduler(profile, session_pool.size, metrics,
+                                  max_iterations=get_iterations() if 'STRESS_TEST_ITERATIONS' in os.environ else None,
+                                  max_duration=get_duration())
+    wait_for_start()
+    metrics.start_test()
+    try:
+        passed, total = scheduler.run(run_iteration)
+    finally:
+        for session in sessions:
+            session_pool.checkin(session)
+    logger.info("Open-loop run finished: %s/%s iterations succeeded / 开环运行结束: %s/%s 次迭代成功", passed, total, passed, total)
+
+def test_login_stress(driver, metrics):
+    """Repeated UI login, bypassing the session cache / 绕过会话缓存的重复界面登录"""
+    try:
+        iterations = int(os.environ.get('STRESS_LOGIN_ITERATIONS', 0))
+    except (ValueError, TypeError):
+        iterations = 0
+    if iterations <= 0:
+        pytest.skip("STRESS_LOGIN_ITERATIONS not set or invalid / 未设置STRESS_LOGIN_ITERATIONS或其值无效")
+    
+    for i in range(iterations):
+        metrics.start_test(i)
+        # Drop the previous session so every login is a full one / 丢弃上一次会话, 使每次都是完整登录
+        driver.delete_all_cookies()
+        success = login(driver, metrics)
+        metrics.end_test(success)
+        if not success:
+            logger.error("Login failed in iteration %s / 第 %s 次迭代登录失败", i + 1, i + 1)
+    logger.info("Login stress finished: %s iterations / 登录压力测试结束: %s 次迭代", iterations, iterations)
 
-def test_performance_summary(metrics):
+def test_performance_summary(metrics, resource_sampler):
     """Generate performance test summary / 生成性能测试摘要"""
     summary = metrics.get_summary()
+    if isinstance(summary, str):
+        # Under xdist this worker may not have run the stress tests / xdist下当前worker可能未执行压力测试
+        logger.info("%s; run-wide summary is produced by the controller / %s；整体摘要由控制进程生成", summary, summary)
+        return
     
     logger.info("Performance Test Summary / 性能测试摘要:")
-    logger.info(f"Total Tests: {summary['total_tests']} / 总测试次数: {summary['total_tests']}")
-    logger.info(f"Success Rate: {summary['success_rate']:.2f}% / 成功率: {summary['success_rate']:.2f}%")
-    logger.info(f"Average Duration: {summary['avg_duration']:.2f}s / 平均持续时间: {summary['avg_duration']:.2f}秒")
-    logger.info(f"Average CPU Usage: {summary['avg_cpu']:.2f}% / 平均CPU使用率: {summary['avg_cpu']:.2f}%")
-    logger.info(f"Average Memory Usage: {summary['avg_memory']:.2f}% / 平均内存使用率: {summary['avg_memory']:.2f}%")
-    logger.info(f"Average Response Time: {summary['avg_response']:.2f}s / 平均响应时间: {summary['avg_response']:.2f}秒")
+    logger.info("Total Tests: %s / 总测试次数: %s", summary['total_tests'], summary['total_tests'])
+    logger.info("Success Rate: %.2f%% / 成功率: %.2f%%", summary['success_rate'], summary['success_rate'])
+    logger.info("Average Duration: %.2fs / 平均持续时间: %.2f秒", summary['avg_duration'], summary['avg_duration'])
+    logger.info("Average CPU Usage: %.2f%% / 平均CPU使用率: %.2f%%", summary['avg_cpu'], summary['avg_cpu'])
+    logger.info("Average Memory Usage: %.2f%% / 平均内存使用率: %.2f%%", summary['avg_memory'], summary['avg_memory'])
+    logger.info("Average Response Time: %.2fs / 平均响应时间: %.2f秒", summary['avg_response'], summary['avg_response'])
+    response = summary['response_percentiles']
+    logger.info("Response Time p50/p90/p95/p99/max: %.3f/%.3f/%.3f/%.3f/%.3fs / 响应时间 p50/p90/p95/p99/最大值: %.3f/%.3f/%.3f/%.3f/%.3f秒", response['p50'], response['p90'], response['p95'], response['p99'], response['max'], response['p50'], response['p90'], response['p95'], response['p99'], response['max'])
+    duration = summary['duration_percentiles']
+    logger.info("Iteration Duration p50/p90/p95/p99/max: %.3f/%.3f/%.3f/%.3f/%.3fs / 迭代时长 p50/p90/p95/p99/最大值: %.3f/%.3f/%.3f/%.3f/%.3f秒", duration['p50'], duration['p90'], duration['p95'], duration['p99'], duration['max'], duration['p50'], duration['p90'], duration['p95'], duration['p99'], duration['max'])
+    logger.info("Throughput: %.3f iterations/s / 吞吐量: %.3f 次迭代/秒", summary['throughput'], summary['throughput'])
+    for window in summary['throughput_windows']:
+        start = datetime.fromtimestamp(window['start']).strftime('%H:%M:%S')
+        logger.info("Window %s: %.3f iterations/s, error rate %.1f%%, mean latency %.3fs, max %.3fs / 窗口 %s: %.3f 次迭代/秒, 错误率 %.1f%%, 平均延迟 %.3f秒, 最大 %.3f秒",
+                    start, window['throughput'], window['error_rate'] * 100, window['mean_latency'], window['max_latency'],
+                    start, window['throughput'], window['error_rate'] * 100, window['mean_latency'], window['max_latency'])
+    for error_class, count in sorted(summary['errors'].items()):
+        retries = summary['retries'].get(error_class, 0)
+        logger.info("Errors '%s': %s, %s retried / 错误 '%s': %s 次, 重试 %s 次", error_class, count, retries, error_class, count, retries)
+    for path, step in summary['step_percentiles'].items():
+        logger.info("Step '%s': n=%s, p50=%.3fs, p95=%.3fs, max=%.3fs / 步骤 '%s': 次数=%s, p50=%.3f秒, p95=%.3f秒, 最大值=%.3f秒", path, step['count'], step['p50'], step['p95'], step['max'], path, step['count'], step['p50'], step['p95'], step['max'])
+    for key, timing in summary['browser_timings'].items():
+        logger.info("Browser '%s': mean=%.3f, p95=%.3f / 浏览器 '%s': 平均=%.3f, p95=%.3f", key, timing['mean'], timing['p95'], key, timing['mean'], timing['p95'])
+    for label, avg_wait in summary['wait_times'].items():
+        logger.info("Average Wait '%s': %.3fs / 平均等待 '%s': %.3f秒", label, avg_wait, label, avg_wait)
+    
+    # WebDriver commands that cost the most time on this worker / 当前worker上耗时最多的WebDriver命令
+    profiler = get_command_profiler()
+    profiler.log_report(summary['total_tests'])
+    
+    sessions = resource_sampler.get_summary()
+    for label, usage in sessions.items():
+        logger.info("Session %s: avg CPU %.1f%%, peak RSS %.1fMB, peak threads %s, peak handles %s / 会话 %s: 平均CPU %.1f%%, 峰值RSS %.1fMB, 峰值线程数 %s, 峰值句柄数 %s", label, usage['avg_cpu'], usage['peak_rss'] / 1024 / 1024, usage['peak_threads'], usage['peak_handles'], label, usage['avg_cpu'], usage['peak_rss'] / 1024 / 1024, usage['peak_threads'], usage['peak_handles'])
+    if sessions:
+        session_memory = sum(usage['peak_rss'] for usage in sessions.values()) / len(sessions) / 1024 / 1024
+        logger.info("Browser profile %s (%s cache): %.1fMB peak RSS per session, iteration p50 %.3fs / 浏览器配置 %s (%s缓存): 每会话峰值RSS %.1fMB, 迭代p50 %.3f秒",
+                    get_profile(), get_cache_mode(), session_memory, duration['p50'], get_profile(), get_cache_mode(), session_memory, duration['p50'])
+    network = get_network_profile()
+    logger.info("Network profile: %s / 网络配置: %s", network, network)
     
     # Add performance metrics to Allure report / 将性能指标添加到Allure报告
     allure.attach(
@@ -337,10 +471,28 @@ def test_performance_summary(metrics):
         Average CPU Usage: {summary['avg_cpu']:.2f}%
         Average Memory Usage: {summary['avg_memory']:.2f}%
         Average Response Time: {summary['avg_response']:.2f}s
+        Response Time p50/p90/p95/p99/max: {response['p50']:.3f}/{response['p90']:.3f}/{response['p95']:.3f}/{response['p99']:.3f}/{response['max']:.3f}s
+        Iteration Duration p50/p90/p95/p99/max: {duration['p50']:.3f}/{duration['p90']:.3f}/{duration['p95']:.3f}/{duration['p99']:.3f}/{duration['max']:.3f}s
+        Throughput: {summary['throughput']:.3f} iterations/s
         """,
         name="Performance Summary / 性能摘要",
         attachment_type=allure.attachment_type.TEXT
     )
+    allure.attach(
+        json.dumps({'windows': summary['throughput_windows'], 'errors': summary['errors'], 'retries': summary['retries']}),
+        name="Throughput and Error Rate Series / 吞吐量和错误率时间序列",
+        attachment_type=allure.attachment_type.JSON
+    )
+    allure.attach(
+        json.dumps(resource_sampler.series()),
+        name="Browser Resource Series / 浏览器资源时间序列",
+        attachment_type=allure.attachment_type.JSON
+    )
+    allure.attach(
+        json.dumps({group: profiler.report(summary['total_tests'], group=group) for group in ('command', 'step')}),
+        name="WebDriver Commands / WebDriver命令",
+        attachment_type=allure.attachment_type.JSON
+    )
 
 if __name__ == "__main__":
     logger.info("Starting stress test suite / 开始执行压力测试套件")
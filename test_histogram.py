@@ -0,0 +1,89 @@
+import math
+import random
+import pytest
+from histogram import LogLinearHistogram
+from performance_metrics import PerformanceMetrics
+
+# Bound of the default layout plus float slack / 默认布局的误差上界加浮点余量
+RELATIVE_ERROR = 2 ** -7 + 1e-9
+
+def exact_percentile(values, percent):
+    """Nearest-rank percentile of a list / 列表的最近秩百分位"""
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(len(ordered) * percent / 100)) - 1]
+
+@pytest.mark.parametrize("percent", [1, 25, 50, 90, 95, 99, 99.9])
+def test_percentile_matches_exact_quantile(percent):
+    rng = random.Random(7)
+    values = [rng.lognormvariate(math.log(0.2), 1.0) for _ in range(20000)]
+    histogram = LogLinearHistogram()
+    for value in values:
+        histogram.record(value)
+
+    expected = exact_percentile(values, percent)
+    assert histogram.percentile(percent) == pytest.approx(expected, rel=RELATIVE_ERROR, abs=histogram.unit)
+
+def test_small_values_resolve_to_the_unit():
+    histogram = LogLinearHistogram(unit=1e-3)
+    for value in (0.001, 0.002, 0.003, 0.050):
+        histogram.record(value)
+    assert histogram.percentile(50) == pytest.approx(0.002, abs=1e-3)
+    assert histogram.percentile(100) == 0.050
+
+def test_out_of_range_values_are_clamped():
+    histogram = LogLinearHistogram(unit=1e-6, max_exponent=20)
+    histogram.record(-1.0)
+    histogram.record(0.5)
+    histogram.record(1e6)
+
+    assert histogram.count == 3
+    assert histogram.counts[0] == 1
+    assert histogram.counts[len(histogram.counts) - 1] == 1
+    # Negatives read as zero, overflow as the top of the range; p100 stays exact / 负值读作0, 溢出值读作量程上限; p100保持精确
+    top = 2 ** 20 * histogram.unit
+    assert histogram.percentile(0) == 0
+    assert histogram.percentile(50) == pytest.approx(0.5, rel=RELATIVE_ERROR)
+    assert top * (1 - RELATIVE_ERROR) <= histogram.percentile(99) <= top
+    assert histogram.percentile(100) == 1e6
+    assert (histogram.min, histogram.max) == (-1.0, 1e6)
+
+def test_empty_histogram():
+    histogram = LogLinearHistogram()
+    assert histogram.percentile(50) == 0
+    assert histogram.mean == 0
+    assert histogram.percentiles()['max'] == 0
+    assert LogLinearHistogram.from_dict(histogram.to_dict()).count == 0
+
+def test_merge_and_round_trip_preserve_counts():
+    rng = random.Random(3)
+    first, second, combined = LogLinearHistogram(), LogLinearHistogram(), LogLinearHistogram()
+    for index in range(5000):
+        value = rng.expovariate(10)
+        (first if index % 2 else second).record(value)
+        combined.record(value)
+
+    restored = LogLinearHistogram.from_dict(first.to_dict()).merge(LogLinearHistogram.from_dict(second.to_dict()))
+    assert list(restored.counts) == list(combined.counts)
+    assert restored.count == combined.count == 5000
+    assert restored.total == pytest.approx(combined.total)
+    assert (restored.min, restored.max) == (combined.min, combined.max)
+    assert restored.percentiles() == combined.percentiles()
+
+def test_merge_rejects_different_layouts():
+    with pytest.raises(ValueError):
+        LogLinearHistogram().merge(LogLinearHistogram(unit=1e-3))
+
+def test_metrics_merge_and_round_trip():
+    first, second = PerformanceMetrics(), PerformanceMetrics()
+    for metrics, durations in ((first, [0.1, 0.2]), (second, [0.3])):
+        for duration in durations:
+            metrics.record_response_time(duration)
+            metrics.record_step('add_employee/save', duration)
+            metrics.record_result(duration, duration < 0.3)
+
+    merged = PerformanceMetrics().merge(PerformanceMetrics.from_dict(first.to_dict())).merge(second)
+    assert merged.total_tests == 3
+    assert merged.successful_tests == 2
+    assert merged.response_times.count == 3
+    assert merged.step_times['add_employee/save'].count == 3
+    assert merged.to_dict() == PerformanceMetrics.from_dict(merged.to_dict()).to_dict()
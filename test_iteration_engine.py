@@ -0,0 +1,185 @@
+import pytest
+from selenium.common.exceptions import (
+    TimeoutException, NoSuchElementException, StaleElementReferenceException, ElementClickInterceptedException,
+    InvalidSessionIdException, NoSuchWindowException, WebDriverException,
+)
+import iteration_engine
+from iteration_engine import (
+    IterationEngine, CircuitBreaker, CircuitOpen, StepFailed, classify_error, get_retry_errors,
+    TIMEOUT, LOCATOR_MISSING, CLICK_INTERCEPTED, SERVER_ERROR, VALIDATION_ERROR, SESSION_LOST, OTHER,
+)
+from pages import FormError
+from performance_metrics import PerformanceMetrics
+
+class FakeClock:
+    """Manually advanced replacement for time.time / 手动推进的time.time替代"""
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+class FakeDriver:
+    """Driver whose page text is fixed / 页面文本固定的driver"""
+    def __init__(self, text=None, error=None):
+        self.text = text
+        self.error = error
+
+    def execute_script(self, script):
+        if self.error is not None:
+            raise self.error
+        return self.text
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(iteration_engine.time, 'time', fake)
+    return fake
+
+@pytest.mark.parametrize("error, driver, expected", [
+    (FormError("Employee Id already exists", field=True), None, VALIDATION_ERROR),
+    (FormError("HTTP 422 Unprocessable Entity"), None, VALIDATION_ERROR),
+    (FormError("Something went wrong"), None, SERVER_ERROR),
+    (ElementClickInterceptedException("covered"), None, CLICK_INTERCEPTED),
+    (NoSuchElementException("missing"), None, LOCATOR_MISSING),
+    (StaleElementReferenceException("stale"), None, LOCATOR_MISSING),
+    (TimeoutException("slow"), None, TIMEOUT),
+    (TimeoutException("slow"), FakeDriver("Dashboard"), TIMEOUT),
+    (TimeoutException("slow"), FakeDriver("502 Bad Gateway nginx"), SERVER_ERROR),
+    (TimeoutException("slow"), FakeDriver("Internal Server Error"), SERVER_ERROR),
+    (TimeoutException("slow"), FakeDriver(error=WebDriverException("gone")), TIMEOUT),
+    (InvalidSessionIdException("invalid session id"), None, SESSION_LOST),
+    (NoSuchWindowException("closed"), None, SESSION_LOST),
+    (WebDriverException("chrome not reachable"), None, SESSION_LOST),
+    (WebDriverException("unknown error"), None, OTHER),
+    (ValueError("bad"), None, OTHER),
+])
+def test_classify_error(error, driver, expected):
+    assert classify_error(error, driver) == expected
+
+@pytest.mark.parametrize("spec, expected", [
+    (None, {TIMEOUT, CLICK_INTERCEPTED, SERVER_ERROR, VALIDATION_ERROR}),
+    ("timeout, locator_missing", {TIMEOUT, LOCATOR_MISSING}),
+    ("", set()),
+])
+def test_retry_errors_from_environment(monkeypatch, spec, expected):
+    if spec is None:
+        monkeypatch.delenv('ITERATION_RETRY_ERRORS', raising=False)
+    else:
+        monkeypatch.setenv('ITERATION_RETRY_ERRORS', spec)
+    assert get_retry_errors() == expected
+
+def failing_action(errors):
+    """Action raising the given errors in turn, then returning 'ok' / 依次抛出给定异常后返回'ok'的动作"""
+    remaining = list(errors)
+
+    def action():
+        if remaining:
+            raise remaining.pop(0)
+        return 'ok'
+    return action
+
+@pytest.mark.parametrize("budget, errors, result, retries", [
+    # Retryable failures within the budget / 预算内的可重试失败
+    (2, [TimeoutException("slow")], 'ok', {TIMEOUT: 1}),
+    (2, [TimeoutException("slow"), ElementClickInterceptedException("covered")], 'ok', {TIMEOUT: 1, CLICK_INTERCEPTED: 1}),
+    # Budget spent / 预算用尽
+    (2, [TimeoutException("slow")] * 3, TIMEOUT, {TIMEOUT: 2}),
+    (0, [TimeoutException("slow")], TIMEOUT, {}),
+    # Not retryable / 不可重试
+    (2, [NoSuchElementException("missing")], LOCATOR_MISSING, {}),
+    (2, [InvalidSessionIdException("invalid session id")], SESSION_LOST, {}),
+])
+def test_step_retry_budget(budget, errors, result, retries):
+    metrics = PerformanceMetrics()
+    engine = IterationEngine(metrics, retry_budget=budget, retry_errors=set(iteration_engine.DEFAULT_RETRY_ERRORS))
+    engine.begin()
+    recovered = []
+    action = failing_action(errors)
+    if result == 'ok':
+        assert engine.step('save', action, recover=recovered.append) == 'ok'
+        assert len(recovered) == len(errors)
+    else:
+        with pytest.raises(StepFailed) as failure:
+            engine.step('save', action, recover=recovered.append)
+        assert failure.value.error_class == result
+        assert failure.value.step == 'save'
+    assert metrics.retry_counts == retries
+    # Every failed attempt is counted, retried or not / 每次失败的尝试都计数, 无论是否重试
+    assert sum(metrics.error_counts.values()) == min(len(errors), budget + 1)
+
+def test_budget_is_shared_by_the_steps_of_an_iteration():
+    engine = IterationEngine(PerformanceMetrics(), retry_budget=1, retry_errors={TIMEOUT})
+    engine.begin()
+    assert engine.step('fill', failing_action([TimeoutException("slow")])) == 'ok'
+    with pytest.raises(StepFailed):
+        engine.step('save', failing_action([TimeoutException("slow")]))
+    # A new iteration gets a fresh budget / 新迭代获得新的预算
+    engine.begin()
+    assert engine.step('save', failing_action([TimeoutException("slow")])) == 'ok'
+
+def test_failed_recovery_fails_the_step():
+    engine = IterationEngine(PerformanceMetrics(), retry_budget=2, retry_errors={TIMEOUT})
+    engine.begin()
+
+    def recover(error_class):
+        raise NoSuchElementException("form gone")
+    with pytest.raises(StepFailed) as failure:
+        engine.step('save', failing_action([TimeoutException("slow")]), recover=recover)
+    assert failure.value.error_class == LOCATOR_MISSING
+
+# Each case: (seconds since previous result, success) pairs and whether the breaker ends open
+# 每个用例: (距上一结果的秒数, 是否成功) 序列, 以及熔断器最终是否打开
+@pytest.mark.parametrize("results, tripped", [
+    # Below min_iterations nothing trips / 未达min_iterations时不触发
+    ([(1, False)] * 3, False),
+    # Half of the window failed / 窗口内一半失败
+    ([(1, True), (1, False)] * 3, True),
+    ([(1, True), (1, True), (1, False)] * 3, False),
+    # Old failures slide out of the 10s window before the rate is reached / 旧失败在达到阈值前滑出10秒窗口
+    ([(1, False)] * 3 + [(20, True)] + [(1, True), (1, False)] * 2, False),
+    # Failures after the slide still trip / 滑出后的失败仍会触发
+    ([(1, True)] * 6 + [(20, False)] + [(1, False)] * 3, True),
+])
+def test_breaker_transitions(results, tripped):
+    breaker = CircuitBreaker(error_rate=0.5, window_seconds=10, min_iterations=4)
+    now = 0.0
+    for gap, success in results:
+        now += gap
+        breaker.record(success, timestamp=now)
+    assert (breaker.tripped is not None) == tripped
+
+def test_breaker_stays_open_once_tripped():
+    # There is no half-open state: a tripped breaker stops the run / 不存在半开状态: 熔断后即停止运行
+    breaker = CircuitBreaker(error_rate=0.5, window_seconds=10, min_iterations=2)
+    assert breaker.record(False, timestamp=0) is True
+    assert breaker.record(False, timestamp=1) is False
+    reason = breaker.tripped
+    for second in range(100, 120):
+        assert breaker.record(True, timestamp=second) is False
+    assert breaker.tripped == reason
+    with pytest.raises(CircuitOpen):
+        breaker.check()
+
+def test_zero_error_rate_disables_the_breaker():
+    breaker = CircuitBreaker(error_rate=0, window_seconds=10, min_iterations=1)
+    for second in range(20):
+        breaker.record(False, timestamp=second)
+    breaker.check()
+
+def test_engine_opens_the_circuit_on_the_fake_clock(clock):
+    engine = IterationEngine(PerformanceMetrics(), breaker=CircuitBreaker(error_rate=0.5, window_seconds=60, min_iterations=3))
+    for success in (False, True, True, False):
+        clock.advance(30)
+        engine.begin()
+        engine.record_result(success)
+    # The first failure left the 60s window, so 1 of 3 failed / 第一次失败已滑出60秒窗口, 3次中1次失败
+    assert engine.breaker.tripped is None
+    clock.advance(1)
+    engine.begin()
+    engine.record_result(False)
+    with pytest.raises(CircuitOpen):
+        engine.begin()
@@ -0,0 +1,92 @@
+import os
+import pytest
+import sample_store
+from sample_store import SampleWriter, RunStats, compare_runs, SAMPLE_SUFFIX
+
+ITERATIONS = 100
+
+def write_run(directory, duration, spacing, failures=0, step_scale=1.0):
+    """Write one worker file of evenly spaced iterations / 写入一个包含等间隔迭代的worker文件"""
+    writer = SampleWriter(os.path.join(directory, f"gw0{SAMPLE_SUFFIX}"), meta={'browser_profile': 'lean'})
+    for iteration in range(ITERATIONS):
+        timestamp = 1000.0 + (iteration + 1) * spacing
+        writer.step(timestamp, iteration, 'add_employee/save', duration * 0.5 * step_scale)
+        writer.iteration(timestamp, iteration, duration, iteration >= failures)
+    writer.error(1000.0, 0, 'timeout', 'Timed out')
+    writer.close()
+    return str(directory)
+
+@pytest.fixture
+def baseline(tmp_path):
+    return write_run(tmp_path / 'baseline', duration=1.0, spacing=1.0)
+
+def test_run_stats_read_back(tmp_path):
+    stats = RunStats.load(write_run(tmp_path / 'run', duration=1.0, spacing=0.5, failures=3))
+    assert (stats.passed, stats.failed) == (ITERATIONS - 3, 3)
+    assert stats.iterations.percentile(95) == pytest.approx(1.0, rel=0.01)
+    assert stats.steps['add_employee/save'].count == ITERATIONS
+    assert stats.errors == {'timeout': 1}
+    assert stats.browser_profile == 'lean/warm'
+    assert stats.throughput == pytest.approx(ITERATIONS / (ITERATIONS * 0.5 + 0.5))
+
+@pytest.mark.parametrize("duration, spacing, step_scale, expected", [
+    # Same run / 相同运行
+    (1.0, 1.0, 1.0, []),
+    # Inside the 10% thresholds / 在10%阈值之内
+    (1.05, 1.05, 1.0, []),
+    # p95 up 50%, throughput unchanged / p95上升50%, 吞吐量不变
+    (1.5, 1.0, 1.0, ["Iteration p95", "Step 'add_employee/save'"]),
+    # Only the step regressed / 仅步骤退化
+    (1.0, 1.0, 1.5, ["Step 'add_employee/save'"]),
+    # Throughput halved at equal latency / 延迟相同, 吞吐量减半
+    (1.0, 2.0, 1.0, ["Throughput dropped"]),
+])
+def test_gate_decision(tmp_path, baseline, duration, spacing, step_scale, expected):
+    candidate = write_run(tmp_path / 'candidate', duration, spacing, step_scale=step_scale)
+    regressions = compare_runs([candidate], baseline, p95_threshold=10, throughput_threshold=10)
+    assert [next((prefix for prefix in expected if message.startswith(prefix)), message) for message in regressions] == expected
+
+def test_faster_run_passes(tmp_path, baseline):
+    candidate = write_run(tmp_path / 'candidate', duration=0.5, spacing=0.5)
+    assert compare_runs([candidate], baseline) == []
+
+def test_small_increase_below_noise_floor_passes(tmp_path):
+    reference = write_run(tmp_path / 'baseline', duration=0.002, spacing=1.0)
+    candidate = write_run(tmp_path / 'candidate', duration=0.004, spacing=1.0)
+    assert compare_runs([candidate], reference) == []
+
+def test_missing_baseline_is_an_error(tmp_path, monkeypatch):
+    monkeypatch.setattr(sample_store, 'RUNS_DIR', str(tmp_path / 'Runs'))
+    monkeypatch.setattr(sample_store, 'BASELINES_DIR', str(tmp_path / 'Baselines'))
+    candidate = write_run(tmp_path / 'candidate', duration=1.0, spacing=1.0)
+    with pytest.raises(FileNotFoundError):
+        compare_runs([candidate], 'default')
+    assert sample_store.main(['compare', candidate, '--baseline', 'default']) == 2
+
+def test_unreadable_baseline_is_an_error(tmp_path):
+    corrupt = tmp_path / 'baseline'
+    corrupt.mkdir()
+    (corrupt / f"gw0{SAMPLE_SUFFIX}").write_bytes(b'not a sample file')
+    candidate = write_run(tmp_path / 'candidate', duration=1.0, spacing=1.0)
+    with pytest.raises(ValueError):
+        compare_runs([candidate], str(corrupt))
+
+def test_empty_baseline_is_an_error(tmp_path):
+    empty = tmp_path / 'baseline'
+    empty.mkdir()
+    candidate = write_run(tmp_path / 'candidate', duration=1.0, spacing=1.0)
+    with pytest.raises(ValueError):
+        compare_runs([candidate], str(empty))
+
+def test_truncated_baseline_still_compares(tmp_path, baseline):
+    path = os.path.join(baseline, f"gw0{SAMPLE_SUFFIX}")
+    with open(path, 'r+b') as f:
+        f.truncate(os.path.getsize(path) - 3)
+    candidate = write_run(tmp_path / 'candidate', duration=1.0, spacing=1.0)
+    assert compare_runs([candidate], baseline) == []
+
+def test_main_exit_codes(tmp_path, baseline):
+    passing = write_run(tmp_path / 'passing', duration=1.0, spacing=1.0)
+    failing = write_run(tmp_path / 'failing', duration=2.0, spacing=1.0)
+    assert sample_store.main(['compare', baseline, passing]) == 0
+    assert sample_store.main(['compare', baseline, failing]) == 1
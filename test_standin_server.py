@@ -0,0 +1,58 @@
+import asyncio
+import pytest
+import aiohttp
+from aiohttp import web
+import config
+import employee_data
+from employee_data import EmployeeDataPool
+from performance_metrics import PerformanceMetrics
+from protocol_load import run_protocol_load, protocol_login, protocol_delete_employees
+from standin_server import StandinApp, FaultInjector, Latency
+
+# Injected per API call; adding an employee makes two calls / 每次API调用注入的延迟; 添加员工需两次调用
+API_DELAY = 0.1
+USERS = 3
+ITERATIONS = 2
+
+async def _run_against_standin(app, users, iterations):
+    """Serve the stand-in on a free port, run protocol load, then delete what it created / 在空闲端口启动替身服务, 运行协议级负载后删除创建的员工"""
+    runner = web.AppRunner(app.build())
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    host, port = runner.addresses[0][:2]
+    config.BASE_URL = f"http://{host}:{port}/"
+    try:
+        pool = EmployeeDataPool(size=users * iterations, reuse=False)
+        metrics = await run_protocol_load(users=users, iterations=iterations, metrics=PerformanceMetrics(), employee_data=pool)
+        created = dict(app.employees)
+        records = pool.take_created()
+        async with aiohttp.ClientSession(cookie_jar=aiohttp.CookieJar(unsafe=True)) as session:
+            await protocol_login(session)
+            deleted = await protocol_delete_employees(session, records)
+        return metrics, created, records, deleted
+    finally:
+        await runner.cleanup()
+
+@pytest.fixture
+def isolated_state(tmp_path, monkeypatch):
+    """Keep ID reservations and the target URL local to the test / 将ID预留和目标URL限定在本测试内"""
+    monkeypatch.setattr(employee_data, 'COUNTER_FILE', str(tmp_path / 'id_counter.json'))
+    monkeypatch.setattr(config, 'BASE_URL', config.BASE_URL)
+
+def test_protocol_load_reflects_injected_latency(isolated_state):
+    """p50 of add employee follows the injected API delay and cleanup removes every employee / 添加员工的p50反映注入的API延迟, 清理删除全部员工"""
+    app = StandinApp(FaultInjector(api_latency=Latency.parse(f"fixed:{API_DELAY}"), seed=1))
+    metrics, created, records, deleted = asyncio.run(_run_against_standin(app, USERS, ITERATIONS))
+
+    assert metrics.total_tests == USERS * ITERATIONS
+    assert metrics.successful_tests == USERS * ITERATIONS
+    # Only add-employee samples; login is kept as a step / 仅含添加员工样本; 登录作为步骤记录
+    assert metrics.response_times.count == USERS * ITERATIONS
+    p50 = metrics.response_times.percentile(50)
+    assert 2 * API_DELAY * 0.99 <= p50 < 2 * API_DELAY + 0.5
+
+    assert len(created) == USERS * ITERATIONS
+    assert sorted(record.emp_number for record in records) == sorted(created)
+    assert len(deleted) == len(records)
+    assert app.employees == {}